@@ -0,0 +1,97 @@
+"""Cold storage for completed tasks that are no longer worth keeping hot.
+
+Archived tasks live in gzip-compressed NDJSON segments, one per month of
+completion (``2026-09.ndjson.gz``), in a directory next to the data file.
+Segments are append-only: every archiving run adds a gzip member to the
+end, and gzip readers see the members of a file as one stream. A segment
+is only read when somebody asks for it, and is cached until it changes.
+"""
+import gzip
+import json
+import os
+import zlib
+from typing import Dict, List, Optional, Tuple
+
+SEGMENT_SUFFIX = '.ndjson.gz'
+# Segment for records without a usable completion or creation date
+UNDATED = 'undated'
+
+
+def archive_dir_for(data_file: str) -> str:
+    """Archive directory for a data file: ``data/tasks-archive`` for ``data/tasks.json``."""
+    return os.path.splitext(data_file)[0] + '-archive'
+
+
+def segment_for(record: dict) -> str:
+    """Month (``YYYY-MM``) a task record is archived under."""
+    for key in ('completed_at', 'created_at'):
+        value = record.get(key)
+        if isinstance(value, str) and len(value) >= 7 and value[4] == '-':
+            return value[:7]
+    return UNDATED
+
+
+class Archive:
+    def __init__(self, directory: str):
+        self.directory = directory
+        # segment -> (file size and mtime when read, its records)
+        self._cache: Dict[str, Tuple[Tuple[int, int], List[dict]]] = {}
+
+    def _path(self, segment: str) -> str:
+        return os.path.join(self.directory, segment + SEGMENT_SUFFIX)
+
+    def segments(self) -> List[str]:
+        """Segment names, newest month first (undated ones last)."""
+        try:
+            names = [name[:-len(SEGMENT_SUFFIX)] for name in os.listdir(self.directory)
+                     if name.endswith(SEGMENT_SUFFIX)]
+        except FileNotFoundError:
+            return []
+        dated = sorted((name for name in names if name != UNDATED), reverse=True)
+        return dated + [name for name in names if name == UNDATED]
+
+    def append(self, records: List[dict]) -> Dict[str, int]:
+        """Append task records to their month's segment; returns how many went where."""
+        by_segment: Dict[str, List[dict]] = {}
+        for record in records:
+            by_segment.setdefault(segment_for(record), []).append(record)
+        os.makedirs(self.directory, exist_ok=True)
+        for segment, batch in by_segment.items():
+            data = ''.join(json.dumps(record) + '\n' for record in batch).encode('utf-8')
+            # One new gzip member per run; compressing up front keeps the
+            # file from ever holding a half-written member for long
+            member = gzip.compress(data)
+            with open(self._path(segment), 'ab') as f:
+                f.write(member)
+                f.flush()
+                os.fsync(f.fileno())
+        return {segment: len(batch) for segment, batch in by_segment.items()}
+
+    def load(self, segment: str) -> List[dict]:
+        """Records of one segment, oldest first; a task archived twice appears once."""
+        path = self._path(segment)
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return []
+        signature = (stat.st_size, stat.st_mtime_ns)
+        cached = self._cache.get(segment)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+        by_id: Dict[Optional[str], dict] = {}
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            try:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        # A torn last line after a crash
+                        continue
+                    by_id.pop(record.get('id'), None)
+                    by_id[record.get('id')] = record
+            except (EOFError, OSError, zlib.error):
+                # Truncated last member; keep what was read before it
+                pass
+        records = list(by_id.values())
+        self._cache[segment] = (signature, records)
+        return records
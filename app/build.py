@@ -1,8 +1,16 @@
 import PyInstaller.__main__
 import os
 import shutil
+import sys
 
-def build_app():
+def build_app(onedir: bool = False):
+    """Build TodoApp with PyInstaller.
+
+    The default is a single self-extracting executable. ``onedir`` builds a
+    folder instead, which starts faster: nothing has to be unpacked to a
+    temp dir on each launch, and the binaries are not UPX-compressed so
+    they need no decompressing either.
+    """
     # Clean up previous builds
     if os.path.exists("dist"):
         shutil.rmtree("dist")
@@ -16,7 +24,7 @@ def build_app():
     # PyInstaller configuration
     pyinstaller_args = [
         "app/main.py",  # Entry point
-        "--onefile",    # Create single executable
+        "--onedir" if onedir else "--onefile",
         "--windowed",   # For GUI apps (no console)
         "--icon=assets/icon.ico",  # App icon
         "--name=TodoApp",
@@ -24,9 +32,12 @@ def build_app():
         "--add-data=data;data",      # Include data folder
         "--clean"
     ]
+    if onedir:
+        pyinstaller_args.append("--noupx")
     
     # Run PyInstaller
     PyInstaller.__main__.run(pyinstaller_args)
 
 if __name__ == "__main__":
-    build_app()
\ No newline at end of file
+    # python app/build.py [--onedir]
+    build_app(onedir="--onedir" in sys.argv[1:])
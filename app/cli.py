@@ -0,0 +1,434 @@
+"""Command-line interface to the task list; never imports tkinter.
+
+    python -m app.cli add "Pay rent" --priority 4 --category Home --due 2026-11-01
+    python -m app.cli add "Water plants" --repeat "every 3 days"
+    python -m app.cli list --active --sort due_date
+    python -m app.cli list --limit 50 --after 3f2a9c      # or the cursor printed for the next page
+    python -m app.cli complete 3f2a9c
+    python -m app.cli query --overdue
+    python -m app.cli stats
+    python -m app.cli add --stdin < tasks.ndjson
+    python -m app.cli batch < operations.ndjson
+    python -m app.cli archive --days 30
+    python -m app.cli archive --show 2026-08
+
+Tasks are addressed by id or by any unambiguous id prefix. Every command
+that changes tasks applies all of its changes in one transaction, so a
+batch of any size costs a single write.
+"""
+import argparse
+import json
+import os
+import sys
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Iterable, Iterator, List, Optional, TextIO
+
+from .recurrence import parse_rule
+from .storage import open_storage
+from .todo_manager import SORT_FIELDS, Task, TodoManager, task_to_record
+
+# Shortest id prefix accepted for a task that is not addressed by its full id
+MIN_ID_PREFIX = 4
+
+
+class CliError(Exception):
+    pass
+
+
+def open_manager(args) -> TodoManager:
+    storage = open_storage(args.data, args.storage)
+    return TodoManager(args.data, storage=storage)
+
+
+def read_ndjson(stream: TextIO) -> Iterator[dict]:
+    for line_number, line in enumerate(stream, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            value = json.loads(line)
+        except json.JSONDecodeError as e:
+            raise CliError(f'stdin line {line_number}: {e}')
+        if not isinstance(value, dict):
+            raise CliError(f'stdin line {line_number}: expected a JSON object')
+        yield value
+
+
+def resolve_id(manager: TodoManager, prefix: str) -> str:
+    if prefix in manager.tasks:
+        return prefix
+    # An empty prefix would match every task
+    if len(prefix) < MIN_ID_PREFIX:
+        raise CliError(f'Id prefix {prefix!r} is too short; give at least {MIN_ID_PREFIX} characters')
+    matches = [task_id for task_id in manager.tasks if task_id.startswith(prefix)]
+    if not matches:
+        raise CliError(f'No task with id {prefix}')
+    if len(matches) > 1:
+        raise CliError(f'Id prefix {prefix} is ambiguous ({len(matches)} tasks)')
+    return matches[0]
+
+
+def task_fields(values: dict) -> dict:
+    """Validate add/update fields the way the task dialog does."""
+    fields = {}
+    for key, value in values.items():
+        if key == 'title':
+            if not isinstance(value, str) or not value.strip():
+                raise CliError('Task title cannot be empty')
+            value = value.strip()
+        elif key == 'priority':
+            if not isinstance(value, int) or isinstance(value, bool) or not 1 <= value <= 5:
+                raise CliError('Priority must be between 1 and 5')
+        elif key == 'due_date':
+            if value:
+                try:
+                    datetime.fromisoformat(value)
+                except (TypeError, ValueError):
+                    raise CliError(f'Invalid due date {value!r}; use YYYY-MM-DD')
+            value = value or None
+        elif key == 'category':
+            if value and not isinstance(value, str):
+                raise CliError('Category must be text')
+            value = value or None
+        elif key == 'recurrence':
+            if value:
+                if not isinstance(value, str):
+                    raise CliError('Recurrence must be rule text such as "weekly"')
+                try:
+                    parse_rule(value)
+                except ValueError as e:
+                    raise CliError(str(e))
+            value = value or None
+        elif key == 'completed':
+            # JSON true/false only; the string "false" would be truthy
+            if not isinstance(value, bool):
+                raise CliError('completed must be true or false')
+        else:
+            raise CliError(f'Unknown task field {key!r}')
+        fields[key] = value
+    return fields
+
+
+def print_tasks(manager: TodoManager, tasks: Iterable[Task], as_json: bool, out: TextIO = sys.stdout):
+    if as_json:
+        for task in tasks:
+            out.write(json.dumps(task_to_record(task)) + '\n')
+        return
+    for task in tasks:
+        info = manager.due_info(task.id)
+        due = f'  due {datetime.fromtimestamp(info[0]).date().isoformat()}' if info else ''
+        category = f'  [{task.category}]' if task.category else ''
+        repeat = f' ({task.recurrence})' if task.recurrence else ''
+        status = 'x' if task.completed else ' '
+        out.write(f'{task.id[:8]}  [{status}] P{task.priority or "-"}  {task.title}{category}{due}{repeat}\n')
+
+
+def cmd_add(manager: TodoManager, args) -> int:
+    if args.stdin:
+        items = [task_fields(item) for item in read_ndjson(sys.stdin)]
+        if any('title' not in item for item in items):
+            raise CliError('Every task needs a title')
+    else:
+        if args.title is None:
+            raise CliError('Give a title or --stdin')
+        values = {'title': args.title}
+        if args.priority is not None:
+            values['priority'] = args.priority
+        if args.category is not None:
+            values['category'] = args.category
+        if args.due is not None:
+            values['due_date'] = args.due
+        if args.repeat is not None:
+            values['recurrence'] = args.repeat
+        items = [task_fields(values)]
+    tasks = manager.bulk_add(items)
+    print_tasks(manager, tasks, args.json)
+    return 0
+
+
+def resolve_cursor(manager: TodoManager, after: str) -> str:
+    """An id prefix, or else the cursor ``list`` printed for the next page."""
+    try:
+        return resolve_id(manager, after)
+    except CliError:
+        if any(task_id.startswith(after) for task_id in manager.tasks):
+            raise
+        return after
+
+
+def cmd_list(manager: TodoManager, args) -> int:
+    completed = True if args.completed else False if args.active else None
+    if args.limit is not None and args.limit < 1:
+        raise CliError('--limit must be at least 1')
+    try:
+        tasks = manager.iter_tasks(
+            filter_completed=completed,
+            category=args.category,
+            priority=args.priority,
+            query=args.search,
+            sort_by=args.sort,
+            descending=args.desc,
+            after=resolve_cursor(manager, args.after) if args.after else None,
+            # One more than the page, to tell whether there is a next page
+            limit=args.limit + 1 if args.limit is not None else None,
+        )
+    except ValueError as e:
+        raise CliError(str(e))
+    if args.limit is None:
+        print_tasks(manager, tasks, args.json)
+        return 0
+    tasks = list(tasks)
+    print_tasks(manager, tasks[:args.limit], args.json)
+    if len(tasks) > args.limit:
+        # On stderr, so --json output stays NDJSON
+        cursor = manager.page_cursor(tasks[args.limit - 1].id, args.sort, tasks[args.limit].id)
+        print(f'next page: --after {cursor}', file=sys.stderr)
+    return 0
+
+
+def _ids_from(manager: TodoManager, args) -> List[str]:
+    prefixes = list(args.ids)
+    if args.stdin:
+        for line_number, line in enumerate(sys.stdin, 1):
+            line = line.strip()
+            if not line:
+                continue
+            if not line.startswith('{'):
+                prefixes.append(line)
+                continue
+            # NDJSON records with an "id", e.g. from list --json
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as e:
+                raise CliError(f'stdin line {line_number}: {e}')
+            if not isinstance(record, dict) or not isinstance(record.get('id'), str):
+                raise CliError(f'stdin line {line_number}: expected a JSON object with an "id"')
+            prefixes.append(record['id'])
+    if not prefixes:
+        raise CliError('Give task ids or --stdin')
+    return [resolve_id(manager, prefix) for prefix in prefixes]
+
+
+def cmd_complete(manager: TodoManager, args) -> int:
+    ids = _ids_from(manager, args)
+    manager.bulk_update({task_id: {'completed': not args.undo} for task_id in ids})
+    print(f'{len(ids)} task(s) marked {"active" if args.undo else "complete"}')
+    return 0
+
+
+def cmd_delete(manager: TodoManager, args) -> int:
+    ids = _ids_from(manager, args)
+    deleted = manager.bulk_delete(ids)
+    print(f'{deleted} task(s) deleted')
+    return 0
+
+
+def _parse_day(value: str) -> datetime:
+    try:
+        return datetime.combine(datetime.fromisoformat(value).date(), datetime.min.time())
+    except ValueError:
+        raise CliError(f'Invalid date {value!r}; use YYYY-MM-DD')
+
+
+def cmd_query(manager: TodoManager, args) -> int:
+    if args.overdue:
+        tasks = manager.get_overdue_tasks()
+    elif args.today:
+        tasks = manager.get_tasks_due_today()
+    elif args.week:
+        tasks = manager.get_tasks_due_this_week()
+    elif args.due_from or args.due_to:
+        start = _parse_day(args.due_from).timestamp() if args.due_from else None
+        # --due-to is inclusive: everything due on that day counts
+        end = (_parse_day(args.due_to) + timedelta(days=1)).timestamp() if args.due_to else None
+        tasks = manager.get_tasks_due_between(start, end)
+    else:
+        tasks = manager.get_tasks()
+    if args.text:
+        matches = manager.search_ids(' '.join(args.text))
+        tasks = [task for task in tasks if task.id in matches]
+    if args.active:
+        tasks = [task for task in tasks if not task.completed]
+    print_tasks(manager, tasks, args.json)
+    return 0
+
+
+def cmd_stats(manager: TodoManager, args) -> int:
+    tasks = manager.tasks_view().values()
+    total = manager.count_tasks()
+    completed = manager.count_tasks(filter_completed=True)
+    stats = {
+        'total': total,
+        'active': total - completed,
+        'completed': completed,
+        'overdue': len(manager.get_overdue_tasks()),
+        'due_today': len(manager.get_tasks_due_today()),
+        'due_this_week': len(manager.get_tasks_due_this_week()),
+        'by_category': dict(Counter(task.category or '-' for task in tasks).most_common()),
+        'by_priority': {str(p): n for p, n in sorted(Counter(task.priority for task in tasks).items(),
+                                                      key=lambda item: (item[0] is None, item[0] or 0))},
+    }
+    if args.json:
+        print(json.dumps(stats))
+        return 0
+    for key in ('total', 'active', 'completed', 'overdue', 'due_today', 'due_this_week'):
+        print(f'{key.replace("_", " "):<14} {stats[key]}')
+    print('by category')
+    for category, n in stats['by_category'].items():
+        print(f'  {category:<20} {n}')
+    print('by priority')
+    for priority, n in stats['by_priority'].items():
+        print(f'  {priority:<20} {n}')
+    return 0
+
+
+def cmd_archive(manager: TodoManager, args) -> int:
+    if args.show:
+        if args.show not in manager.archive.segments():
+            raise CliError(f'No archive segment {args.show}')
+        print_tasks(manager, manager.archived_tasks(args.show), args.json)
+        return 0
+    if args.list:
+        for segment in manager.archive.segments():
+            print(segment)
+        return 0
+    archived = manager.archive_completed(args.days)
+    print(f'{archived} completed task(s) archived')
+    return 0
+
+
+def check_operations(operations: List[dict], source: str = 'stdin line'):
+    """Raise CliError for an operation that cannot apply whatever the tasks are (see apply_operations)."""
+    for number, operation in enumerate(operations, 1):
+        kind = operation.get('op') if isinstance(operation, dict) else None
+        if kind not in ('add', 'update', 'complete', 'delete'):
+            raise CliError(f'{source} {number}: unknown op {kind!r}')
+        if kind != 'add' and (not isinstance(operation.get('id'), str) or not operation['id']):
+            raise CliError(f'{source} {number}: {kind} needs an "id"')
+
+
+def apply_operations(manager: TodoManager, operations: List[dict], source: str = 'stdin line') -> Counter:
+    """Apply batch operations in one transaction; returns how many of each kind ran.
+
+    Each operation is ``{"op": "add", "title": ...}``, ``{"op": "update",
+    "id": ..., "changes": {...}}``, ``{"op": "complete", "id": ...}`` or
+    ``{"op": "delete", "id": ...}``. Nothing is written unless every
+    operation applies.
+    """
+    check_operations(operations, source)
+    counts = Counter()
+    with manager.transaction():
+        for number, operation in enumerate(operations, 1):
+            kind = operation['op']
+            try:
+                if kind == 'add':
+                    manager.add_task(**task_fields({k: v for k, v in operation.items() if k != 'op'}))
+                else:
+                    task_id = resolve_id(manager, operation['id'])
+                    if kind == 'update':
+                        manager.update_task(task_id, **task_fields(operation.get('changes', {})))
+                    elif kind == 'complete':
+                        manager.update_task(task_id, completed=True)
+                    else:
+                        manager.delete_task(task_id)
+            except CliError as e:
+                raise CliError(f'{source} {number}: {e}')
+            counts[kind] += 1
+    return counts
+
+
+def cmd_batch(manager: TodoManager, args) -> int:
+    """Apply NDJSON operations from stdin as one transaction (see apply_operations)."""
+    counts = apply_operations(manager, list(read_ndjson(sys.stdin)))
+    print(', '.join(f'{n} {kind}' for kind, n in counts.items()) or 'nothing to do')
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog='python -m app.cli', description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--data', default='data/tasks.json', help='tasks file (default: %(default)s)')
+    parser.add_argument('--storage', default=os.environ.get('TODO_STORAGE', 'json'),
+                        choices=['json', 'journal', 'sqlite', 'binary'])
+    output = argparse.ArgumentParser(add_help=False)
+    output.add_argument('--json', action='store_true', help='print tasks (or stats) as JSON')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    add = commands.add_parser('add', parents=[output], help='add a task, or many from NDJSON on stdin')
+    add.add_argument('title', nargs='?')
+    add.add_argument('--priority', type=int)
+    add.add_argument('--category')
+    add.add_argument('--due', help='due date, YYYY-MM-DD')
+    add.add_argument('--repeat', metavar='RULE',
+                     help='e.g. daily, weekly, "every 3 days", "monthly until 2026-12-31", "weekly count 10"')
+    add.add_argument('--stdin', action='store_true', help='read one task object per line')
+    add.set_defaults(handler=cmd_add)
+
+    listing = commands.add_parser('list', parents=[output], help='list tasks')
+    state = listing.add_mutually_exclusive_group()
+    state.add_argument('--active', action='store_true')
+    state.add_argument('--completed', action='store_true')
+    listing.add_argument('--category')
+    listing.add_argument('--priority', type=int)
+    listing.add_argument('--search', help='words the title or category must start with')
+    listing.add_argument('--sort', choices=SORT_FIELDS)
+    listing.add_argument('--desc', action='store_true')
+    listing.add_argument('--limit', type=int, help='print at most this many tasks')
+    listing.add_argument('--after', metavar='ID', help='start after this task, or at the cursor printed for the next page')
+    listing.set_defaults(handler=cmd_list)
+
+    for name, handler, help_text in (('complete', cmd_complete, 'mark tasks complete'),
+                                     ('delete', cmd_delete, 'delete tasks')):
+        command = commands.add_parser(name, parents=[output], help=help_text)
+        command.add_argument('ids', nargs='*', help='task ids or unique id prefixes')
+        command.add_argument('--stdin', action='store_true', help='also read ids (or NDJSON records) from stdin')
+        if name == 'complete':
+            command.add_argument('--undo', action='store_true', help='mark active again instead')
+        command.set_defaults(handler=handler)
+
+    query = commands.add_parser('query', parents=[output], help='tasks by due date and/or text')
+    query.add_argument('text', nargs='*')
+    when = query.add_mutually_exclusive_group()
+    when.add_argument('--overdue', action='store_true')
+    when.add_argument('--today', action='store_true')
+    when.add_argument('--week', action='store_true', help='due from today through Sunday')
+    when.add_argument('--due-from', metavar='DATE')
+    query.add_argument('--due-to', metavar='DATE')
+    query.add_argument('--active', action='store_true')
+    query.set_defaults(handler=cmd_query)
+
+    stats = commands.add_parser('stats', parents=[output], help='counts by state, due date, category and priority')
+    stats.set_defaults(handler=cmd_stats)
+
+    batch = commands.add_parser('batch', parents=[output], help='apply NDJSON operations from stdin with one write')
+    batch.set_defaults(handler=cmd_batch)
+
+    archive = commands.add_parser('archive', parents=[output],
+                                  help='move old completed tasks to compressed monthly archive files')
+    archive.add_argument('--days', type=float, default=30,
+                         help='archive tasks completed more than this many days ago (default: %(default)s)')
+    archive.add_argument('--list', action='store_true', help='list the archive segments, newest first')
+    archive.add_argument('--show', metavar='YYYY-MM', help='print the tasks archived in one segment')
+    archive.set_defaults(handler=cmd_archive)
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    try:
+        manager = open_manager(args)
+    except OSError as e:
+        print(f'error: {e}', file=sys.stderr)
+        return 1
+    try:
+        return args.handler(manager, args)
+    except CliError as e:
+        print(f'error: {e}', file=sys.stderr)
+        return 1
+    finally:
+        manager.close()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
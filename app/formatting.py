@@ -0,0 +1,74 @@
+from datetime import datetime
+from typing import Dict, Iterable, Optional, Tuple
+
+# (values, tags) as handed to the Treeview
+Row = Tuple[tuple, tuple]
+
+def parse_due_date(due_date: Optional[str]) -> Optional[Tuple[float, str]]:
+    """Parse a stored due date into (timestamp, display label).
+
+    Returns None when the value is missing or not an ISO date.
+    """
+    if not due_date:
+        return None
+    try:
+        due = datetime.fromisoformat(due_date)
+    except (TypeError, ValueError):
+        return None
+    return due.timestamp(), due.strftime("%b %d, %Y")
+
+def format_task_row(task, due_label: Optional[str], overdue: bool) -> Row:
+    """Build the (values, tags) pair a task is displayed with"""
+    status = "✓" if task.completed else "◯"
+    priority = "★" * task.priority if task.priority else "☆"
+
+    due_date = due_label or ""
+    # Highlight overdue tasks
+    if overdue:
+        due_date += " (Overdue)"
+    # Mark recurring tasks
+    if task.recurrence and due_date:
+        due_date += " ↻"
+
+    tags = ("completed" if task.completed else "active",)
+    if task.priority and task.priority >= 4:
+        tags += ("high-priority",)
+
+    values = (
+        task.title,
+        status,
+        priority,
+        task.category or "-",
+        due_date or "-"
+    )
+    return values, tags
+
+class RowCache:
+    """Rendered rows per task, reused until the task changes.
+
+    Due dates come pre-parsed from the manager's due index, so building a
+    row needs no date parsing; the only per-refresh work for a cached row is
+    checking whether it has become overdue since it was rendered.
+    """
+
+    def __init__(self, todo_manager):
+        self.todo_manager = todo_manager
+        self._rows: Dict[str, Tuple[bool, Row]] = {}
+
+    def row(self, task, now: float) -> Row:
+        info = self.todo_manager.due_info(task.id)
+        overdue = info is not None and not task.completed and info[0] < now
+        cached = self._rows.get(task.id)
+        if cached is not None and cached[0] == overdue:
+            return cached[1]
+        label = info[1] if info is not None else task.due_date
+        row = format_task_row(task, label, overdue)
+        self._rows[task.id] = (overdue, row)
+        return row
+
+    def invalidate(self, task_ids: Iterable[str]):
+        for task_id in task_ids:
+            self._rows.pop(task_id, None)
+
+    def clear(self):
+        self._rows.clear()
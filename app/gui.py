@@ -1,19 +1,132 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, simpledialog
-from typing import Callable, Optional
+from typing import Callable, Dict, Optional
+import threading
+import time
 from datetime import datetime
+from . import perf
+from .formatting import RowCache, format_task_row, parse_due_date
+from .recurrence import parse_rule
+from .reminders import ReminderScheduler
 from .todo_manager import Task, TodoManager
-from .styles import configure_styles
+from .styles import configure_dialog_styles, configure_styles
+
+# Above this many rows the task list switches to virtual (windowed) mode,
+# where only the visible rows plus a small buffer exist as Tk items.
+VIRTUAL_THRESHOLD = 5000
+VIRTUAL_BUFFER_ROWS = 2
+
+# Progressive loading: tasks read per event-loop turn, and how often (in
+# seconds) the list is redrawn while the rest is still arriving
+LOAD_CHUNK_SIZE = 5000
+LOAD_REDRAW_INTERVAL = 0.5
+# Pause after the last keystroke before the search runs
+SEARCH_DELAY_MS = 250
+# How often to check whether another instance has saved changes
+STORAGE_POLL_MS = 2000
+# Finish startup even if the window never reports being drawn (e.g. it
+# starts minimized)
+FIRST_PAINT_TIMEOUT_MS = 1000
+# How often old completed tasks are moved to the archive (when enabled)
+ARCHIVE_INTERVAL_MS = 60 * 60 * 1000
+# How long a reminder notification stays up, and how many titles it lists
+NOTIFICATION_MS = 10000
+NOTIFICATION_TITLES = 5
 
 class TodoAppGUI:
-    def __init__(self, root: tk.Tk, todo_manager: TodoManager):
+    def __init__(self, root: tk.Tk, todo_manager: TodoManager, virtual: Optional[bool] = None):
         self.root = root
         self.todo_manager = todo_manager
+        self.row_cache = RowCache(todo_manager)
+        # None picks virtual mode automatically based on the row count
+        self.virtual = virtual
         configure_styles()
         self.setup_window()
         self.create_widgets()
-        self.refresh_task_list()
+        # Redraw once per committed change (a whole transaction counts as one)
+        self.todo_manager.add_listener(self.on_tasks_changed)
+        self._loader = None
+        self.reminders = ReminderScheduler(self.root, self.todo_manager, self.on_tasks_due)
+        self._notification = None
+        if self.todo_manager.loaded:
+            self.refresh_task_list()
+        # Menus, shortcuts and loading the tasks wait until the window has
+        # been drawn once, so it appears as early as possible
+        self._started = False
+        self._startup_pending = True
+        self.tree.bind("<Expose>", self._on_first_expose)
+        self.root.after(FIRST_PAINT_TIMEOUT_MS, self.finish_startup)
+
+    def _on_first_expose(self, event):
+        self.tree.unbind("<Expose>")
+        # Tk draws from idle callbacks queued by this event; two idle hops
+        # let that drawing happen first
+        self.root.after_idle(lambda: self.root.after_idle(self.finish_startup))
+
+    def finish_startup(self):
+        """Create what the first frame does without, then start loading tasks"""
+        if self._started:
+            return
+        self._started = True
+        perf.mark("first_paint")
         self.setup_menus()
+        self.create_deferred_widgets()
+        configure_dialog_styles()
+        if self.todo_manager.loaded:
+            self._startup_complete()
+        else:
+            self.start_loading()
+
+    def _startup_complete(self):
+        if self._startup_pending:
+            self._startup_pending = False
+            perf.startup_done()
+            self.root.after(STORAGE_POLL_MS, self._poll_storage)
+            self.reminders.start()
+            if self.todo_manager.archive_after_days is not None:
+                self.root.after_idle(self._archive_old_tasks)
+
+    def _poll_storage(self):
+        # A version check when nothing changed; changed tasks arrive through
+        # on_tasks_changed like local edits
+        try:
+            self.todo_manager.sync_from_storage(blocking=False)
+        except OSError as e:
+            self.status_var.set(f"Could not check for changes: {e}")
+        finally:
+            # Keep polling even if a sync fails in some other way
+            self.root.after(STORAGE_POLL_MS, self._poll_storage)
+
+    @perf.timed("gui.archive")
+    def _archive_old_tasks(self):
+        """Move old completed tasks to the archive, then check again in an hour"""
+        try:
+            archived = self.todo_manager.archive_completed()
+        except OSError as e:
+            self.status_var.set(f"Could not archive completed tasks: {e}")
+        else:
+            if archived:
+                # Loaded segments may have grown; read them again on request
+                self._archived.clear()
+                self._archived_segments = 0
+                self.refresh_task_list()
+                self.status_var.set(f"{archived} old completed tasks archived")
+        finally:
+            self.root.after(ARCHIVE_INTERVAL_MS, self._archive_old_tasks)
+
+    @perf.timed("gui.reload")
+    def reload_from_disk(self):
+        """Pick up changes saved by other instances, then redraw"""
+        if not self._check_loaded():
+            return
+        try:
+            changed = self.todo_manager.sync_from_storage()
+        except OSError as e:
+            messagebox.showerror("Reload Failed", f"Could not read the saved tasks:\n{e}")
+            return
+        self.row_cache.clear()
+        self.refresh_task_list()
+        self.status_var.set(f"Reloaded - {len(changed)} tasks changed on disk" if changed else "Up to date")
 
     def setup_window(self):
         """Configure the main window settings"""
@@ -30,6 +143,22 @@ class TodoAppGUI:
         
         self.root.columnconfigure(0, weight=1)
         self.root.rowconfigure(0, weight=1)
+        
+        # Flush pending writes before the window goes away
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+
+    def on_close(self):
+        """Persist any deferred changes, then close the application"""
+        try:
+            self.todo_manager.flush()
+        except OSError as e:
+            if not messagebox.askyesno(
+                "Save Failed",
+                f"Your latest changes could not be saved:\n{e}\n\nQuit anyway?",
+                icon="warning"
+            ):
+                return
+        self.root.destroy()
 
     def setup_menus(self):
         """Create the application menu bar"""
@@ -39,13 +168,18 @@ class TodoAppGUI:
         file_menu = tk.Menu(menubar, tearoff=0)
         file_menu.add_command(label="New Task", command=self.show_add_task_dialog)
         file_menu.add_separator()
-        file_menu.add_command(label="Exit", command=self.root.quit)
+        file_menu.add_command(label="Exit", command=self.on_close)
         menubar.add_cascade(label="File", menu=file_menu)
         
         # Edit menu
         edit_menu = tk.Menu(menubar, tearoff=0)
+        edit_menu.add_command(label="Undo", accelerator="Ctrl+Z", command=self.undo)
+        edit_menu.add_command(label="Redo", accelerator="Ctrl+Y", command=self.redo)
+        edit_menu.add_separator()
         edit_menu.add_command(label="Edit Task", command=self.show_edit_task_dialog)
         edit_menu.add_command(label="Delete Task", command=self.delete_selected_task)
+        edit_menu.add_separator()
+        edit_menu.add_command(label="Delete Completed Tasks", command=self.delete_completed_tasks)
         menubar.add_cascade(label="Edit", menu=edit_menu)
         
         # View menu
@@ -53,6 +187,10 @@ class TodoAppGUI:
         view_menu.add_radiobutton(label="All Tasks", variable=self.filter_var, value="all", command=self.refresh_task_list)
         view_menu.add_radiobutton(label="Active Only", variable=self.filter_var, value="active", command=self.refresh_task_list)
         view_menu.add_radiobutton(label="Completed Only", variable=self.filter_var, value="completed", command=self.refresh_task_list)
+        view_menu.add_separator()
+        view_menu.add_radiobutton(label="Overdue", variable=self.filter_var, value="overdue", command=self.refresh_task_list)
+        view_menu.add_radiobutton(label="Due Today", variable=self.filter_var, value="today", command=self.refresh_task_list)
+        view_menu.add_radiobutton(label="Due This Week", variable=self.filter_var, value="week", command=self.refresh_task_list)
         menubar.add_cascade(label="View", menu=view_menu)
         
         self.root.config(menu=menubar)
@@ -94,10 +232,21 @@ class TodoAppGUI:
         refresh_button = ttk.Button(
             button_frame,
             text="⟳ Refresh",
-            command=self.refresh_task_list
+            command=self.reload_from_disk
         )
         refresh_button.pack(side="left")
 
+        # Search box, filtering the list as you type
+        search_frame = ttk.Frame(header_frame)
+        search_frame.pack(side="right", padx=(0, 20))
+        ttk.Label(search_frame, text="Search:").pack(side="left", padx=(0, 5))
+        self.search_var = tk.StringVar()
+        self.search_entry = ttk.Entry(search_frame, textvariable=self.search_var, width=30)
+        self.search_entry.pack(side="left")
+        self.search_entry.bind("<Escape>", lambda e: self.search_var.set(""))
+        self._search_after = None
+        self.search_var.trace_add("write", lambda *args: self._schedule_search())
+
         # Task list container
         self.task_list_frame = ttk.Frame(main_frame, style="Card.TFrame")
         self.task_list_frame.grid(row=1, column=0, sticky="nsew")
@@ -113,12 +262,23 @@ class TodoAppGUI:
             style="Treeview"
         )
         
-        # Configure columns
-        self.tree.heading("title", text="Task", anchor="w")
-        self.tree.heading("completed", text="Status", anchor="center")
-        self.tree.heading("priority", text="Priority", anchor="center")
-        self.tree.heading("category", text="Category", anchor="center")
-        self.tree.heading("due_date", text="Due Date", anchor="center")
+        # Configure columns; clicking a heading sorts by it
+        self.sort_column = None
+        self.sort_descending = False
+        self._headings = {
+            "title": "Task",
+            "completed": "Status",
+            "priority": "Priority",
+            "category": "Category",
+            "due_date": "Due Date",
+        }
+        for column, text in self._headings.items():
+            self.tree.heading(
+                column,
+                text=text,
+                anchor="w" if column == "title" else "center",
+                command=lambda c=column: self.sort_by_column(c)
+            )
         
         self.tree.column("title", width=300, anchor="w")
         self.tree.column("completed", width=100, anchor="center")
@@ -127,40 +287,54 @@ class TodoAppGUI:
         self.tree.column("due_date", width=150, anchor="center")
 
         # Add scrollbar
-        scrollbar = ttk.Scrollbar(
+        self.scrollbar = ttk.Scrollbar(
             self.task_list_frame,
             orient="vertical",
             command=self.tree.yview,
             style="TScrollbar"
         )
-        self.tree.configure(yscrollcommand=scrollbar.set)
+        self.tree.configure(yscrollcommand=self.scrollbar.set)
         
         self.tree.grid(row=0, column=0, sticky="nsew")
-        scrollbar.grid(row=0, column=1, sticky="ns")
+        self.scrollbar.grid(row=0, column=1, sticky="ns")
+        
+        # Row colors by tag
+        self.tree.tag_configure("completed", foreground="#64748b")
+        self.tree.tag_configure("active", foreground="#1e293b")
+        self.tree.tag_configure("high-priority", background="#fee2e2")
+        self.tree.tag_configure("archived", foreground="#94a3b8")
+        self.tree.tag_configure("occurrence", foreground="#64748b")
+        
+        # task id -> (values, tags) currently shown, and their display order
+        self._rendered = {}
+        self._rendered_order = []
+        
+        # Virtual mode state: ids of every row in the current view, the
+        # first row in the window and the selected task (which may be
+        # scrolled out of the window and so have no Tk item)
+        self._row_ids = []
+        self._row_positions = None
+        self._top = 0
+        self._virtual_active = False
+        self._selected_id = None
+        self._row_height = int(ttk.Style().lookup("Treeview", "rowheight") or 20)
 
-        # Context menu for tasks
-        self.task_menu = tk.Menu(self.root, tearoff=0)
-        self.task_menu.add_command(
-            label="Mark Complete/Incomplete",
-            command=self.toggle_selected_task
-        )
-        self.task_menu.add_command(
-            label="Edit Task",
-            command=self.show_edit_task_dialog
-        )
-        self.task_menu.add_command(
-            label="Delete Task",
-            command=self.delete_selected_task
-        )
+        # Archived tasks shown below the completed ones, read one segment
+        # (month) at a time on request
+        self._archived: Dict[str, Task] = {}
+        self._archived_segments = 0
+        # Later occurrences of recurring tasks in the due-date views, by row
+        # id ("<task id>@<date>"); generated for the shown window only
+        self._occurrences: Dict[str, tuple] = {}
 
-        # Bind right-click to show context menu
-        self.tree.bind("<Button-3>", self.show_context_menu)
-        # Bind double-click to toggle completion
-        self.tree.bind("<Double-1>", lambda e: self.toggle_selected_task())
-        # Bind keyboard shortcuts
-        self.root.bind("<Control-n>", lambda e: self.show_add_task_dialog())
-        self.root.bind("<Delete>", lambda e: self.delete_selected_task())
-        self.root.bind("<F5>", lambda e: self.refresh_task_list())
+        # Track selection by task identity and drive scrolling in virtual mode
+        self.tree.bind("<<TreeviewSelect>>", self._on_tree_select)
+        self.tree.bind("<Configure>", lambda e: self._render_window() if self._virtual_active else None)
+        self.tree.bind("<MouseWheel>", self._on_mouse_wheel)
+        self.tree.bind("<Button-4>", self._on_mouse_wheel)
+        self.tree.bind("<Button-5>", self._on_mouse_wheel)
+        self.tree.bind("<Up>", lambda e: self._on_virtual_key(-1))
+        self.tree.bind("<Down>", lambda e: self._on_virtual_key(1))
 
         # Filter controls
         filter_frame = ttk.Frame(main_frame)
@@ -193,6 +367,37 @@ class TodoAppGUI:
             value="completed",
             command=self.refresh_task_list
         ).pack(side="left", padx=10)
+        
+        ttk.Radiobutton(
+            filter_frame,
+            text="Overdue",
+            variable=self.filter_var,
+            value="overdue",
+            command=self.refresh_task_list
+        ).pack(side="left", padx=10)
+        
+        ttk.Radiobutton(
+            filter_frame,
+            text="Due Today",
+            variable=self.filter_var,
+            value="today",
+            command=self.refresh_task_list
+        ).pack(side="left", padx=10)
+        
+        ttk.Radiobutton(
+            filter_frame,
+            text="Due This Week",
+            variable=self.filter_var,
+            value="week",
+            command=self.refresh_task_list
+        ).pack(side="left", padx=10)
+
+        # Only shown in the completed view
+        self.archive_button = ttk.Button(
+            filter_frame,
+            text="Show Archived",
+            command=self.load_archived_segment
+        )
 
         # Status bar
         self.status_var = tk.StringVar(value="Ready")
@@ -205,63 +410,443 @@ class TodoAppGUI:
         )
         status_bar.grid(row=3, column=0, sticky="ew", pady=(20, 0))
 
+        # Latency of the last operation, shown only while instrumenting
+        if perf.enabled():
+            self.perf_var = tk.StringVar()
+            ttk.Label(main_frame, textvariable=self.perf_var, padding=(10, 5)).grid(
+                row=3, column=0, sticky="e", pady=(20, 0)
+            )
+            perf.add_listener(self._show_latency)
+
+    def create_deferred_widgets(self):
+        """Context menu and shortcuts, created after the first frame"""
+        # Context menu for tasks
+        self.task_menu = tk.Menu(self.root, tearoff=0)
+        self.task_menu.add_command(
+            label="Mark Complete/Incomplete",
+            command=self.toggle_selected_task
+        )
+        self.task_menu.add_command(
+            label="Edit Task",
+            command=self.show_edit_task_dialog
+        )
+        self.task_menu.add_command(
+            label="Delete Task",
+            command=self.delete_selected_task
+        )
+
+        # Bind right-click to show context menu
+        self.tree.bind("<Button-3>", self.show_context_menu)
+        # Bind double-click to toggle completion
+        self.tree.bind("<Double-1>", lambda e: self.toggle_selected_task())
+        # Bind keyboard shortcuts
+        self.root.bind("<Control-n>", lambda e: self.show_add_task_dialog())
+        self.root.bind("<Delete>", self._on_delete_key)
+        self.root.bind("<F5>", lambda e: self.reload_from_disk())
+        self.root.bind("<Control-f>", lambda e: self.search_entry.focus_set())
+        self.root.bind("<Control-z>", lambda e: self._on_history_key(e, self.undo))
+        self.root.bind("<Control-y>", lambda e: self._on_history_key(e, self.redo))
+        self.root.bind("<Control-Z>", lambda e: self._on_history_key(e, self.redo))
+
+    @perf.timed("gui.refresh_task_list")
     def refresh_task_list(self):
         """Refresh the task list display based on current filter"""
-        # Clear current items
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-        
-        # Get tasks based on filter
+        # Get tasks based on filter; the index views come lazily and only
+        # their ids are kept
         filter_value = self.filter_var.get()
+        query = self.search_var.get().strip()
+        sort = dict(sort_by=self.sort_column, descending=self.sort_descending)
         if filter_value == "all":
-            tasks = self.todo_manager.get_tasks()
-            self.status_var.set(f"Showing all tasks - {len(tasks)} total")
+            tasks = self.todo_manager.iter_tasks(query=query, **sort)
+            status = "Showing all tasks - {} total"
         elif filter_value == "active":
-            tasks = self.todo_manager.get_tasks(filter_completed=False)
-            self.status_var.set(f"Showing active tasks - {len(tasks)} remaining")
+            tasks = self.todo_manager.iter_tasks(filter_completed=False, query=query, **sort)
+            status = "Showing active tasks - {} remaining"
+        elif filter_value == "overdue":
+            tasks = self._matching(self.todo_manager.get_overdue_tasks(), query)
+            status = "Showing overdue tasks - {} overdue"
+        elif filter_value == "today":
+            tasks = self._matching(self.todo_manager.get_tasks_due_today(), query)
+            status = "Showing tasks due today - {} due"
+        elif filter_value == "week":
+            tasks = self._matching(self.todo_manager.get_tasks_due_this_week(), query)
+            status = "Showing tasks due this week - {} due"
         else:  # completed
-            tasks = self.todo_manager.get_tasks(filter_completed=True)
-            self.status_var.set(f"Showing completed tasks - {len(tasks)} done")
-        
-        # Add tasks to treeview with appropriate tags
-        for task in tasks:
-            status = "✓" if task.completed else "◯"
-            priority = "★" * task.priority if task.priority else "☆"
-            
-            # Format due date if exists
-            due_date = ""
-            if task.due_date:
-                try:
-                    due_date_obj = datetime.fromisoformat(task.due_date)
-                    due_date = due_date_obj.strftime("%b %d, %Y")
-                    
-                    # Highlight overdue tasks
-                    if not task.completed and due_date_obj < datetime.now():
-                        due_date += " (Overdue)"
-                except:
-                    due_date = task.due_date
-            
-            # Insert task with appropriate tags
-            tags = ("completed" if task.completed else "active",)
-            if task.priority and task.priority >= 4:
-                tags += ("high-priority",)
-            
-            self.tree.insert(
-                "", "end",
-                values=(
-                    task.title,
-                    status,
-                    priority,
-                    task.category or "-",
-                    due_date or "-"
-                ),
-                tags=tags
-            )
+            tasks = self.todo_manager.iter_tasks(filter_completed=True, query=query, **sort)
+            status = "Showing completed tasks - {} done"
+        if self.sort_column is not None and filter_value in ("overdue", "today", "week"):
+            tasks = self.todo_manager.sort_tasks(tasks, self.sort_column, self.sort_descending)
         
-        # Configure tag colors
-        self.tree.tag_configure("completed", foreground="#64748b")
-        self.tree.tag_configure("active", foreground="#1e293b")
-        self.tree.tag_configure("high-priority", background="#fee2e2")
+        self._row_ids = [task.id for task in tasks]
+        self._occurrences = {}
+        if filter_value in ("today", "week"):
+            self._add_occurrences(filter_value, query)
+        self._update_archive_button(filter_value)
+        if filter_value == "completed" and self._archived:
+            self._row_ids += self._archived_matching(query)
+            status += f" ({len(self._archived)} archived loaded)"
+        self._row_positions = None
+        status = status.format(len(self._row_ids))
+        if query:
+            status += f" matching \"{query}\""
+        self.status_var.set(status)
+        virtual = self.virtual if self.virtual is not None else len(self._row_ids) > VIRTUAL_THRESHOLD
+        self._set_virtual(virtual)
+        if virtual:
+            self._render_window()
+        else:
+            now = time.time()
+            with perf.timer("gui.format_rows"):
+                rows = [(task_id, self._row(task_id, now)) for task_id in self._row_ids]
+            self.apply_rows(rows)
+
+    def _add_occurrences(self, filter_value: str, query: str):
+        """Add rows for the recurring tasks' later occurrences in the view's window"""
+        manager = self.todo_manager
+        window = manager.today_window() if filter_value == "today" else manager.week_window()
+        occurrences = manager.get_occurrences_between(*window)
+        if query:
+            matches = manager.search_ids(query)
+            occurrences = [(task, due) for task, due in occurrences if task.id in matches]
+        if not occurrences:
+            return
+        rows = [(manager.get_task(task_id), manager.due_info(task_id)[0], task_id) for task_id in self._row_ids]
+        for task, due in occurrences:
+            row_id = f"{task.id}@{datetime.fromtimestamp(due).date().isoformat()}"
+            self._occurrences[row_id] = (task, due)
+            rows.append((task, due, row_id))
+        if self.sort_column is None:
+            # Stable, so tasks due at the same time keep their order
+            rows.sort(key=lambda row: row[1])
+        else:
+            # Merged in with the keys the column sort used for the tasks
+            rows = manager.sort_occurrences(rows, self.sort_column, self.sort_descending)
+        self._row_ids = [row_id for _, _, row_id in rows]
+
+    def _row(self, task_id: str, now: float):
+        """(values, tags) for a hot or an archived task, or an occurrence"""
+        task = self.todo_manager.get_task(task_id)
+        if task is not None:
+            return self.row_cache.row(task, now)
+        occurrence = self._occurrences.get(task_id)
+        if occurrence is not None:
+            task, due = occurrence
+            label = datetime.fromtimestamp(due).strftime("%b %d, %Y")
+            values, tags = format_task_row(task, label, False)
+            # Only the next occurrence can be completed
+            values = (values[0], "", *values[2:])
+            return values, tags + ("occurrence",)
+        task = self._archived[task_id]
+        info = parse_due_date(task.due_date)
+        values, tags = format_task_row(task, info[1] if info is not None else task.due_date, False)
+        return values, tags + ("archived",)
+
+    def _archived_matching(self, query: str):
+        """Ids of the loaded archived tasks (not back in the hot data) matching the query"""
+        query = query.lower()
+        tasks = self.todo_manager.tasks
+        return [
+            task_id for task_id, task in self._archived.items()
+            if task_id not in tasks
+            and (not query or query in task.title.lower() or query in (task.category or "").lower())
+        ]
+
+    def _update_archive_button(self, filter_value: str):
+        """Offer the next archive segment while the completed view is shown"""
+        segments = self.todo_manager.archive.segments() if filter_value == "completed" else []
+        if self._archived_segments < len(segments):
+            self.archive_button.configure(text=f"Show Archived ({segments[self._archived_segments]})")
+            if not self.archive_button.winfo_manager():
+                self.archive_button.pack(side="right", padx=10)
+        else:
+            self.archive_button.pack_forget()
+
+    @perf.timed("gui.load_archived")
+    def load_archived_segment(self):
+        """Read the next older archive segment into the completed view"""
+        segments = self.todo_manager.archive.segments()
+        if self._archived_segments >= len(segments):
+            return
+        try:
+            tasks = self.todo_manager.archived_tasks(segments[self._archived_segments])
+        except OSError as e:
+            messagebox.showerror("Archive Unavailable", f"Could not read the archive:\n{e}")
+            return
+        self._archived_segments += 1
+        self._archived.update((task.id, task) for task in tasks)
+        self.refresh_task_list()
+
+    @perf.timed("gui.apply_rows")
+    def apply_rows(self, rows):
+        """Bring the Treeview in line with ``rows`` using as few Tk calls as possible.
+
+        ``rows`` is the desired ordered list of ``(task_id, (values, tags))``.
+        Rows that disappeared are deleted, new ones inserted in place and
+        existing ones reconfigured only when what they display changed.
+        """
+        wanted = dict(rows)
+        removed = [item for item in self._rendered if item not in wanted]
+        if removed:
+            self.tree.delete(*removed)
+            for item in removed:
+                del self._rendered[item]
+        
+        # Surviving rows keep their relative order unless the ordering of the
+        # model itself changed; only then do they need moving.
+        surviving = [item for item, _ in rows if item in self._rendered]
+        if surviving != [item for item in self._rendered_order if item in wanted]:
+            for position, item in enumerate(surviving):
+                self.tree.move(item, "", position)
+            perf.count("tk.move", len(surviving))
+        
+        inserted = updated = 0
+        for position, (item, row) in enumerate(rows):
+            rendered = self._rendered.get(item)
+            if rendered is None:
+                values, tags = row
+                self.tree.insert("", position, iid=item, values=values, tags=tags)
+                inserted += 1
+            elif rendered != row:
+                values, tags = row
+                self.tree.item(item, values=values, tags=tags)
+                updated += 1
+            self._rendered[item] = row
+        self._rendered_order = [item for item, _ in rows]
+        perf.count("tk.delete", len(removed))
+        perf.count("tk.insert", inserted)
+        perf.count("tk.item", updated)
+
+    def _set_virtual(self, enabled: bool):
+        """Switch the scrollbar between Treeview scrolling and window scrolling"""
+        if enabled == self._virtual_active:
+            return
+        self._virtual_active = enabled
+        if enabled:
+            self.tree.configure(yscrollcommand="")
+            self.scrollbar.configure(command=self._on_virtual_scroll)
+            self.tree.yview_moveto(0)
+        else:
+            self.tree.configure(yscrollcommand=self.scrollbar.set)
+            self.scrollbar.configure(command=self.tree.yview)
+
+    def _visible_rows(self) -> int:
+        """Number of rows that fit in the Treeview (minus the heading row)"""
+        return max(1, self.tree.winfo_height() // self._row_height - 1)
+
+    def _render_window(self):
+        """Materialize only the rows currently scrolled into view"""
+        total = len(self._row_ids)
+        visible = self._visible_rows()
+        self._top = max(0, min(self._top, total - visible))
+        window = self._row_ids[self._top:self._top + visible + VIRTUAL_BUFFER_ROWS]
+        now = time.time()
+        self.apply_rows([(task_id, self._row(task_id, now)) for task_id in window])
+        self.tree.yview_moveto(0)
+        if total:
+            self.scrollbar.set(self._top / total, min(1.0, (self._top + visible) / total))
+        else:
+            self.scrollbar.set(0, 1)
+        if self._selected_id in self._rendered and self.tree.selection() != (self._selected_id,):
+            self.tree.selection_set(self._selected_id)
+
+    def _on_virtual_scroll(self, *args):
+        """Scrollbar command in virtual mode ("moveto f" or "scroll n units|pages")"""
+        if args[0] == "moveto":
+            self._top = int(float(args[1]) * len(self._row_ids))
+        elif args[0] == "scroll":
+            amount = int(args[1])
+            self._top += amount * self._visible_rows() if args[2] == "pages" else amount
+        self._render_window()
+
+    def _on_mouse_wheel(self, event):
+        """Scroll the window ourselves so the Treeview never scrolls internally"""
+        if not self._virtual_active:
+            return None
+        self._top += -3 if (event.num == 4 or event.delta > 0) else 3
+        self._render_window()
+        return "break"
+
+    def _on_virtual_key(self, step: int):
+        """Move the selection with the arrow keys, scrolling the window along"""
+        if not self._virtual_active or not self._row_ids:
+            return None
+        if self._row_positions is None:
+            self._row_positions = {task_id: i for i, task_id in enumerate(self._row_ids)}
+        position = self._row_positions.get(self._selected_id, -1) + step
+        position = max(0, min(position, len(self._row_ids) - 1))
+        self._selected_id = self._row_ids[position]
+        visible = self._visible_rows()
+        if position < self._top:
+            self._top = position
+        elif position >= self._top + visible:
+            self._top = position - visible + 1
+        self._render_window()
+        self.tree.focus(self._selected_id)
+        return "break"
+
+    def _on_tree_select(self, event):
+        selected = self.tree.selection()
+        if selected:
+            self._selected_id = selected[0]
+
+    def _show_latency(self, name: str, seconds: float):
+        # Writes from the write-behind thread must not touch Tk
+        if threading.current_thread() is threading.main_thread():
+            self.perf_var.set(f"{name}: {seconds * 1000:.1f} ms")
+
+    @perf.timed("gui.sort")
+    def sort_by_column(self, column: str):
+        """Cycle a column through ascending, descending and unsorted"""
+        if column != self.sort_column:
+            self.sort_column, self.sort_descending = column, False
+        elif not self.sort_descending:
+            self.sort_descending = True
+        else:
+            self.sort_column, self.sort_descending = None, False
+        for name, text in self._headings.items():
+            if name == self.sort_column:
+                text += " ▼" if self.sort_descending else " ▲"
+            self.tree.heading(name, text=text)
+        if self.todo_manager.loaded:
+            self.refresh_task_list()
+
+    def _matching(self, tasks, query: str):
+        """Narrow a due-date view to the tasks matching the search query"""
+        if not query:
+            return tasks
+        matches = self.todo_manager.search_ids(query)
+        return [task for task in tasks if task.id in matches]
+
+    def _schedule_search(self):
+        # Debounce typing: search once the user pauses instead of per keystroke
+        if self._search_after is not None:
+            self.root.after_cancel(self._search_after)
+        self._search_after = self.root.after(SEARCH_DELAY_MS, self._run_search)
+
+    @perf.timed("gui.search")
+    def _run_search(self):
+        self._search_after = None
+        if self.todo_manager.loaded:
+            self.refresh_task_list()
+
+    def _on_delete_key(self, event):
+        # Delete inside the search box edits the text, not the task list
+        if isinstance(event.widget, (tk.Entry, ttk.Entry)):
+            return
+        self.delete_selected_task()
+
+    def _on_history_key(self, event, action):
+        # Leave the search box's own text editing alone
+        if isinstance(event.widget, (tk.Entry, ttk.Entry)):
+            return None
+        action()
+        return "break"
+
+    @perf.timed("gui.undo")
+    def undo(self):
+        """Revert the last change"""
+        if not self._check_loaded():
+            return
+        label = self.todo_manager.undo()
+        self.status_var.set(f"Undone: {label}" if label else "Nothing to undo")
+
+    @perf.timed("gui.redo")
+    def redo(self):
+        """Reapply the last undone change"""
+        if not self._check_loaded():
+            return
+        label = self.todo_manager.redo()
+        self.status_var.set(f"Redone: {label}" if label else "Nothing to redo")
+
+    def start_loading(self):
+        """Load tasks in chunks from the event loop, drawing them as they arrive"""
+        self._loader = self.todo_manager.iter_load_tasks(LOAD_CHUNK_SIZE)
+        self._last_load_redraw = None
+        self.root.after_idle(self._load_next_chunk)
+
+    @perf.timed("gui.load_chunk")
+    def _load_next_chunk(self):
+        try:
+            progress = next(self._loader)
+        except StopIteration:
+            self._loader = None
+            self.refresh_task_list()
+            self._startup_complete()
+            return
+        # Draw the first chunk straight away, then only now and then
+        now = time.monotonic()
+        if self._last_load_redraw is None or now - self._last_load_redraw >= LOAD_REDRAW_INTERVAL:
+            self.refresh_task_list()
+            self._last_load_redraw = now
+        self.status_var.set(
+            f"Loading tasks... {progress:.0%} ({len(self.todo_manager.tasks)} loaded)"
+        )
+        # Let Tk process events before reading the next chunk
+        self.root.after(1, self._load_next_chunk)
+
+    def _check_loaded(self) -> bool:
+        """Changes have to wait until every task has been loaded"""
+        if self.todo_manager.loaded:
+            return True
+        self.status_var.set("Still loading tasks - please wait")
+        return False
+
+    def on_tasks_changed(self, changed_ids):
+        """Manager listener: redraw after each committed transaction"""
+        self.row_cache.invalidate(changed_ids)
+        self.refresh_task_list()
+
+    def on_tasks_due(self, task_ids):
+        """Reminder: redraw the rows that just became overdue and say so"""
+        if self.filter_var.get() == "overdue":
+            # The tasks join the view itself
+            self.refresh_task_list()
+        else:
+            now = time.time()
+            for task_id in task_ids:
+                self._update_row(task_id, now)
+        titles = [self.todo_manager.get_task(task_id).title for task_id in task_ids]
+        message = "\n".join(titles[:NOTIFICATION_TITLES])
+        if len(titles) > NOTIFICATION_TITLES:
+            message += f"\n... and {len(titles) - NOTIFICATION_TITLES} more"
+        self.show_notification("Task due" if len(titles) == 1 else f"{len(titles)} tasks due", message)
+        self.status_var.set(f"Due now: {titles[0]}" if len(titles) == 1 else f"{len(titles)} tasks are now due")
+
+    def _update_row(self, task_id: str, now: float):
+        """Redraw one row if it is currently shown"""
+        rendered = self._rendered.get(task_id)
+        if rendered is None:
+            return
+        row = self._row(task_id, now)
+        if row != rendered:
+            values, tags = row
+            self.tree.item(task_id, values=values, tags=tags)
+            self._rendered[task_id] = row
+
+    def show_notification(self, title: str, message: str):
+        """Show a small notice in the corner of the screen for a few seconds"""
+        if self._notification is not None:
+            self._close_notification(self._notification)
+        notification = self._notification = tk.Toplevel(self.root)
+        notification.overrideredirect(True)
+        notification.attributes("-topmost", True)
+        frame = ttk.Frame(notification, padding=(15, 10), relief="solid")
+        frame.pack(fill="both", expand=True)
+        ttk.Label(frame, text=title, style="Heading.TLabel").pack(anchor="w")
+        ttk.Label(frame, text=message, justify="left").pack(anchor="w", pady=(5, 0))
+        notification.update_idletasks()
+        x = notification.winfo_screenwidth() - notification.winfo_reqwidth() - 20
+        y = notification.winfo_screenheight() - notification.winfo_reqheight() - 60
+        notification.geometry(f"+{x}+{y}")
+        notification.bind("<Button-1>", lambda e: self._close_notification(notification))
+        frame.bind("<Button-1>", lambda e: self._close_notification(notification))
+        self.root.after(NOTIFICATION_MS, lambda: self._close_notification(notification))
+        self.root.bell()
+
+    def _close_notification(self, notification):
+        if self._notification is notification:
+            self._notification = None
+        notification.destroy()
 
     def show_context_menu(self, event):
         """Show context menu for selected task"""
@@ -270,51 +855,71 @@ class TodoAppGUI:
             self.tree.selection_set(item)
             self.task_menu.post(event.x_root, event.y_root)
 
-    def get_selected_task_index(self) -> Optional[int]:
-        """Get the index of the currently selected task"""
+    def get_selected_task_id(self) -> Optional[str]:
+        """Get the id of the currently selected task (Treeview iids are task ids)"""
+        task_id = self._selected_row_id()
+        if task_id is not None and self._is_archived(task_id):
+            self.status_var.set("Archived tasks are read-only")
+            return None
+        return task_id
+
+    def _selected_row_id(self) -> Optional[str]:
         selected = self.tree.selection()
         if selected:
-            item = selected[0]
-            item_index = self.tree.index(item)
-            
-            # Adjust for filter if needed
-            filter_value = self.filter_var.get()
-            if filter_value == "all":
-                return item_index
-            elif filter_value == "active":
-                all_tasks = self.todo_manager.get_tasks(filter_completed=False)
-                task = all_tasks[item_index]
-                return self.todo_manager.get_tasks().index(task)
-            else:  # completed
-                all_tasks = self.todo_manager.get_tasks(filter_completed=True)
-                task = all_tasks[item_index]
-                return self.todo_manager.get_tasks().index(task)
-        return None
+            row_id = selected[0]
+        elif self._virtual_active:
+            # In virtual mode the selected row may be scrolled out of the window
+            row_id = self._selected_id
+        else:
+            return None
+        # A later occurrence stands for its recurring task
+        occurrence = self._occurrences.get(row_id)
+        return occurrence[0].id if occurrence is not None else row_id
 
+    def _is_archived(self, task_id: str) -> bool:
+        return task_id in self._archived and self.todo_manager.get_task(task_id) is None
+
+    @perf.timed("gui.toggle_task")
     def toggle_selected_task(self):
         """Toggle completion status of selected task"""
-        task_index = self.get_selected_task_index()
-        if task_index is not None:
-            self.todo_manager.toggle_task_completion(task_index)
-            self.refresh_task_list()
+        task_id = self.get_selected_task_id()
+        if task_id is not None and self._check_loaded():
+            self.todo_manager.toggle_task_completion(task_id)
             self.status_var.set("Task status updated")
 
+    @perf.timed("gui.delete_task")
     def delete_selected_task(self):
         """Delete the selected task after confirmation"""
-        task_index = self.get_selected_task_index()
-        if task_index is not None:
-            task = self.todo_manager.get_tasks()[task_index]
+        task_id = self.get_selected_task_id()
+        task = self.todo_manager.get_task(task_id) if task_id is not None else None
+        if task is not None and self._check_loaded():
             if messagebox.askyesno(
                 "Confirm Delete",
                 f"Are you sure you want to delete '{task.title}'?",
                 icon="warning"
             ):
-                self.todo_manager.delete_task(task_index)
-                self.refresh_task_list()
+                self.todo_manager.delete_task(task_id)
                 self.status_var.set("Task deleted")
 
+    @perf.timed("gui.delete_completed")
+    def delete_completed_tasks(self):
+        """Delete every completed task in one batch after confirmation"""
+        if not self._check_loaded():
+            return
+        completed = self.todo_manager.count_tasks(filter_completed=True)
+        if completed and messagebox.askyesno(
+            "Confirm Delete",
+            f"Delete all {completed} completed tasks?",
+            icon="warning"
+        ):
+            ids = [task.id for task in self.todo_manager.iter_tasks(filter_completed=True)]
+            deleted = self.todo_manager.bulk_delete(ids)
+            self.status_var.set(f"{deleted} completed tasks deleted")
+
     def show_add_task_dialog(self):
         """Show dialog to add a new task"""
+        if not self._check_loaded():
+            return
         dialog = TaskDialog(
             self.root,
             title="Add New Task",
@@ -323,32 +928,34 @@ class TodoAppGUI:
 
     def show_edit_task_dialog(self):
         """Show dialog to edit selected task"""
-        task_index = self.get_selected_task_index()
-        if task_index is not None:
-            task = self.todo_manager.get_tasks()[task_index]
+        task_id = self.get_selected_task_id()
+        task = self.todo_manager.get_task(task_id) if task_id is not None else None
+        if task is not None:
+            if not self._check_loaded():
+                return
             dialog = TaskDialog(
                 self.root,
                 title="Edit Task",
                 task=task,
-                on_submit=lambda **kwargs: self.update_task(task_index, **kwargs)
+                on_submit=lambda **kwargs: self.update_task(task_id, **kwargs)
             )
-        else:
+        elif self._selected_row_id() is None:
             messagebox.showwarning(
                 "No Task Selected",
                 "Please select a task to edit",
                 parent=self.root
             )
 
+    @perf.timed("gui.add_task")
     def add_task(self, title: str, **kwargs):
         """Add a new task to the list"""
         self.todo_manager.add_task(title, **kwargs)
-        self.refresh_task_list()
         self.status_var.set("New task added")
 
-    def update_task(self, task_index: int, **kwargs):
+    @perf.timed("gui.update_task")
+    def update_task(self, task_id: str, **kwargs):
         """Update an existing task"""
-        self.todo_manager.update_task(task_index, **kwargs)
-        self.refresh_task_list()
+        self.todo_manager.update_task(task_id, **kwargs)
         self.status_var.set("Task updated")
 
 class TaskDialog(tk.Toplevel):
@@ -433,11 +1040,24 @@ class TaskDialog(tk.Toplevel):
         
         self.due_date_entry = ttk.Entry(main_frame)
         self.due_date_entry.grid(
-            row=7, column=0, columnspan=2, sticky="ew", pady=(0, 20))
+            row=7, column=0, columnspan=2, sticky="ew", pady=(0, 15))
+        
+        # Recurrence
+        ttk.Label(main_frame, text="Repeat:", style="Heading.TLabel").grid(
+            row=8, column=0, sticky="w", pady=(0, 5))
+        
+        self.recurrence_var = tk.StringVar()
+        self.recurrence_entry = ttk.Combobox(
+            main_frame,
+            textvariable=self.recurrence_var,
+            values=["", "daily", "weekly", "every 2 weeks", "monthly"]
+        )
+        self.recurrence_entry.grid(
+            row=9, column=0, columnspan=2, sticky="ew", pady=(0, 20))
         
         # Buttons
         button_frame = ttk.Frame(main_frame)
-        button_frame.grid(row=8, column=0, columnspan=2, sticky="e")
+        button_frame.grid(row=10, column=0, columnspan=2, sticky="e")
         
         cancel_button = ttk.Button(
             button_frame,
@@ -463,6 +1083,8 @@ class TaskDialog(tk.Toplevel):
                 self.category_var.set(self.task.category)
             if self.task.due_date:
                 self.due_date_entry.insert(0, self.task.due_date)
+            if self.task.recurrence:
+                self.recurrence_var.set(self.task.recurrence)
 
     def submit(self):
         """Submit the form data"""
@@ -484,11 +1106,21 @@ class TaskDialog(tk.Toplevel):
                 )
                 return
         
+        # Validate the recurrence rule
+        recurrence = self.recurrence_var.get().strip()
+        if recurrence:
+            try:
+                parse_rule(recurrence)
+            except ValueError as e:
+                messagebox.showerror("Invalid Repeat", str(e), parent=self)
+                return
+        
         data = {
             "title": title,
             "priority": self.priority_var.get(),
             "category": self.category_var.get().strip() or None,
-            "due_date": due_date or None
+            "due_date": due_date or None,
+            "recurrence": recurrence or None
         }
         
         if self.on_submit:
@@ -0,0 +1,87 @@
+"""Undo/redo of committed transactions.
+
+Every transaction already knows the inverse of each of its operations (that
+is how a failed write is rolled back), so a history step is just those
+inverses in the order that undoes the transaction: an add is undone by
+deleting one id, an update by writing back the old values of only the
+fields it changed, and a delete by re-adding the deleted task's record at
+the position it had. Undoing a step applies it as a new transaction, so
+only that delta is saved (a re-added task names the task it goes back in
+front of), and the inverses collected while applying it become the redo
+step.
+"""
+from collections import deque
+from dataclasses import dataclass
+from typing import Deque, List, Mapping, Optional, Tuple
+
+# Steps kept per stack, and operations kept across all undo steps; the
+# newest step is always kept, however large
+DEFAULT_LIMIT = 100
+DEFAULT_MAX_OPS = 10_000
+
+
+@dataclass
+class Step:
+    label: str
+    # Operations that revert the step, in the order to apply them
+    ops: List[dict]
+
+
+def describe(txn: List[Tuple[dict, dict]], tasks: Mapping) -> str:
+    """Short label for a transaction, e.g. "Delete 'Pay rent'"."""
+    if len(txn) != 1:
+        return f'{len(txn)} changes'
+    op, inverse = txn[0]
+    if op['op'] == 'add':
+        return f"Add '{op['task']['title']}'"
+    if op['op'] == 'delete':
+        return f"Delete '{inverse['task']['title']}'"
+    title = tasks[op['id']].title
+    if 'completed' in op['changes'] and set(op['changes']) <= {'completed', 'completed_at'}:
+        return f"{'Complete' if op['changes']['completed'] else 'Reopen'} '{title}'"
+    return f"Edit '{title}'"
+
+
+class History:
+    def __init__(self, limit: int = DEFAULT_LIMIT, max_ops: int = DEFAULT_MAX_OPS):
+        self.max_ops = max_ops
+        self._undo: Deque[Step] = deque(maxlen=limit)
+        self._redo: Deque[Step] = deque(maxlen=limit)
+        self._undo_ops = 0
+
+    def record(self, txn: List[Tuple[dict, dict]], label: str):
+        """Remember a committed transaction's (operation, inverse) pairs; a new change drops the redo steps."""
+        self.push_undo(Step(label, [inverse for _, inverse in reversed(txn)]))
+        self._redo.clear()
+
+    def push_undo(self, step: Step):
+        if len(self._undo) == self._undo.maxlen:
+            self._undo_ops -= len(self._undo[0].ops)
+        self._undo.append(step)
+        self._undo_ops += len(step.ops)
+        while self._undo_ops > self.max_ops and len(self._undo) > 1:
+            self._undo_ops -= len(self._undo.popleft().ops)
+
+    def push_redo(self, step: Step):
+        self._redo.append(step)
+
+    def pop_undo(self) -> Optional[Step]:
+        if not self._undo:
+            return None
+        step = self._undo.pop()
+        self._undo_ops -= len(step.ops)
+        return step
+
+    def pop_redo(self) -> Optional[Step]:
+        return self._redo.pop() if self._redo else None
+
+    def undo_label(self) -> Optional[str]:
+        return self._undo[-1].label if self._undo else None
+
+    def redo_label(self) -> Optional[str]:
+        return self._redo[-1].label if self._redo else None
+
+    def clear(self):
+        self._undo.clear()
+        self._redo.clear()
+        self._undo_ops = 0
@@ -0,0 +1,143 @@
+"""Advisory inter-process locking for task files.
+
+A ``FileLock`` on ``<data file>.lock`` serializes writers across
+processes (and threads). The lock file also holds a generation counter
+that every writer increments, so other processes can tell cheaply whether
+the data changed since they last looked.
+"""
+import os
+import threading
+import time
+
+if os.name == 'nt':
+    import msvcrt
+else:
+    import fcntl
+
+# Windows locks byte ranges and keeps other processes from reading a locked
+# range, so lock a byte well past the generation counter
+_LOCK_OFFSET = 1 << 30
+_GENERATION_WIDTH = 20
+
+
+class NullLock:
+    """Stand-in for storages that need no inter-process lock."""
+
+    def acquire(self, blocking: bool = True) -> bool:
+        return True
+
+    def release(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+class FileLock:
+    """Reentrant advisory lock on ``path`` plus the generation counter stored in it."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._thread_lock = threading.RLock()
+        self._depth = 0
+        self._fd = None
+        # Our latest unbroken run of writes, to recognise our own changes
+        # later: every generation in (_run_start, _run_end] was written
+        # through this lock. Two numbers, however long the process runs.
+        self._run_start = 0
+        self._run_end = 0
+
+    def acquire(self, blocking: bool = True) -> bool:
+        if not self._thread_lock.acquire(blocking):
+            return False
+        if self._depth:
+            self._depth += 1
+            return True
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            locked = _lock_fd(fd, blocking)
+        except BaseException:
+            os.close(fd)
+            self._thread_lock.release()
+            raise
+        if not locked:
+            os.close(fd)
+            self._thread_lock.release()
+            return False
+        self._fd = fd
+        self._depth = 1
+        return True
+
+    def release(self):
+        self._depth -= 1
+        if not self._depth:
+            fd, self._fd = self._fd, None
+            try:
+                _unlock_fd(fd)
+            finally:
+                os.close(fd)
+        self._thread_lock.release()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+        return False
+
+    def generation(self) -> int:
+        try:
+            with open(self.path, 'rb') as f:
+                return int(f.read(_GENERATION_WIDTH) or 0)
+        except (FileNotFoundError, ValueError):
+            return 0
+
+    def bump(self) -> int:
+        """Record a write: increment the generation. Call with the lock held."""
+        generation = self.generation()
+        if generation != self._run_end:
+            # Someone else wrote since our last write; a new run starts
+            self._run_start = generation
+        generation += 1
+        # Fixed width, so the counter is rewritten in place by one write
+        os.lseek(self._fd, 0, os.SEEK_SET)
+        os.write(self._fd, b'%0*d' % (_GENERATION_WIDTH, generation))
+        self._run_end = generation
+        return generation
+
+    def written_since(self, generation: int) -> bool:
+        """Whether every write after ``generation`` was made through this lock."""
+        current = self.generation()
+        return current == generation or (current == self._run_end and self._run_start <= generation)
+
+
+if os.name == 'nt':
+    def _lock_fd(fd: int, blocking: bool) -> bool:
+        os.lseek(fd, _LOCK_OFFSET, os.SEEK_SET)
+        while True:
+            try:
+                msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+                return True
+            except OSError:
+                if not blocking:
+                    return False
+                # LK_LOCK gives up after ten seconds; keep waiting instead
+                time.sleep(0.05)
+
+    def _unlock_fd(fd: int):
+        os.lseek(fd, _LOCK_OFFSET, os.SEEK_SET)
+        msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+else:
+    def _lock_fd(fd: int, blocking: bool) -> bool:
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return True
+        except BlockingIOError:
+            return False
+
+    def _unlock_fd(fd: int):
+        fcntl.flock(fd, fcntl.LOCK_UN)
@@ -1,19 +1,57 @@
+import time
+# Startup is measured from here; imports are part of it
+_START = time.perf_counter()
+
+import os
+import sys
 import tkinter as tk
+from app import perf
 from app.todo_manager import TodoManager
+from app.storage import open_storage
 from app.gui import TodoAppGUI
 
-def main():
+def parse_args(argv):
+    # Importing argparse is a measurable slice of startup, so a plain
+    # launch without arguments skips it
+    if not argv:
+        return None
+    import argparse
+    parser = argparse.ArgumentParser(description="To-Do List Application")
+    parser.add_argument("--perf", action="store_true", help="time operations and report on exit")
+    parser.add_argument("--profile", metavar="FILE", help="also profile with cProfile and save the stats to FILE")
+    parser.add_argument("--startup-report", action="store_true",
+                        help="print time to first paint and to loaded tasks against the startup budget")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    perf.set_origin(_START)
+    perf.mark("imports")
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+    if args is not None:
+        if args.perf or args.profile:
+            perf.enable(args.profile)
+        if args.startup_report:
+            perf.request_startup_report()
+
     # Initialize the root window
     root = tk.Tk()
     
     # Initialize the todo manager
-    todo_manager = TodoManager()
+    data_file = 'data/tasks.json'
+    storage = open_storage(data_file, os.environ.get('TODO_STORAGE', 'json'))
+    write_behind = os.environ.get('TODO_WRITE_BEHIND') == '1'
+    # Completed tasks older than this many days go to the archive; 0 keeps them all
+    archive_days = float(os.environ.get('TODO_ARCHIVE_DAYS', '30'))
+    # The GUI loads the tasks itself, progressively, once the window is up
+    todo_manager = TodoManager(data_file, storage=storage, write_behind=write_behind, autoload=False,
+                               archive_after_days=archive_days or None)
     
     # Initialize the GUI
     app = TodoAppGUI(root, todo_manager)
+    perf.mark("window")
     
     # Start the main loop
     root.mainloop()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,210 @@
+"""Optional timers and counters for finding where time goes.
+
+Off by default, in which case every hook is a single flag check. Enable
+it with ``TODO_PERF=1`` (or ``python -m app.main --perf``). Aggregated
+timings are then printed to stderr on exit. ``TODO_PROFILE=out.prof``
+(or ``--profile out.prof``) also runs the whole session under cProfile
+and saves the stats there.
+
+Startup milestones (``mark``) are always recorded, since there are only a
+handful; ``--startup-report`` prints them against STARTUP_BUDGET once the
+tasks have loaded.
+"""
+import atexit
+import functools
+import os
+import sys
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+_enabled = False
+_lock = threading.Lock()
+_local = threading.local()
+# name -> [calls, total seconds, slowest call]
+_timings: Dict[str, List[float]] = {}
+_counters: Dict[str, int] = {}
+_listeners: List[Callable[[str, float], None]] = []
+_profiler = None
+_profile_path: Optional[str] = None
+last: Optional[Tuple[str, float]] = None
+
+# Seconds from the start of app.main to each milestone, and the most each
+# may take; the window should appear well before the tasks finish loading
+STARTUP_BUDGET = {
+    'imports': 0.15,
+    'window': 0.30,
+    'first_paint': 0.50,
+    'tasks_loaded': 2.00,
+}
+_origin = time.perf_counter()
+_marks: List[Tuple[str, float]] = []
+_startup_report = os.environ.get('TODO_STARTUP_REPORT') == '1'
+
+
+def enabled() -> bool:
+    return _enabled
+
+
+def enable(profile_path: Optional[str] = None):
+    """Start collecting; with ``profile_path`` also profile until exit."""
+    global _enabled, _profiler, _profile_path
+    if not _enabled:
+        _enabled = True
+        atexit.register(_report_at_exit)
+    if profile_path and _profiler is None:
+        # Imported here: cProfile and pstats add noticeably to startup
+        import cProfile
+        _profile_path = profile_path
+        _profiler = cProfile.Profile()
+        _profiler.enable()
+
+
+def enable_from_env():
+    if os.environ.get('TODO_PERF') == '1' or os.environ.get('TODO_PROFILE'):
+        enable(os.environ.get('TODO_PROFILE') or None)
+
+
+def add_listener(callback: Callable[[str, float], None]):
+    """Call ``callback(name, seconds)`` whenever an outermost timer finishes."""
+    _listeners.append(callback)
+
+
+class _Timer:
+    __slots__ = ('name', 'start')
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        _local.depth = getattr(_local, 'depth', 0) + 1
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        global last
+        elapsed = time.perf_counter() - self.start
+        _local.depth -= 1
+        with _lock:
+            stats = _timings.get(self.name)
+            if stats is None:
+                stats = _timings[self.name] = [0, 0.0, 0.0]
+            stats[0] += 1
+            stats[1] += elapsed
+            if elapsed > stats[2]:
+                stats[2] = elapsed
+        # Only the outermost timer is a user-visible operation
+        if _local.depth == 0:
+            last = (self.name, elapsed)
+            for callback in _listeners:
+                callback(self.name, elapsed)
+        return False
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+def timer(name: str):
+    """Context manager timing its block under ``name``."""
+    return _Timer(name) if _enabled else _NULL_TIMER
+
+
+def timed(name: str):
+    """Decorator timing every call of the function under ``name``."""
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            with _Timer(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def count(name: str, n: int = 1):
+    if _enabled:
+        with _lock:
+            _counters[name] = _counters.get(name, 0) + n
+
+
+def report() -> str:
+    """Aggregated timings (slowest total first) and counters as text."""
+    with _lock:
+        timings = sorted(_timings.items(), key=lambda item: item[1][1], reverse=True)
+        counters = sorted(_counters.items())
+    lines = [f'{"timer":<36} {"calls":>8} {"total ms":>12} {"mean ms":>10} {"max ms":>10}']
+    for name, (calls, total, slowest) in timings:
+        lines.append(f'{name:<36} {calls:>8} {total * 1000:>12.2f} {total / calls * 1000:>10.3f} {slowest * 1000:>10.3f}')
+    if counters:
+        lines.append('')
+        lines.append(f'{"counter":<36} {"count":>8}')
+        lines.extend(f'{name:<36} {value:>8}' for name, value in counters)
+    return '\n'.join(lines)
+
+
+def set_origin(origin: float):
+    """Measure startup milestones from ``origin`` (a perf_counter value)."""
+    global _origin
+    _origin = origin
+
+
+def mark(name: str):
+    _marks.append((name, time.perf_counter() - _origin))
+
+
+def request_startup_report():
+    global _startup_report
+    _startup_report = True
+
+
+def startup_report() -> str:
+    lines = [f'{"startup":<16} {"ms":>10} {"budget ms":>10}']
+    for name, seconds in _marks:
+        budget = STARTUP_BUDGET.get(name)
+        if budget is None:
+            lines.append(f'{name:<16} {seconds * 1000:>10.1f}')
+        else:
+            over = '  over budget' if seconds > budget else ''
+            lines.append(f'{name:<16} {seconds * 1000:>10.1f} {budget * 1000:>10.0f}{over}')
+    return '\n'.join(lines)
+
+
+def startup_done():
+    """Record that startup has finished and print the milestones if asked to."""
+    mark('tasks_loaded')
+    if _startup_report:
+        print(startup_report(), file=sys.stderr)
+
+
+def reset():
+    global last
+    with _lock:
+        _timings.clear()
+        _counters.clear()
+        last = None
+
+
+def _report_at_exit():
+    if _profiler is not None:
+        import pstats
+        _profiler.disable()
+        _profiler.dump_stats(_profile_path)
+        pstats.Stats(_profiler, stream=sys.stderr).sort_stats('cumulative').print_stats(25)
+        print(f'Profile saved to {_profile_path}', file=sys.stderr)
+    if _marks and not _startup_report:
+        print(startup_report(), file=sys.stderr)
+    print(report(), file=sys.stderr)
+
+
+enable_from_env()
@@ -0,0 +1,142 @@
+"""Recurrence rules for repeating tasks.
+
+A recurring task is stored once, as its current occurrence: ``due_date``
+is the date of the next instance and ``recurrence`` holds the rule as
+text, e.g.::
+
+    daily
+    weekly until 2026-12-31
+    every 3 days count 10
+    monthly on day 31
+
+``count`` is the number of occurrences left, the current one included,
+and goes down by one each time an occurrence is completed. Later
+occurrences are never stored; ``Rule.between`` computes the ones that fall
+in a date window on demand, jumping straight to the window instead of
+stepping through the occurrences before it.
+"""
+import calendar
+import re
+from dataclasses import dataclass, replace
+from datetime import date, datetime
+from functools import lru_cache
+from typing import Iterator, Optional
+
+_SHORTHANDS = {'daily': 'day', 'weekly': 'week', 'monthly': 'month'}
+_RULE = re.compile(
+    r'^(?:(?P<shorthand>daily|weekly|monthly)|every\s+(?P<interval>\d+)\s+(?P<unit>day|week|month)s?)'
+    r'(?:\s+on\s+day\s+(?P<day>\d+))?'
+    r'(?:\s+until\s+(?P<until>\d{4}-\d{2}-\d{2}))?'
+    r'(?:\s+count\s+(?P<count>\d+))?$'
+)
+
+
+class RecurrenceError(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class Rule:
+    unit: str
+    interval: int = 1
+    until: Optional[date] = None
+    # Occurrences left, the current one included; None repeats forever
+    count: Optional[int] = None
+    # Day of the month for monthly rules, clamped to shorter months, so a
+    # series starting on the 31st comes back to the 31st after February
+    day: Optional[int] = None
+
+    def __str__(self):
+        if self.interval == 1:
+            text = {'day': 'daily', 'week': 'weekly', 'month': 'monthly'}[self.unit]
+        else:
+            text = f'every {self.interval} {self.unit}s'
+        if self.day is not None:
+            text += f' on day {self.day}'
+        if self.until is not None:
+            text += f' until {self.until.isoformat()}'
+        if self.count is not None:
+            text += f' count {self.count}'
+        return text
+
+    def anchored(self, start: date) -> 'Rule':
+        """The rule with its day of the month fixed to ``start``'s, for monthly rules."""
+        if self.unit == 'month' and self.day is None:
+            return replace(self, day=start.day)
+        return self
+
+    def nth(self, start: date, n: int) -> date:
+        """The ``n``-th occurrence after ``start`` (``start`` itself is the 0th), ignoring the limits."""
+        if self.unit == 'month':
+            month = start.year * 12 + start.month - 1 + n * self.interval
+            year, month = divmod(month, 12)
+            day = min(self.day or start.day, calendar.monthrange(year, month + 1)[1])
+            return date(year, month + 1, day)
+        days = n * self.interval * (7 if self.unit == 'week' else 1)
+        return date.fromordinal(start.toordinal() + days)
+
+    def _within_limits(self, n: int, day: date) -> bool:
+        return (self.count is None or n < self.count) and (self.until is None or day <= self.until)
+
+    def between(self, start: date, first: date, last: date) -> Iterator[date]:
+        """Occurrences of a series starting at ``start`` that fall in [first, last], lazily."""
+        if first <= start:
+            n = 0
+        elif self.unit == 'month':
+            months = (first.year - start.year) * 12 + first.month - start.month
+            n = max(0, months // self.interval - 1)
+        else:
+            period = self.interval * (7 if self.unit == 'week' else 1)
+            n = -(-(first.toordinal() - start.toordinal()) // period)
+        while True:
+            day = self.nth(start, n)
+            if day > last or not self._within_limits(n, day):
+                return
+            if day >= first:
+                yield day
+            n += 1
+
+    def advance(self, start: date) -> Optional['Rule']:
+        """The rule for the series once the occurrence on ``start`` is done, or None if it was the last."""
+        if self.count is not None and self.count <= 1:
+            return None
+        if self.until is not None and self.nth(start, 1) > self.until:
+            return None
+        return replace(self, count=None if self.count is None else self.count - 1)
+
+
+@lru_cache(maxsize=1024)
+def parse_rule(text: str) -> Rule:
+    """Parse rule text such as ``every 2 weeks until 2026-12-31``; cached, as rules repeat across tasks."""
+    match = _RULE.match(' '.join(text.lower().split()))
+    if match is None:
+        raise RecurrenceError(
+            f'Invalid recurrence {text!r}; use daily, weekly, monthly or every N days/weeks/months,'
+            ' optionally followed by "until YYYY-MM-DD" and/or "count N"'
+        )
+    if match['shorthand']:
+        unit, interval = _SHORTHANDS[match['shorthand']], 1
+    else:
+        unit, interval = match['unit'], int(match['interval'])
+    if interval < 1:
+        raise RecurrenceError('The recurrence interval must be at least 1')
+    day = int(match['day']) if match['day'] else None
+    if day is not None and (unit != 'month' or not 1 <= day <= 31):
+        raise RecurrenceError('"on day N" needs a monthly rule and a day from 1 to 31')
+    count = int(match['count']) if match['count'] else None
+    if count is not None and count < 1:
+        raise RecurrenceError('The recurrence count must be at least 1')
+    try:
+        until = date.fromisoformat(match['until']) if match['until'] else None
+    except ValueError:
+        raise RecurrenceError(f'Invalid date {match["until"]!r} in recurrence')
+    return Rule(unit, interval, until, count, day)
+
+
+def due_on(due_date: str, day: date) -> str:
+    """``due_date`` moved to ``day``, keeping its time of day if it has one."""
+    return day.isoformat() + due_date[10:]
+
+
+def due_day(due_date: str) -> date:
+    return datetime.fromisoformat(due_date).date()
@@ -0,0 +1,100 @@
+"""Reminders for tasks whose due time arrives while the app is open.
+
+Upcoming due times sit in a min-heap and exactly one ``after`` timer is
+armed, for the earliest of them. Changed tasks are pushed again with their
+new due time (O(log n)); the entries they replace stay in the heap and are
+skipped when they reach the top, and the heap is rebuilt once those make
+up most of it. Nothing is ever scanned periodically.
+"""
+import heapq
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+# The timer is re-armed at least this often even when the next reminder is
+# further away, so a suspended machine or a changed clock is noticed
+MAX_TIMER_MS = 15 * 60 * 1000
+
+
+class ReminderScheduler:
+    """Calls ``on_due(task_ids)`` on the Tk event loop as active tasks become due."""
+
+    def __init__(self, root, todo_manager, on_due: Callable[[List[str]], None]):
+        self.root = root
+        self.todo_manager = todo_manager
+        self.on_due = on_due
+        self._heap: List[Tuple[float, str]] = []
+        # Task id -> the due time its valid heap entry has
+        self._scheduled: Dict[str, float] = {}
+        self._after: Optional[str] = None
+        self._armed_at: Optional[float] = None
+
+    def start(self):
+        """Schedule every active task due from now on, then follow changes."""
+        # Earliest first, but equal due times come in display order, not by
+        # task id as the heap compares them
+        self._heap = self.todo_manager.get_due_times_between(time.time(), None, filter_completed=False)
+        heapq.heapify(self._heap)
+        self._scheduled = {task_id: due for due, task_id in self._heap}
+        self.todo_manager.add_listener(self.tasks_changed)
+        self._arm()
+
+    def stop(self):
+        if self._after is not None:
+            self.root.after_cancel(self._after)
+        self._after = self._armed_at = None
+
+    def tasks_changed(self, task_ids: Iterable[str]):
+        """Manager listener: reschedule the changed tasks."""
+        now = time.time()
+        for task_id in task_ids:
+            due = self._due_time(task_id, now)
+            if due == self._scheduled.get(task_id):
+                continue
+            if due is None:
+                del self._scheduled[task_id]
+            else:
+                self._scheduled[task_id] = due
+                heapq.heappush(self._heap, (due, task_id))
+        if len(self._heap) > 2 * len(self._scheduled) + 64:
+            self._heap = [(due, task_id) for task_id, due in self._scheduled.items()]
+            heapq.heapify(self._heap)
+        self._arm()
+
+    def _due_time(self, task_id: str, now: float) -> Optional[float]:
+        task = self.todo_manager.get_task(task_id)
+        info = self.todo_manager.due_info(task_id)
+        if task is None or task.completed or info is None or info[0] <= now:
+            return None
+        return info[0]
+
+    def _is_current(self, entry: Tuple[float, str]) -> bool:
+        due, task_id = entry
+        return self._scheduled.get(task_id) == due
+
+    def _arm(self):
+        # Drop replaced entries so the top is the real next reminder
+        while self._heap and not self._is_current(self._heap[0]):
+            heapq.heappop(self._heap)
+        next_due = self._heap[0][0] if self._heap else None
+        if next_due == self._armed_at:
+            return
+        self.stop()
+        if next_due is None:
+            return
+        # Rounded up so the timer never fires just before the due time
+        delay = max(0, int((next_due - time.time()) * 1000) + 1)
+        self._after = self.root.after(min(delay, MAX_TIMER_MS), self._fire)
+        self._armed_at = next_due
+
+    def _fire(self):
+        self._after = self._armed_at = None
+        now = time.time()
+        due_ids = []
+        while self._heap and self._heap[0][0] <= now:
+            entry = heapq.heappop(self._heap)
+            if self._is_current(entry):
+                del self._scheduled[entry[1]]
+                due_ids.append(entry[1])
+        self._arm()
+        if due_ids:
+            self.on_due(due_ids)
@@ -0,0 +1,71 @@
+import bisect
+import re
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set
+
+_TOKEN = re.compile(r'\w+')
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Lower-cased word tokens of ``text``."""
+    if not text:
+        return []
+    return _TOKEN.findall(text.casefold())
+
+class SearchIndex:
+    """Inverted token index for search-as-you-type.
+
+    Maps each token to the ids of the tasks containing it and keeps the
+    distinct tokens sorted, so a prefix resolves to a contiguous slice of
+    tokens by bisection instead of a scan over every task.
+    """
+
+    def __init__(self):
+        self._postings: Dict[str, Set[str]] = {}
+        self._tokens: List[str] = []
+        self._task_tokens: Dict[str, FrozenSet[str]] = {}
+
+    def add(self, task_id: str, texts: Iterable[Optional[str]]):
+        tokens = frozenset(token for text in texts for token in tokenize(text))
+        self._task_tokens[task_id] = tokens
+        for token in tokens:
+            postings = self._postings.get(token)
+            if postings is None:
+                postings = self._postings[token] = set()
+                bisect.insort(self._tokens, token)
+            postings.add(task_id)
+
+    def remove(self, task_id: str):
+        for token in self._task_tokens.pop(task_id, ()):
+            postings = self._postings[token]
+            postings.discard(task_id)
+            if not postings:
+                del self._postings[token]
+                del self._tokens[bisect.bisect_left(self._tokens, token)]
+
+    def clear(self):
+        self._postings.clear()
+        self._tokens.clear()
+        self._task_tokens.clear()
+
+    def _prefix_matches(self, prefix: str) -> Set[str]:
+        start = bisect.bisect_left(self._tokens, prefix)
+        end = bisect.bisect_left(self._tokens, prefix + '\U0010ffff', start)
+        if end - start == 1:
+            return self._postings[self._tokens[start]]
+        matches: Set[str] = set()
+        for token in self._tokens[start:end]:
+            matches |= self._postings[token]
+        return matches
+
+    def search(self, query: str) -> Set[str]:
+        """Ids of tasks that have a token starting with every word of ``query``."""
+        words = tokenize(query)
+        if not words:
+            return set()
+        # Longest words first: they usually match the fewest tasks
+        words.sort(key=len, reverse=True)
+        result = set(self._prefix_matches(words[0]))
+        for word in words[1:]:
+            if not result:
+                break
+            result &= self._prefix_matches(word)
+        return result
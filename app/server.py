@@ -0,0 +1,358 @@
+"""Local HTTP/JSON API over a TodoManager, for dashboards and scripts.
+
+    python -m app.server --port 8765
+    curl 'localhost:8765/tasks?completed=false&sort=due_date&limit=20'
+    curl -X POST localhost:8765/tasks -d '{"title": "Pay rent", "due_date": "2026-11-01"}'
+    curl -X PATCH localhost:8765/tasks/<id> -d '{"completed": true}'
+    curl -X DELETE localhost:8765/tasks/<id>
+    curl -X POST localhost:8765/tasks/bulk -d '[{"op": "complete", "id": "3f2a9c"}]'
+
+Endpoints:
+
+    GET    /tasks        list; filters completed, category, priority, q,
+                         sort (+ desc=1), paged with limit and after=<next>
+    GET    /tasks/<id>   one task
+    POST   /tasks        add a task
+    PATCH  /tasks/<id>   update fields
+    DELETE /tasks/<id>   delete
+    POST   /tasks/bulk   operations as for ``python -m app.cli batch``, as
+                         a JSON list; all of them apply or none do
+
+One asyncio loop serves every connection (HTTP/1.1 with keep-alive).
+Reads run on the loop under the manager's lock, so each response is a
+consistent snapshot. Writes queue up for a single writer, one at a time;
+disk writes happen behind them (write-behind), and whenever the storage
+lock is busy the write waits on a worker thread rather than blocking
+readers. Changes saved by other processes (the
+GUI, the CLI) are picked up every few seconds.
+"""
+import argparse
+import asyncio
+import json
+import os
+import signal
+import sys
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from typing import Callable, Dict, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from .cli import CliError, apply_operations, check_operations, task_fields
+from .storage import open_storage
+from .todo_manager import TodoManager, task_to_record
+
+DEFAULT_PAGE = 100
+MAX_PAGE = 1000
+MAX_BODY = 1 << 20
+# Idle keep-alive connections are closed after this many seconds
+KEEPALIVE_TIMEOUT = 15
+# Writes waiting for the writer; a full queue makes writers wait
+WRITE_QUEUE_SIZE = 1024
+SYNC_INTERVAL = 2.0
+
+
+class HttpError(Exception):
+    def __init__(self, status: HTTPStatus, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+def _json_body(body: bytes):
+    try:
+        return json.loads(body or b'null')
+    except ValueError as e:
+        raise HttpError(HTTPStatus.BAD_REQUEST, f'Invalid JSON: {e}')
+
+
+def _flag(params: Dict[str, str], name: str) -> Optional[bool]:
+    value = params.get(name)
+    if value is None:
+        return None
+    if value.lower() in ('1', 'true', 'yes'):
+        return True
+    if value.lower() in ('0', 'false', 'no'):
+        return False
+    raise HttpError(HTTPStatus.BAD_REQUEST, f'{name} must be true or false')
+
+
+def _int(params: Dict[str, str], name: str) -> Optional[int]:
+    value = params.get(name)
+    if value is None:
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        raise HttpError(HTTPStatus.BAD_REQUEST, f'{name} must be an integer')
+
+
+class TodoServer:
+    def __init__(self, manager: TodoManager):
+        self.manager = manager
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix='todo-server-writer')
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks = []
+
+    async def start(self, host: str, port: int) -> asyncio.AbstractServer:
+        self._queue = asyncio.Queue(WRITE_QUEUE_SIZE)
+        self._tasks = [asyncio.create_task(self._write_loop()), asyncio.create_task(self._sync_loop())]
+        return await asyncio.start_server(self.handle_connection, host, port)
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._writer.shutdown(wait=True)
+
+    # Writes
+
+    async def write(self, fn: Callable):
+        """Run ``fn`` on the writer thread after every write queued before it."""
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((fn, future))
+        return await future
+
+    async def _write_loop(self):
+        loop = asyncio.get_running_loop()
+        lock = self.manager.storage.lock()
+        while True:
+            fn, future = await self._queue.get()
+            try:
+                # Usually the storage lock is free and the write, which with
+                # write-behind storage only touches memory, runs right here.
+                # While another writer (the write-behind thread, another
+                # process) holds it, the writer thread waits for it instead
+                # of the loop.
+                if lock.acquire(blocking=False):
+                    try:
+                        result = fn()
+                    finally:
+                        lock.release()
+                else:
+                    result = await loop.run_in_executor(self._writer, fn)
+            except Exception as e:
+                if not future.cancelled():
+                    future.set_exception(e)
+            else:
+                if not future.cancelled():
+                    future.set_result(result)
+
+    async def _sync_loop(self):
+        while True:
+            await asyncio.sleep(SYNC_INTERVAL)
+            try:
+                await self.write(lambda: self.manager.sync_from_storage(blocking=False))
+            except Exception:
+                traceback.print_exc()
+
+    # HTTP
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                try:
+                    request_line = await asyncio.wait_for(reader.readline(), KEEPALIVE_TIMEOUT)
+                except asyncio.TimeoutError:
+                    break
+                if not request_line.strip():
+                    break
+                keep_alive = await self._handle_request(request_line, reader, writer)
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ValueError, ConnectionError):
+            pass
+        except asyncio.CancelledError:
+            # The server is shutting down
+            pass
+        finally:
+            writer.close()
+
+    async def _handle_request(self, request_line: bytes, reader: asyncio.StreamReader,
+                              writer: asyncio.StreamWriter) -> bool:
+        method, target, version = request_line.decode('latin-1').split()
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+        connection = headers.get('connection', '').lower()
+        keep_alive = connection != 'close' if version == 'HTTP/1.1' else connection == 'keep-alive'
+        try:
+            if 'transfer-encoding' in headers:
+                keep_alive = False
+                raise HttpError(HTTPStatus.LENGTH_REQUIRED, 'Send a Content-Length body')
+            length = int(headers.get('content-length') or 0)
+            if length > MAX_BODY:
+                keep_alive = False
+                raise HttpError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, f'Bodies are limited to {MAX_BODY} bytes')
+            body = await reader.readexactly(length) if length else b''
+            status, payload = await self.dispatch(method, target, body)
+        except HttpError as e:
+            status, payload = e.status, {'error': str(e)}
+        except (CliError, ValueError) as e:
+            status, payload = HTTPStatus.BAD_REQUEST, {'error': str(e)}
+        except OSError as e:
+            # The write itself failed; the manager rolled the change back
+            status, payload = HTTPStatus.INTERNAL_SERVER_ERROR, {'error': str(e)}
+        except Exception as e:
+            # A bug, not a bad request; still answer rather than drop the connection
+            traceback.print_exc()
+            status, payload = HTTPStatus.INTERNAL_SERVER_ERROR, {'error': f'Internal error: {e}'}
+        data = b'' if payload is None else json.dumps(payload).encode()
+        head = [
+            f'HTTP/1.1 {status.value} {status.phrase}',
+            f'Content-Length: {len(data)}',
+            f'Connection: {"keep-alive" if keep_alive else "close"}',
+        ]
+        if data:
+            head.append('Content-Type: application/json')
+        writer.write(('\r\n'.join(head) + '\r\n\r\n').encode('latin-1') + data)
+        await writer.drain()
+        return keep_alive
+
+    async def dispatch(self, method: str, target: str, body: bytes) -> Tuple[HTTPStatus, object]:
+        url = urlsplit(target)
+        parts = [unquote(part) for part in url.path.strip('/').split('/')]
+        if parts[0] != 'tasks' or len(parts) > 2:
+            raise HttpError(HTTPStatus.NOT_FOUND, f'No such resource {url.path}')
+        if len(parts) == 1:
+            if method == 'GET':
+                params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+                return HTTPStatus.OK, self.list_tasks(params)
+            if method == 'POST':
+                return HTTPStatus.CREATED, await self.add_task(_json_body(body))
+        elif parts[1] == 'bulk':
+            if method == 'POST':
+                return HTTPStatus.OK, await self.bulk(_json_body(body))
+        else:
+            task_id = parts[1]
+            if method == 'GET':
+                return HTTPStatus.OK, self.get_task(task_id)
+            if method == 'PATCH':
+                return HTTPStatus.OK, await self.update_task(task_id, _json_body(body))
+            if method == 'DELETE':
+                await self.delete_task(task_id)
+                return HTTPStatus.NO_CONTENT, None
+        raise HttpError(HTTPStatus.METHOD_NOT_ALLOWED, f'{method} is not supported on {url.path}')
+
+    # Endpoints
+
+    def list_tasks(self, params: Dict[str, str]) -> dict:
+        limit = _int(params, 'limit') or DEFAULT_PAGE
+        if not 0 < limit <= MAX_PAGE:
+            raise HttpError(HTTPStatus.BAD_REQUEST, f'limit must be between 1 and {MAX_PAGE}')
+        filters = dict(
+            filter_completed=_flag(params, 'completed'),
+            category=params.get('category'),
+            priority=_int(params, 'priority'),
+            query=params.get('q'),
+        )
+        with self.manager.reading():
+            # One more than the page, to tell whether there is a next page
+            tasks = list(self.manager.iter_tasks(
+                **filters,
+                sort_by=params.get('sort'),
+                descending=bool(_flag(params, 'desc')),
+                after=params.get('after'),
+                limit=limit + 1,
+            ))
+            records = [task_to_record(task) for task in tasks[:limit]]
+            total = self.manager.count_tasks(**filters)
+            # A cursor rather than the id, so it still works if that task is deleted
+            cursor = None
+            if len(tasks) > limit:
+                cursor = self.manager.page_cursor(tasks[limit - 1].id, params.get('sort'), tasks[limit].id)
+        return {
+            'tasks': records,
+            'total': total,
+            'next': cursor,
+        }
+
+    def get_task(self, task_id: str) -> dict:
+        with self.manager.reading():
+            task = self.manager.get_task(task_id)
+            if task is None:
+                raise HttpError(HTTPStatus.NOT_FOUND, f'No task with id {task_id}')
+            return task_to_record(task)
+
+    async def add_task(self, values) -> dict:
+        if not isinstance(values, dict):
+            raise HttpError(HTTPStatus.BAD_REQUEST, 'Expected a JSON object')
+        fields = task_fields(values)
+        if 'title' not in fields:
+            raise CliError('Task title cannot be empty')
+
+        def add():
+            return task_to_record(self.manager.add_task(**fields))
+        return await self.write(add)
+
+    async def update_task(self, task_id: str, values) -> dict:
+        if not isinstance(values, dict):
+            raise HttpError(HTTPStatus.BAD_REQUEST, 'Expected a JSON object')
+        fields = task_fields(values)
+
+        def update():
+            with self.manager.transaction():
+                if not self.manager.update_task(task_id, **fields):
+                    raise HttpError(HTTPStatus.NOT_FOUND, f'No task with id {task_id}')
+                return task_to_record(self.manager.get_task(task_id))
+        return await self.write(update)
+
+    async def delete_task(self, task_id: str):
+        def delete():
+            if not self.manager.delete_task(task_id):
+                raise HttpError(HTTPStatus.NOT_FOUND, f'No task with id {task_id}')
+        await self.write(delete)
+
+    async def bulk(self, operations) -> dict:
+        if not isinstance(operations, list):
+            raise HttpError(HTTPStatus.BAD_REQUEST, 'Expected a JSON list of operations')
+        # Malformed operations are refused before taking a turn on the writer
+        check_operations(operations, 'operation')
+        counts = await self.write(lambda: apply_operations(self.manager, operations, 'operation'))
+        return dict(counts)
+
+
+async def serve(manager: TodoManager, host: str, port: int):
+    server = TodoServer(manager)
+    listener = await server.start(host, port)
+    address = listener.sockets[0].getsockname()
+    print(f'Serving {manager.data_file} on http://{address[0]}:{address[1]}', file=sys.stderr)
+    if os.name != 'nt':
+        # Stop cleanly on SIGTERM too, so pending writes are flushed
+        asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, asyncio.current_task().cancel)
+    try:
+        async with listener:
+            await listener.serve_forever()
+    except asyncio.CancelledError:
+        pass
+    finally:
+        await server.stop()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m app.server', description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--data', default='data/tasks.json', help='tasks file (default: %(default)s)')
+    parser.add_argument('--storage', default=os.environ.get('TODO_STORAGE', 'json'),
+                        choices=['json', 'journal', 'sqlite', 'binary'])
+    parser.add_argument('--host', default='127.0.0.1', help='address to listen on (default: %(default)s)')
+    parser.add_argument('--port', type=int, default=8765)
+    args = parser.parse_args(argv)
+
+    # Write-behind: a commit only queues the write, so the writer thread
+    # holds the manager's lock (and blocks readers) for memory work only
+    manager = TodoManager(args.data, storage=open_storage(args.data, args.storage), write_behind=True)
+    try:
+        asyncio.run(serve(manager, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        manager.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
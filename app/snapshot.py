@@ -0,0 +1,336 @@
+"""Binary task snapshot format.
+
+Layout (little endian)::
+
+    header   magic "TDSN", version u16, reserved u16, record count u32,
+             string count u32, records offset u64, strings offset u64
+    records  one fixed 52-byte record per task
+    strings  (string count + 1) u64 offsets into the UTF-8 blob, then the
+             blob, where every string is followed by a NUL byte
+
+A record holds flags, priority, created_at and completed_at (epoch
+seconds, NaN for None) and string table indexes for title, category, due
+date, id and recurrence rule. Timestamps that epoch seconds would not give
+back exactly (a UTC offset, say) are kept as text in the string table
+instead, with a flag set. String index 0 means None and string ``i`` is
+the ``i``-th one in the table (1-based). Strings repeated across tasks
+(categories, due dates, rules) are stored once. Readers map the file with
+mmap and decode a record's fields only when they are accessed; decoding
+many records at once splits the whole blob on the NUL separators in one
+go instead.
+"""
+import json
+import math
+import mmap
+import os
+import struct
+import sys
+from collections.abc import Mapping
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional
+
+MAGIC = b'TDSN'
+VERSION = 1
+
+HEADER = struct.Struct('<4sHHIIQQ')
+# flags, priority, created_at, title, category, due_date, id, created_at text,
+# completed_at, recurrence, completed_at text
+RECORD = struct.Struct('<B3xidIIIIIdII')
+OFFSET = struct.Struct('<Q')
+
+NO_STRING = 0
+
+FLAG_COMPLETED = 0x01
+FLAG_NO_PRIORITY = 0x02
+FLAG_CREATED_AT_TEXT = 0x04
+FLAG_COMPLETED_AT_TEXT = 0x08
+
+
+class SnapshotError(ValueError):
+    pass
+
+
+def _timestamp_seconds(value) -> Optional[float]:
+    """A created_at or completed_at as epoch seconds, or None if only its text is lossless."""
+    if value is None:
+        return math.nan
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        seconds = datetime.fromisoformat(value).timestamp()
+    except ValueError:
+        return None
+    if datetime.fromtimestamp(seconds).isoformat() != value:
+        return None
+    return seconds
+
+
+def _completed_at(fixed: tuple, string, iso_timestamps: bool = True):
+    if fixed[0] & FLAG_COMPLETED_AT_TEXT:
+        return string(fixed[10])
+    seconds = fixed[8]
+    if math.isnan(seconds):
+        return None
+    return datetime.fromtimestamp(seconds).isoformat() if iso_timestamps else seconds
+
+
+def write_snapshot(path: str, records: List[dict]):
+    """Write task records to ``path`` atomically in the binary format."""
+    strings: Dict[str, int] = {}
+
+    def string_index(value: Optional[str]) -> int:
+        if value is None:
+            return NO_STRING
+        index = strings.get(value)
+        if index is None:
+            index = strings[value] = len(strings) + 1
+        return index
+
+    packed = bytearray(RECORD.size * len(records))
+    for i, record in enumerate(records):
+        flags = FLAG_COMPLETED if record.get('completed') else 0
+        priority = record.get('priority', 1)
+        if priority is None:
+            flags |= FLAG_NO_PRIORITY
+            priority = 0
+        created_at = record.get('created_at')
+        seconds = _timestamp_seconds(created_at)
+        created_text = NO_STRING
+        if seconds is None:
+            flags |= FLAG_CREATED_AT_TEXT
+            created_text = string_index(created_at)
+            seconds = math.nan
+        completed_at = record.get('completed_at')
+        completed_seconds = _timestamp_seconds(completed_at)
+        completed_text = NO_STRING
+        if completed_seconds is None:
+            flags |= FLAG_COMPLETED_AT_TEXT
+            completed_text = string_index(completed_at)
+            completed_seconds = math.nan
+        RECORD.pack_into(
+            packed, i * RECORD.size,
+            flags, priority, seconds,
+            string_index(record['title']),
+            string_index(record.get('category')),
+            string_index(record.get('due_date')),
+            string_index(record.get('id')),
+            created_text,
+            completed_seconds,
+            string_index(record.get('recurrence')),
+            completed_text,
+        )
+
+    encoded = [value.encode('utf-8') + b'\0' for value in strings]
+    offsets = bytearray(OFFSET.size * (len(encoded) + 1))
+    position = 0
+    for i, data in enumerate(encoded):
+        OFFSET.pack_into(offsets, i * OFFSET.size, position)
+        position += len(data)
+    OFFSET.pack_into(offsets, len(encoded) * OFFSET.size, position)
+
+    records_offset = HEADER.size
+    strings_offset = records_offset + len(packed)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, 0, len(records), len(encoded), records_offset, strings_offset))
+        f.write(packed)
+        f.write(offsets)
+        for data in encoded:
+            f.write(data)
+    os.replace(tmp_path, path)
+
+
+class SnapshotRecord(Mapping):
+    """One task record, decoding each field on first access."""
+
+    __slots__ = ('_reader', '_fixed')
+    KEYS = ('title', 'completed', 'created_at', 'due_date', 'priority', 'category', 'id', 'completed_at',
+            'recurrence')
+
+    def __init__(self, reader: 'SnapshotReader', index: int):
+        self._reader = reader
+        self._fixed = RECORD.unpack_from(reader._map, reader._records_offset + index * RECORD.size)
+
+    def __getitem__(self, key):
+        flags, priority, seconds, title, category, due_date, task_id, created_text = self._fixed[:8]
+        string = self._reader.string
+        if key == 'title':
+            return string(title)
+        if key == 'completed':
+            return bool(flags & FLAG_COMPLETED)
+        if key == 'created_at':
+            if flags & FLAG_CREATED_AT_TEXT:
+                return string(created_text)
+            return None if math.isnan(seconds) else datetime.fromtimestamp(seconds).isoformat()
+        if key == 'due_date':
+            return string(due_date)
+        if key == 'priority':
+            return None if flags & FLAG_NO_PRIORITY else priority
+        if key == 'category':
+            return string(category)
+        if key == 'id':
+            return string(task_id)
+        if key == 'completed_at':
+            return _completed_at(self._fixed, string)
+        if key == 'recurrence':
+            return string(self._fixed[9])
+        raise KeyError(key)
+
+    def __iter__(self):
+        if self._fixed[6] == NO_STRING:
+            return (key for key in self.KEYS if key != 'id')
+        return iter(self.KEYS)
+
+    def __len__(self):
+        return len(self.KEYS) - (self._fixed[6] == NO_STRING)
+
+
+class SnapshotReader:
+    """Memory-mapped view of a snapshot file; close it (or use ``with``) when done."""
+
+    def __init__(self, path: str):
+        self._file = open(path, 'rb')
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # mmap refuses empty files
+            self._file.close()
+            raise SnapshotError(f'{path} is empty')
+        if len(self._map) < HEADER.size:
+            self.close()
+            raise SnapshotError(f'{path} is not a task snapshot')
+        magic, version, _, count, string_count, records_offset, strings_offset = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            self.close()
+            raise SnapshotError(f'{path} is not a task snapshot')
+        if version > VERSION:
+            self.close()
+            raise SnapshotError(f'{path} uses snapshot version {version}; this app reads up to {VERSION}')
+        self.version = version
+        self._count = count
+        self._string_count = string_count
+        self._records_offset = records_offset
+        self._offsets_offset = strings_offset
+        self._blob_offset = strings_offset + OFFSET.size * (string_count + 1)
+        # Decoded strings by index; repeated values decode once and are shared
+        self._strings: Dict[int, str] = {}
+        # The whole table, once a bulk decode has needed it
+        self._table: Optional[List[Optional[str]]] = None
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, index: int) -> SnapshotRecord:
+        if not 0 <= index < self._count:
+            raise IndexError(index)
+        return SnapshotRecord(self, index)
+
+    def __iter__(self) -> Iterator[SnapshotRecord]:
+        return (SnapshotRecord(self, i) for i in range(self._count))
+
+    def records(self, start: int = 0, end: Optional[int] = None, iso_timestamps: bool = True) -> List[dict]:
+        """Decode records ``start:end`` into plain dicts in one pass.
+
+        With ``iso_timestamps=False`` created_at and completed_at stay in
+        epoch seconds, which is what Task keeps in memory anyway.
+        """
+        end = self._count if end is None else min(end, self._count)
+        if (end - start) * 4 >= self._count:
+            string = self._string_table().__getitem__
+        else:
+            string = self.string
+        size = RECORD.size
+        view = memoryview(self._map)[self._records_offset + start * size:self._records_offset + end * size]
+        decoded = []
+        try:
+            for fixed in RECORD.iter_unpack(view):
+                flags, priority, seconds, title, category, due_date, task_id, created_text = fixed[:8]
+                if flags & FLAG_CREATED_AT_TEXT:
+                    created_at = string(created_text)
+                elif math.isnan(seconds):
+                    created_at = None
+                elif iso_timestamps:
+                    created_at = datetime.fromtimestamp(seconds).isoformat()
+                else:
+                    created_at = seconds
+                record = {
+                    'title': string(title),
+                    'completed': bool(flags & FLAG_COMPLETED),
+                    'created_at': created_at,
+                    'due_date': string(due_date),
+                    'priority': None if flags & FLAG_NO_PRIORITY else priority,
+                    'category': string(category),
+                }
+                if task_id != NO_STRING:
+                    record['id'] = string(task_id)
+                record['completed_at'] = _completed_at(fixed, string, iso_timestamps)
+                record['recurrence'] = string(fixed[9])
+                decoded.append(record)
+        finally:
+            view.release()
+        return decoded
+
+    def string(self, index: int) -> Optional[str]:
+        if index == NO_STRING:
+            return None
+        if self._table is not None:
+            return self._table[index]
+        value = self._strings.get(index)
+        if value is None:
+            start, end = struct.unpack_from('<QQ', self._map, self._offsets_offset + (index - 1) * OFFSET.size)
+            # end - 1 drops the NUL separator
+            value = self._map[self._blob_offset + start:self._blob_offset + end - 1].decode('utf-8')
+            self._strings[index] = value
+        return value
+
+    def _string_table(self) -> List[Optional[str]]:
+        if self._table is None:
+            blob = self._map[self._blob_offset:].decode('utf-8')
+            table = blob.split('\0')
+            if len(table) == self._string_count + 1:
+                table[-1:] = []
+                self._table = [None] + table
+            else:
+                # Some string contains a NUL itself; go through the offsets
+                self._table = [None] + [self.string(i) for i in range(1, self._string_count + 1)]
+        return self._table
+
+    def close(self):
+        if getattr(self, '_map', None) is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def read_snapshot(path: str) -> List[dict]:
+    """Fully decode a snapshot into plain record dicts."""
+    with SnapshotReader(path) as reader:
+        return reader.records()
+
+
+def json_to_snapshot(json_path: str, snapshot_path: str) -> int:
+    with open(json_path, 'r') as f:
+        records = json.load(f)
+    write_snapshot(snapshot_path, records)
+    return len(records)
+
+
+def snapshot_to_json(snapshot_path: str, json_path: str) -> int:
+    records = read_snapshot(snapshot_path)
+    with open(json_path, 'w') as f:
+        json.dump(records, f, indent=2)
+    return len(records)
+
+
+if __name__ == '__main__':
+    # python -m app.snapshot to-binary data/tasks.json data/tasks.snap
+    # python -m app.snapshot to-json data/tasks.snap data/tasks.json
+    command, source, target = sys.argv[1:4]
+    convert = {'to-binary': json_to_snapshot, 'to-json': snapshot_to_json}[command]
+    print(f'Converted {convert(source, target)} tasks')
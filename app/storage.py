@@ -0,0 +1,702 @@
+import codecs
+import json
+import os
+import re
+import sqlite3
+from typing import Callable, Dict, IO, Iterator, List, Optional, Tuple
+from . import perf
+from .locking import FileLock, NullLock
+from .snapshot import SnapshotError, SnapshotReader, json_to_snapshot, write_snapshot
+
+Snapshot = Callable[[], List[dict]]
+# A chunk of records together with the fraction of the data read so far
+LoadChunk = Tuple[List[dict], float]
+
+TASK_FIELDS = ('title', 'completed', 'created_at', 'due_date', 'priority', 'category', 'id', 'completed_at',
+               'recurrence')
+
+
+def _file_signature(path: str) -> Tuple[Optional[int], Optional[int]]:
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None, None
+    return stat.st_size, stat.st_mtime_ns
+
+
+def _write_json_atomic(path: str, data, **dump_kwargs):
+    # Write to a sibling temp file and swap it in so a crash never leaves
+    # a half-written tasks file behind.
+    with perf.timer('storage.serialize'):
+        text = json.dumps(data, **dump_kwargs)
+    with perf.timer('storage.write'):
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+
+
+class UnreadableDataError(ValueError):
+    """The stored task data is missing or cannot be parsed (see ``Storage.load``)."""
+
+
+class Storage:
+    """Interface TodoManager persists tasks through.
+
+    ``commit`` receives the operations of one mutation (see ``apply_op``)
+    together with a callable returning the full record list, so each
+    backend can choose between writing just the delta or everything.
+    """
+
+    def load(self, strict: bool = False) -> List[dict]:
+        """All stored records.
+
+        Missing or unparseable data loads as no tasks, unless ``strict``
+        is set: then it raises UnreadableDataError, so a sync can tell a
+        damaged (or half-written) file from one that really is empty.
+        """
+        raise NotImplementedError
+
+    def iter_load(self, chunk_size: int) -> Iterator[LoadChunk]:
+        """Yield the stored records in chunks, for progressive loading."""
+        records = self.load()
+        for start in range(0, len(records), chunk_size):
+            yield records[start:start + chunk_size], min(1.0, (start + chunk_size) / len(records))
+
+    def save(self, records: List[dict]):
+        raise NotImplementedError
+
+    def commit(self, ops: List[dict], snapshot: Snapshot):
+        raise NotImplementedError
+
+    def flush(self):
+        # Only meaningful for storages that defer writes
+        pass
+
+    def close(self):
+        pass
+
+    def lock(self):
+        """Inter-process lock that writers hold; reentrant, usable with ``with``."""
+        return _NULL_LOCK
+
+    def version(self):
+        """Cheap token that changes whenever the stored data does, or None if unknown."""
+        return None
+
+    def changes_since(self, version) -> Optional[List[dict]]:
+        """Operations that turn the data at ``version`` into the current data.
+
+        Returns None when the backend cannot tell; the caller then compares
+        a full load against what it has. Call with the lock held.
+        """
+        return None
+
+
+_NULL_LOCK = NullLock()
+
+
+class LockedStorage(Storage):
+    """Storage in files shared between processes.
+
+    Writes happen under an advisory lock on ``<path>.lock`` and bump the
+    generation counter kept there. The version is that generation plus the
+    files' size and mtime, so a change is detected with a couple of stat
+    calls, even one made by hand.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file_lock = FileLock(path + '.lock')
+        # Version right after our own last write
+        self._own_version = None
+
+    def lock(self) -> FileLock:
+        return self._file_lock
+
+    def _signature(self) -> tuple:
+        return _file_signature(self.path)
+
+    def version(self):
+        return self._file_lock.generation(), self._signature()
+
+    def _written(self):
+        # Call right after a write, with the lock held
+        self._file_lock.bump()
+        self._own_version = self.version()
+
+    def _only_own_changes(self, version) -> bool:
+        return (version is not None and self.version() == self._own_version
+                and self._file_lock.written_since(version[0]))
+
+    def changes_since(self, version) -> Optional[List[dict]]:
+        # Writes this instance made (e.g. from the write-behind thread) are
+        # already in memory
+        return [] if self._only_own_changes(version) else None
+
+
+class JsonStorage(LockedStorage):
+    """Keeps the whole task list in one JSON document and rewrites it on every commit."""
+
+    def __init__(self, path: str):
+        super().__init__(path)
+        self._ensure_exists()
+
+    def _ensure_exists(self):
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        if not os.path.exists(self.path):
+            with open(self.path, 'w') as f:
+                json.dump([], f)
+
+    def load(self, strict: bool = False) -> List[dict]:
+        try:
+            with perf.timer('storage.read'), open(self.path, 'r') as f:
+                text = f.read()
+            with perf.timer('storage.parse'):
+                records = json.loads(text)
+            if not isinstance(records, list):
+                raise UnreadableDataError(f'{self.path} does not hold a task list')
+            return records
+        except (json.JSONDecodeError, FileNotFoundError, UnreadableDataError) as e:
+            if strict:
+                raise UnreadableDataError(f'Cannot read {self.path}: {e}') from e
+            return []
+
+    def iter_load(self, chunk_size: int) -> Iterator[LoadChunk]:
+        # Parse the array element by element instead of materializing the
+        # whole document, so the first chunk is ready after reading only
+        # the start of the file
+        try:
+            total = os.path.getsize(self.path) or 1
+            with open(self.path, 'rb') as f:
+                chunk = []
+                try:
+                    for record in iter_json_array(f):
+                        chunk.append(record)
+                        if len(chunk) >= chunk_size:
+                            yield chunk, min(1.0, f.tell() / total)
+                            chunk = []
+                except json.JSONDecodeError:
+                    # Same as load(): an unreadable file holds no (more) tasks
+                    pass
+                yield chunk, 1.0
+        except FileNotFoundError:
+            yield [], 1.0
+
+    def save(self, records: List[dict]):
+        with self._file_lock:
+            _write_json_atomic(self.path, records, indent=2)
+            self._written()
+
+    def commit(self, ops: List[dict], snapshot: Snapshot):
+        self.save(snapshot())
+
+
+class JournalStorage(JsonStorage):
+    """JSON snapshot plus an append-only log of mutations.
+
+    Each commit appends one line per operation to ``<path>.journal``.
+    Loading reads the snapshot and replays the journal on top of it; once
+    the journal holds more than ``compact_threshold`` operations it is
+    folded back into a fresh snapshot.
+
+    The first journal line records the size and mtime of the snapshot it
+    applies to, so a journal left over from an interrupted compaction (or
+    a snapshot edited by hand) is recognised as stale and ignored.
+    """
+
+    def __init__(self, path: str, compact_threshold: int = 1000):
+        super().__init__(path)
+        self.journal_path = path + '.journal'
+        self.compact_threshold = compact_threshold
+        self._journal_ops = 0
+
+    def _snapshot_signature(self) -> List[int]:
+        stat = os.stat(self.path)
+        return [stat.st_size, stat.st_mtime_ns]
+
+    def _signature(self) -> tuple:
+        return super()._signature() + _file_signature(self.journal_path)
+
+    def _start_journal(self):
+        tmp_path = self.journal_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            f.write(json.dumps({'snapshot': self._snapshot_signature()}) + '\n')
+        os.replace(tmp_path, self.journal_path)
+        self._journal_ops = 0
+
+    def _read_journal(self, offset: int = 0) -> Optional[List[dict]]:
+        """Operations in the journal, or only those from byte ``offset`` on.
+
+        Returns [] for a missing or stale journal, and None when the
+        journal is shorter than ``offset`` (it has been restarted).
+        """
+        try:
+            with open(self.journal_path, 'rb') as f:
+                header = f.readline()
+                if offset:
+                    f.seek(0, os.SEEK_END)
+                    if f.tell() < offset:
+                        return None
+                    f.seek(max(offset, len(header)))
+                lines = f.read().decode('utf-8', errors='replace').splitlines()
+        except FileNotFoundError:
+            return []
+        try:
+            header = json.loads(header)
+        except json.JSONDecodeError:
+            return []
+        if header.get('snapshot') != self._snapshot_signature():
+            return []
+        ops = []
+        for line in lines:
+            try:
+                ops.append(json.loads(line))
+            except json.JSONDecodeError:
+                # A torn final line from a crash mid-append; everything
+                # before it is intact.
+                break
+        return ops
+
+    def changes_since(self, version) -> Optional[List[dict]]:
+        if self._only_own_changes(version):
+            return []
+        if version is None:
+            return None
+        old_size, old_mtime, journal_size, _ = version[1]
+        size, mtime, _, _ = self._signature()
+        if (old_size, old_mtime) != (size, mtime) or journal_size is None:
+            # The snapshot was rewritten (compaction or a full save)
+            return None
+        # Only the other process's appended operations need reading
+        return self._read_journal(journal_size)
+
+    def load(self, strict: bool = False) -> List[dict]:
+        records = super().load(strict)
+        ops = self._read_journal()
+        if ops:
+            by_id = {record['id']: record for record in records}
+            for op in ops:
+                apply_op(by_id, op)
+            records = list(by_id.values())
+            self._journal_ops = len(ops)
+        else:
+            self._start_journal()
+        return records
+
+    def iter_load(self, chunk_size: int) -> Iterator[LoadChunk]:
+        ops = self._read_journal()
+        if not ops:
+            self._start_journal()
+            yield from super().iter_load(chunk_size)
+            return
+        if any('before' in op for op in ops):
+            # A task goes back mid-list, which streaming cannot place;
+            # rare, and only until the next compaction
+            yield from Storage.iter_load(self, chunk_size)
+            return
+        # Fold the (short) journal first, then patch snapshot records as
+        # they stream past and append the journal's additions at the end
+        changes, added = fold_ops(ops)
+        for records, progress in super().iter_load(chunk_size):
+            patched = []
+            for record in records:
+                change = changes.get(record.get('id'), {})
+                if change is not None:
+                    record.update(change)
+                    patched.append(record)
+            yield patched, progress
+        yield list(added.values()), 1.0
+        self._journal_ops = len(ops)
+
+    def save(self, records: List[dict]):
+        with self._file_lock:
+            super().save(records)
+            self._start_journal()
+            self._own_version = self.version()
+
+    def commit(self, ops: List[dict], snapshot: Snapshot):
+        if self._journal_ops + len(ops) > self.compact_threshold:
+            self.save(snapshot())
+            return
+        with self._file_lock:
+            with open(self.journal_path, 'a') as f:
+                f.write(''.join(json.dumps(op) + '\n' for op in ops))
+            self._journal_ops += len(ops)
+            self._written()
+
+
+def apply_op(records: Dict[str, dict], op: dict):
+    """Replay a single journal operation onto task records keyed by id.
+
+    An add with a ``'before'`` id (an undone delete) goes back in front of
+    that record; every other add goes at the end.
+    """
+    kind = op['op']
+    if kind == 'add':
+        task_id, before = op['task']['id'], op.get('before')
+        if before in records and task_id not in records:
+            items = list(records.items())
+            index = list(records).index(before)
+            records.clear()
+            records.update(items[:index])
+            records[task_id] = op['task']
+            records.update(items[index:])
+        else:
+            records[task_id] = op['task']
+    elif kind == 'delete':
+        records.pop(op['id'], None)
+    elif kind == 'update':
+        if op['id'] in records:
+            records[op['id']].update(op['changes'])
+
+
+class BinarySnapshotStorage(JsonStorage):
+    """Whole task list in the binary snapshot format (see ``app.snapshot``).
+
+    Loading maps the file and decodes it a chunk at a time in bulk, so
+    there is no text parsing at startup. Lazy SnapshotRecords would gain
+    nothing here: the manager's indexes read every field of every task.
+    """
+
+    def _ensure_exists(self):
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        if not os.path.exists(self.path):
+            write_snapshot(self.path, [])
+
+    def load(self, strict: bool = False) -> List[dict]:
+        return [record for records, _ in self._iter_load(1 << 16, strict) for record in records]
+
+    def iter_load(self, chunk_size: int) -> Iterator[LoadChunk]:
+        return self._iter_load(chunk_size, False)
+
+    def _iter_load(self, chunk_size: int, strict: bool) -> Iterator[LoadChunk]:
+        try:
+            reader = SnapshotReader(self.path)
+        except (SnapshotError, FileNotFoundError) as e:
+            if strict:
+                raise UnreadableDataError(f'Cannot read {self.path}: {e}') from e
+            yield [], 1.0
+            return
+        with reader:
+            total = len(reader) or 1
+            for start in range(0, len(reader), chunk_size):
+                end = min(start + chunk_size, len(reader))
+                # Plain dicts: the map is closed once loading finishes
+                yield reader.records(start, end, iso_timestamps=False), end / total
+        if not len(reader):
+            yield [], 1.0
+
+    def save(self, records: List[dict]):
+        with self._file_lock:
+            write_snapshot(self.path, records)
+            self._written()
+
+
+class BinaryJournalStorage(JournalStorage, BinarySnapshotStorage):
+    """JournalStorage with a binary snapshot instead of a JSON one."""
+
+
+def fold_ops(ops: List[dict]) -> Tuple[Dict[str, Optional[dict]], Dict[str, dict]]:
+    """Collapse a sequence of operations into its net effect.
+
+    Returns ``(changes, added)``: for ids that existed before the
+    operations, the merged field changes or None if the record was removed;
+    and the records added by the operations, in order. Applying both to a
+    record list gives the same result as replaying the ops with
+    ``apply_op``.
+    """
+    changes: Dict[str, Optional[dict]] = {}
+    added: Dict[str, dict] = {}
+    for op in ops:
+        kind = op['op']
+        if kind == 'add':
+            record = dict(op['task'])
+            added.pop(record['id'], None)
+            added[record['id']] = record
+            changes[record['id']] = None
+        elif kind == 'delete':
+            added.pop(op['id'], None)
+            changes[op['id']] = None
+        elif kind == 'update':
+            if op['id'] in added:
+                added[op['id']].update(op['changes'])
+            else:
+                change = changes.setdefault(op['id'], {})
+                if change is not None:
+                    change.update(op['changes'])
+    return changes, added
+
+
+_WHITESPACE = re.compile(r'\s*')
+
+
+def iter_json_array(f: IO[bytes], read_size: int = 1 << 16) -> Iterator:
+    """Yield the elements of a top-level JSON array from a binary file one at a time."""
+    decoder = json.JSONDecoder()
+    utf8 = codecs.getincrementaldecoder('utf-8-sig')()
+    buf, idx = '', 0
+    started = eof = False
+    while True:
+        idx = _WHITESPACE.match(buf, idx).end()
+        if idx >= len(buf):
+            if eof:
+                raise json.JSONDecodeError('Unterminated array', buf, idx)
+            data = f.read(read_size)
+            eof = not data
+            buf = buf[idx:] + utf8.decode(data, final=eof)
+            idx = 0
+            continue
+        if not started:
+            if buf[idx] != '[':
+                raise json.JSONDecodeError('Expecting a JSON array', buf, idx)
+            started = True
+            idx += 1
+            continue
+        if buf[idx] == ']':
+            return
+        if buf[idx] == ',':
+            idx += 1
+            continue
+        try:
+            item, end = decoder.raw_decode(buf, idx)
+        except json.JSONDecodeError:
+            # Most likely the element continues past what has been read
+            if eof:
+                raise
+            data = f.read(read_size)
+            eof = not data
+            buf = buf[idx:] + utf8.decode(data, final=eof)
+            idx = 0
+            continue
+        yield item
+        idx = end
+
+
+class SqliteStorage(LockedStorage):
+    """Tasks stored one row each in a SQLite database (WAL mode).
+
+    Mutations touch only the affected rows; filtering and sorting use the
+    manager's in-memory indexes. The ``position`` column keeps the display
+    order (new rows go last, an undone delete goes back between its old
+    neighbours); tasks are addressed by their stable id in the ``task_id``
+    column.
+
+    Every write increments a generation number in the ``meta`` table and
+    stamps the rows it touched with it (deleted ids go to
+    ``deleted_tasks``), so another process can fetch just the rows changed
+    since the generation it last saw.
+    """
+
+    def __init__(self, path: str):
+        super().__init__(path)
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        # Writes may come from the write-behind thread; callers serialize access
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        with self.conn:
+            self.conn.execute(
+                'CREATE TABLE IF NOT EXISTS tasks ('
+                ' id INTEGER PRIMARY KEY,'
+                ' title TEXT NOT NULL,'
+                ' completed INTEGER NOT NULL DEFAULT 0,'
+                ' created_at TEXT,'
+                ' due_date TEXT,'
+                ' priority INTEGER NOT NULL DEFAULT 1,'
+                ' category TEXT,'
+                ' task_id TEXT)'
+            )
+            columns = {row['name'] for row in self.conn.execute('PRAGMA table_info(tasks)')}
+            if 'task_id' not in columns:
+                # Databases created before tasks had ids; the manager assigns
+                # ids to such rows on first load and saves them back.
+                self.conn.execute('ALTER TABLE tasks ADD COLUMN task_id TEXT')
+            if 'generation' not in columns:
+                self.conn.execute('ALTER TABLE tasks ADD COLUMN generation INTEGER NOT NULL DEFAULT 0')
+            if 'completed_at' not in columns:
+                self.conn.execute('ALTER TABLE tasks ADD COLUMN completed_at TEXT')
+            if 'recurrence' not in columns:
+                self.conn.execute('ALTER TABLE tasks ADD COLUMN recurrence TEXT')
+            if 'position' not in columns:
+                self.conn.execute('ALTER TABLE tasks ADD COLUMN position REAL')
+                # Insertion order, as the rowid kept it before
+                self.conn.execute('UPDATE tasks SET position = id')
+            self.conn.execute('CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER)')
+            self.conn.execute(
+                'CREATE TABLE IF NOT EXISTS deleted_tasks (task_id TEXT PRIMARY KEY, generation INTEGER NOT NULL)'
+            )
+            self.conn.execute(
+                'CREATE UNIQUE INDEX IF NOT EXISTS idx_tasks_task_id ON tasks(task_id)'
+            )
+            # Only what SQL itself filters or sorts on is indexed; task
+            # queries are answered from the manager's in-memory indexes
+            for column in ('generation', 'position'):
+                self.conn.execute(
+                    f'CREATE INDEX IF NOT EXISTS idx_tasks_{column} ON tasks({column})'
+                )
+            # Earlier databases indexed these too; they only slowed writes
+            for column in ('completed', 'priority', 'category', 'due_date'):
+                self.conn.execute(f'DROP INDEX IF EXISTS idx_tasks_{column}')
+
+    @staticmethod
+    def _record(row) -> dict:
+        record = {field: row[field] for field in TASK_FIELDS if field != 'id'}
+        record['completed'] = bool(record['completed'])
+        if row['task_id'] is not None:
+            record['id'] = row['task_id']
+        return record
+
+    def is_empty(self) -> bool:
+        return self.conn.execute('SELECT 1 FROM tasks LIMIT 1').fetchone() is None
+
+    def load(self, strict: bool = False) -> List[dict]:
+        rows = self.conn.execute('SELECT * FROM tasks ORDER BY position')
+        return [self._record(row) for row in rows]
+
+    def iter_load(self, chunk_size: int) -> Iterator[LoadChunk]:
+        total = self.conn.execute('SELECT COUNT(*) FROM tasks').fetchone()[0] or 1
+        cursor = self.conn.execute('SELECT * FROM tasks ORDER BY position')
+        done = 0
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            done += len(rows)
+            yield [self._record(row) for row in rows], min(1.0, done / total)
+            if len(rows) < chunk_size:
+                return
+
+    def _meta(self, key: str) -> int:
+        row = self.conn.execute('SELECT value FROM meta WHERE key = ?', (key,)).fetchone()
+        return row[0] if row is not None else 0
+
+    def _next_generation(self) -> int:
+        self.conn.execute(
+            "INSERT INTO meta VALUES ('generation', 1)"
+            ' ON CONFLICT(key) DO UPDATE SET value = value + 1'
+        )
+        return self._meta('generation')
+
+    def _insert(self, record: dict, generation: int = 0, position: Optional[float] = None):
+        # Without a position the row goes after every other one
+        self.conn.execute(
+            'INSERT INTO tasks (title, completed, created_at, due_date, priority, category, task_id, completed_at,'
+            ' recurrence, generation, position) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?,'
+            ' COALESCE(?, (SELECT MAX(position) + 1 FROM tasks), 0))',
+            [*(record.get(field) for field in TASK_FIELDS), generation, position],
+        )
+
+    def _position_before(self, task_id: Optional[str]) -> Optional[float]:
+        """A position between the row of ``task_id`` and the one before it."""
+        row = self.conn.execute('SELECT position FROM tasks WHERE task_id = ?', (task_id,)).fetchone()
+        if row is None:
+            return None
+        previous = self.conn.execute(
+            'SELECT MAX(position) FROM tasks WHERE position < ?', (row[0],)
+        ).fetchone()[0]
+        return (row[0] + (previous if previous is not None else row[0] - 1)) / 2
+
+    def save(self, records: List[dict]):
+        with self._file_lock:
+            with self.conn:
+                generation = self._next_generation()
+                self.conn.execute('DELETE FROM tasks')
+                self.conn.execute('DELETE FROM deleted_tasks')
+                for position, record in enumerate(records):
+                    self._insert(record, generation, position)
+                # Deletions before this point are no longer recorded
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO meta VALUES ('rewritten', ?)", (generation,)
+                )
+            self._written()
+
+    def commit(self, ops: List[dict], snapshot: Snapshot):
+        with self._file_lock:
+            with self.conn:
+                generation = self._next_generation()
+                for op in ops:
+                    kind = op['op']
+                    if kind == 'add':
+                        self._insert(op['task'], generation, self._position_before(op.get('before')))
+                        self.conn.execute('DELETE FROM deleted_tasks WHERE task_id = ?', (op['task']['id'],))
+                    elif kind == 'delete':
+                        self.conn.execute('DELETE FROM tasks WHERE task_id = ?', (op['id'],))
+                        self.conn.execute(
+                            'INSERT OR REPLACE INTO deleted_tasks VALUES (?, ?)', (op['id'], generation)
+                        )
+                    elif kind == 'update':
+                        changes = {k: v for k, v in op['changes'].items() if k in TASK_FIELDS and k != 'id'}
+                        if changes:
+                            assignments = ', '.join(f'{key} = ?' for key in changes)
+                            self.conn.execute(
+                                f'UPDATE tasks SET {assignments}, generation = ? WHERE task_id = ?',
+                                [*changes.values(), generation, op['id']],
+                            )
+            self._written()
+
+    def _signature(self) -> tuple:
+        return (self._meta('generation'),)
+
+    def changes_since(self, version) -> Optional[List[dict]]:
+        if self._only_own_changes(version):
+            return []
+        if version is None:
+            return None
+        since = version[1][0]
+        if self._meta('rewritten') > since:
+            return None
+        ops = [
+            {'op': 'delete', 'id': row['task_id']}
+            for row in self.conn.execute('SELECT task_id FROM deleted_tasks WHERE generation > ?', (since,))
+        ]
+        # Added and updated rows alike come back whole
+        ops.extend(
+            {'op': 'add', 'task': self._record(row)}
+            for row in self.conn.execute('SELECT * FROM tasks WHERE generation > ? ORDER BY position', (since,))
+        )
+        return ops
+
+    def close(self):
+        self.conn.close()
+
+
+def migrate_json_to_sqlite(json_path: str, db_path: str) -> int:
+    """Copy every task from a JSON task file into a SQLite database.
+
+    Returns the number of tasks migrated. Refuses to run against a database
+    that already holds tasks so it cannot duplicate data.
+    """
+    records = JsonStorage(json_path).load()
+    storage = SqliteStorage(db_path)
+    try:
+        if not storage.is_empty():
+            raise ValueError(f'{db_path} already contains tasks')
+        storage.save(records)
+    finally:
+        storage.close()
+    return len(records)
+
+
+def open_storage(data_file: str, kind: str = 'json') -> Storage:
+    """Create the storage backend named ``kind`` for ``data_file``.
+
+    ``sqlite`` keeps its database next to the JSON file (``tasks.db`` for
+    ``tasks.json``) and migrates the JSON data into it the first time;
+    ``binary`` does the same with a binary snapshot (``tasks.snap``) plus
+    a journal.
+    """
+    if kind == 'json':
+        return JsonStorage(data_file)
+    if kind == 'journal':
+        return JournalStorage(data_file)
+    if kind == 'binary':
+        snapshot_path = os.path.splitext(data_file)[0] + '.snap'
+        if not os.path.exists(snapshot_path) and os.path.exists(data_file):
+            json_to_snapshot(data_file, snapshot_path)
+        return BinaryJournalStorage(snapshot_path)
+    if kind == 'sqlite':
+        db_path = os.path.splitext(data_file)[0] + '.db'
+        if not os.path.exists(db_path) and os.path.exists(data_file):
+            migrate_json_to_sqlite(data_file, db_path)
+        return SqliteStorage(db_path)
+    raise ValueError(f'Unknown storage kind {kind!r}')
@@ -2,24 +2,26 @@ import tkinter as tk
 from tkinter import ttk
 from tkinter import font as tkfont
 
+# Modern color palette
+COLORS = {
+    "primary": "#4f46e5",       # Indigo
+    "primary_light": "#818cf8", # Lighter indigo
+    "secondary": "#f43f5e",     # Rose
+    "background": "#f8fafc",    # Lightest slate
+    "surface": "#ffffff",      # White
+    "text": "#1e293b",          # Slate 800
+    "text_secondary": "#64748b", # Slate 500
+    "border": "#e2e8f0",        # Slate 200
+    "success": "#10b981",       # Emerald
+    "warning": "#f59e0b",       # Amber
+    "error": "#ef4444"          # Red
+}
+
 def configure_styles():
+    """Styles the main window needs for its first frame"""
     # Create style object
     style = ttk.Style()
-    
-    # Modern color palette
-    colors = {
-        "primary": "#4f46e5",       # Indigo
-        "primary_light": "#818cf8", # Lighter indigo
-        "secondary": "#f43f5e",     # Rose
-        "background": "#f8fafc",    # Lightest slate
-        "surface": "#ffffff",      # White
-        "text": "#1e293b",          # Slate 800
-        "text_secondary": "#64748b", # Slate 500
-        "border": "#e2e8f0",        # Slate 200
-        "success": "#10b981",       # Emerald
-        "warning": "#f59e0b",       # Amber
-        "error": "#ef4444"          # Red
-    }
+    colors = COLORS
     
     # Configure root window background
     style.configure(
@@ -143,40 +145,6 @@ def configure_styles():
         ]
     )
     
-    # Combobox styles
-    style.configure(
-        "TCombobox",
-        font=default_font,
-        foreground=colors["text"],
-        fieldbackground=colors["surface"],
-        background=colors["surface"],
-        bordercolor=colors["border"],
-        lightcolor=colors["border"],
-        darkcolor=colors["border"],
-        padding=8,
-        relief="flat",
-        arrowsize=12
-    )
-    
-    style.map(
-        "TCombobox",
-        bordercolor=[
-            ("focus", colors["primary"]),
-            ("hover", colors["primary_light"])
-        ],
-        lightcolor=[
-            ("focus", colors["primary"]),
-            ("hover", colors["primary_light"])
-        ],
-        darkcolor=[
-            ("focus", colors["primary"]),
-            ("hover", colors["primary_light"])
-        ],
-        fieldbackground=[("readonly", colors["surface"])],
-        selectbackground=[("readonly", colors["surface"])],
-        selectforeground=[("readonly", colors["text"])]
-    )
-    
     # Treeview styles
     style.configure(
         "Treeview",
@@ -250,6 +218,47 @@ def configure_styles():
             ("!selected", colors["border"])
         ]
     )
+
+
+def configure_dialog_styles():
+    """Styles only the task dialog uses; configured after the first frame"""
+    style = ttk.Style()
+    colors = COLORS
+    default_font = tkfont.nametofont("TkDefaultFont")
+    
+    # Combobox styles
+    style.configure(
+        "TCombobox",
+        font=default_font,
+        foreground=colors["text"],
+        fieldbackground=colors["surface"],
+        background=colors["surface"],
+        bordercolor=colors["border"],
+        lightcolor=colors["border"],
+        darkcolor=colors["border"],
+        padding=8,
+        relief="flat",
+        arrowsize=12
+    )
+    
+    style.map(
+        "TCombobox",
+        bordercolor=[
+            ("focus", colors["primary"]),
+            ("hover", colors["primary_light"])
+        ],
+        lightcolor=[
+            ("focus", colors["primary"]),
+            ("hover", colors["primary_light"])
+        ],
+        darkcolor=[
+            ("focus", colors["primary"]),
+            ("hover", colors["primary_light"])
+        ],
+        fieldbackground=[("readonly", colors["surface"])],
+        selectbackground=[("readonly", colors["surface"])],
+        selectforeground=[("readonly", colors["text"])]
+    )
     
     # Checkbutton styles
     style.configure(
@@ -308,4 +317,4 @@ def configure_styles():
         bordercolor=[
             ("selected", colors["border"])
         ]
-    )
\ No newline at end of file
+    )
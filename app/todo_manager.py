@@ -1,75 +1,1091 @@
+import base64
+import binascii
+import bisect
+import itertools
 import json
-import os
-from dataclasses import dataclass, asdict
-from typing import List, Optional
-from datetime import datetime
+import sys
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass, field, fields, replace
+from types import MappingProxyType
+from typing import Callable, Dict, Iterable, Iterator, List, Mapping, Optional, Set, Tuple
+from datetime import datetime, timedelta
+from . import perf
+from .archive import Archive, archive_dir_for
+from .formatting import parse_due_date
+from .history import History, Step, describe
+from .recurrence import due_day, due_on, parse_rule
+from .search import SearchIndex
+from .storage import JsonStorage, UnreadableDataError
+from .write_behind import WriteBehindStorage
 
-@dataclass
+def _new_task_id() -> str:
+    return uuid.uuid4().hex
+
+@dataclass(slots=True)
 class Task:
     title: str
     completed: bool = False
-    created_at: str = datetime.now().isoformat()
+    # Seconds since the epoch; stored as an ISO string only on disk
+    created_at: float = field(default_factory=time.time)
     due_date: Optional[str] = None
     priority: int = 1
     category: Optional[str] = None
+    id: str = field(default_factory=_new_task_id)
+    # When the task was last completed (seconds since the epoch), or None
+    completed_at: Optional[float] = None
+    # Recurrence rule text (see recurrence.py); due_date is then the date
+    # of the next occurrence
+    recurrence: Optional[str] = None
+
+    def __post_init__(self):
+        for key in _INTERNED_FIELDS:
+            value = getattr(self, key)
+            if value is not None:
+                setattr(self, key, sys.intern(value))
+
+# Fields whose values repeat across many tasks share one string object each
+_INTERNED_FIELDS = ('category', 'due_date', 'recurrence')
+_TASK_FIELDS = frozenset(f.name for f in fields(Task))
+# Seconds since the epoch in memory, ISO strings on disk
+_TIMESTAMP_FIELDS = ('created_at', 'completed_at')
+# Fields the manager keeps secondary indexes on
+_INDEXED_FIELDS = frozenset(('completed', 'category', 'priority', 'title', 'recurrence'))
+# Columns tasks can be sorted by
+SORT_FIELDS = ('title', 'completed', 'priority', 'category', 'due_date')
+
+def _coerce_field(key: str, value):
+    """Convert a field value from its on-disk form to the in-memory one."""
+    if value is None:
+        return value
+    if key in _TIMESTAMP_FIELDS and isinstance(value, str):
+        return datetime.fromisoformat(value).timestamp()
+    if key in _INTERNED_FIELDS:
+        return sys.intern(value)
+    return value
+
+def _stored_field(key: str, value):
+    """Convert a field value from its in-memory form to the on-disk one."""
+    if key in _TIMESTAMP_FIELDS and value is not None:
+        return datetime.fromtimestamp(value).isoformat()
+    return value
+
+def task_from_record(record: dict) -> Task:
+    """Build a Task from its serialized (JSON/storage) form."""
+    values = {key: _coerce_field(key, value) for key, value in record.items() if key in _TASK_FIELDS}
+    if values.get('created_at') is None:
+        values.pop('created_at', None)
+    return Task(**values)
+
+def _stamp_untimed_completion(task: Task, now: float) -> bool:
+    """Date a task completed before completion times were recorded to ``now``.
+
+    Its age is unknown, and counting from created_at would archive old
+    tasks the moment the app starts. Returns whether the task changed.
+    """
+    if task.completed and task.completed_at is None:
+        task.completed_at = now
+        return True
+    return False
+
+def task_to_record(task: Task) -> dict:
+    """Serialize a Task; timestamps are formatted only here."""
+    return {
+        'title': task.title,
+        'completed': task.completed,
+        'created_at': _stored_field('created_at', task.created_at),
+        'due_date': task.due_date,
+        'priority': task.priority,
+        'category': task.category,
+        'id': task.id,
+        'completed_at': _stored_field('completed_at', task.completed_at),
+        'recurrence': task.recurrence,
+    }
 
 class TodoManager:
-    def __init__(self, data_file='data/tasks.json'):
+    def __init__(self, data_file='data/tasks.json', storage=None, write_behind=False, autoload=True,
+                 archive_after_days: Optional[float] = None):
         self.data_file = data_file
-        self.tasks: List[Task] = []
-        self._ensure_data_file_exists()
-        self.load_tasks()
-
-    def _ensure_data_file_exists(self):
-        os.makedirs(os.path.dirname(self.data_file), exist_ok=True)
-        if not os.path.exists(self.data_file):
-            with open(self.data_file, 'w') as f:
-                json.dump([], f)
+        # Completed tasks older than this move to compressed monthly
+        # segments when archive_completed() runs; None keeps them all hot
+        self.archive_after_days = archive_after_days
+        self.archive = Archive(archive_dir_for(data_file))
+        self.storage = storage if storage is not None else JsonStorage(data_file)
+        if write_behind:
+            # Commits return at once; a background thread coalesces them
+            self.storage = WriteBehindStorage(self.storage)
+            self.storage.before_write = self._sync_before_write
+        # Held while tasks are mutated or snapshotted, so the write-behind
+        # thread never serializes a half-applied transaction
+        self._lock = threading.RLock()
+        # Insertion-ordered, so iteration order is the display order.
+        self.tasks: Dict[str, Task] = {}
+        self._listeners: List[Callable[[Set[str]], None]] = []
+        # Operations (with their inverses) of the open transaction
+        self._txn: Optional[List[Tuple[dict, dict]]] = None
+        # Set while the stored data cannot be read; the next commit then
+        # rewrites it from memory instead of appending to it
+        self._disk_unreadable = False
+        # Undo/redo steps of this manager's own committed transactions;
+        # changes synced from other processes are never recorded
+        self.history = History()
+        self._txn_history = True
+        # Secondary indexes, kept current by _apply: task ids by completion
+        # state, category and priority, plus each task's position in the
+        # display order so filtered results can be put back in order
+        self._seq: Dict[str, int] = {}
+        self._next_seq = 0
+        self._by_completed: Dict[bool, Set[str]] = {False: set(), True: set()}
+        self._by_category: Dict[Optional[str], Set[str]] = {}
+        self._by_priority: Dict[int, Set[str]] = {}
+        # Ids of tasks with a recurrence rule
+        self._recurring: Set[str] = set()
+        # Full-text index over titles and categories
+        self._search = SearchIndex()
+        # Due dates parsed once per load or edit: task id -> (timestamp,
+        # display label), and (timestamp, position, id) kept sorted for
+        # range queries
+        self._due: Dict[str, Tuple[float, str]] = {}
+        self._due_index: List[Tuple[float, int, str]] = []
+        self._due_sorted = True
+        # Sorted orderings, built the first time a column is sorted by and
+        # then kept current: field -> [(sort key, position, id)], plus each
+        # task's precomputed key for that field
+        self._orderings: Dict[str, List[Tuple[tuple, int, str]]] = {}
+        self._sort_keys: Dict[str, Dict[str, tuple]] = {}
+        # Storage version the in-memory tasks correspond to; another process
+        # saving changes it, and sync_from_storage() then catches up
+        self._disk_version = None
+        # Ids changed by a sync on the write-behind thread, announced to
+        # listeners by the next sync or transaction on the owning thread
+        self._unnotified: Set[str] = set()
+        # With autoload=False the caller loads later, e.g. progressively
+        # through iter_load_tasks(); mutations are refused until then
+        self.loaded = False
+        self.loading = False
+        if autoload:
+            self.load_tasks()
 
+    @perf.timed('manager.load_tasks')
     def load_tasks(self):
+        with self.storage.lock():
+            records = self.storage.load()
+            self._disk_version = self.storage.version()
+        # Steps recorded against the old tasks may not apply to these
+        self.history.clear()
+        self.tasks = {}
+        now = time.time()
+        stamped = False
+        for record in records:
+            task = task_from_record(record)
+            stamped = _stamp_untimed_completion(task, now) or stamped
+            self.tasks[task.id] = task
+        self._build_indexes()
+        self.loaded = True
+        # Files written before tasks had ids (or completion times) get them
+        # assigned above; save once so they stay stable across restarts.
+        if stamped or any('id' not in record for record in records):
+            self.save_tasks()
+
+    def iter_load_tasks(self, chunk_size: int = 5000) -> Iterator[float]:
+        """Load tasks chunk by chunk, yielding the fraction loaded after each.
+
+        Tasks (and the indexes) are usable after every chunk, so a caller can
+        show the first ones while the rest are still being read.
+        """
+        with self._lock:
+            self.history.clear()
+            self.tasks = {}
+            self._build_indexes()
+            self.loaded = False
+            self.loading = True
+        # Records without ids or completion times get them on loading,
+        # and are saved once at the end
+        needs_save = False
+        now = time.time()
+        chunks = self.storage.iter_load(chunk_size)
+        with self.storage.lock():
+            # The first read also settles the journal, if any; later
+            # chunks may race a writer, which the next sync picks up
+            first = next(chunks, None)
+            self._disk_version = self.storage.version()
         try:
-            with open(self.data_file, 'r') as f:
-                tasks_data = json.load(f)
-                self.tasks = [Task(**task) for task in tasks_data]
-        except (json.JSONDecodeError, FileNotFoundError):
-            self.tasks = []
+            for records, progress in itertools.chain([first] if first else [], chunks):
+                with self._lock:
+                    for record in records:
+                        needs_save = needs_save or 'id' not in record
+                        task = task_from_record(record)
+                        needs_save = _stamp_untimed_completion(task, now) or needs_save
+                        self._load_task(task)
+                    # Cheaper to rebuild a sorted ordering on demand than
+                    # to insert a whole chunk into it
+                    self._orderings = {}
+                    self._sort_keys = {}
+                yield progress
+        finally:
+            self.loading = False
+        self.loaded = True
+        if needs_save:
+            self.save_tasks()
+
+    def _load_task(self, task: Task):
+        # Like _apply's add, but defers sorting the due index
+        self.tasks[task.id] = task
+        self._seq[task.id] = self._next_seq
+        self._next_seq += 1
+        self._index_add(task)
+        info = parse_due_date(task.due_date)
+        if info is not None:
+            self._due[task.id] = info
+            self._due_index.append((info[0], self._seq[task.id], task.id))
+            self._due_sorted = False
 
+    @perf.timed('manager.save_tasks')
     def save_tasks(self):
-        with open(self.data_file, 'w') as f:
-            tasks_data = [asdict(task) for task in self.tasks]
-            json.dump(tasks_data, f, indent=2)
+        with self.storage.lock():
+            self.storage.save(self._snapshot())
+            self._disk_version = self.storage.version()
+
+    @perf.timed('manager.snapshot')
+    def _snapshot(self) -> List[dict]:
+        with self._lock:
+            return [task_to_record(task) for task in self.tasks.values()]
+
+    def flush(self):
+        """Make sure every committed change has reached the storage."""
+        self.storage.flush()
+
+    def close(self):
+        self.storage.close()
+
+    def add_listener(self, callback: Callable[[Set[str]], None]):
+        """Call ``callback(changed_ids)`` once after every committed transaction."""
+        self._listeners.append(callback)
+
+    @perf.timed('manager.notify')
+    def _notify(self, changed_ids: Set[str]):
+        for callback in self._listeners:
+            callback(changed_ids)
+
+    @contextmanager
+    def transaction(self, history: bool = True):
+        """Group mutations so they are persisted with a single write.
+
+        Mutations inside the block apply to memory immediately; on exit their
+        operations are committed to storage in one go and listeners are
+        notified once. If the block or the write raises, the in-memory
+        changes are rolled back. Nested transactions join the outermost one.
+        A committed transaction becomes one undo step unless any part of it
+        passes ``history=False``.
+        """
+        # The storage lock is always taken before self._lock, here and in
+        # the write-behind thread, so the two cannot deadlock
+        with self.storage.lock(), self._lock:
+            if self._txn is not None:
+                self._txn_history = self._txn_history and history
+                yield
+                return
+            # Catch up with other processes first so this write cannot
+            # overwrite what they saved
+            changed = self._sync_locked() if self.loaded else set()
+            txn = self._txn = []
+            self._txn_history = history
+            try:
+                yield
+                if txn:
+                    # Journaled storages append the operations, whole-file
+                    # storages ask for a full snapshot instead.
+                    with perf.timer('storage.commit'):
+                        if self._disk_unreadable:
+                            self.storage.save(self._snapshot())
+                            self._disk_unreadable = False
+                        else:
+                            self.storage.commit([op for op, _ in txn], self._snapshot)
+                    self._disk_version = self.storage.version()
+                    if self._txn_history:
+                        self.history.record(txn, describe(txn, self.tasks))
+            except BaseException:
+                self._rollback(txn)
+                raise
+            finally:
+                self._txn = None
+        changed.update(op['task']['id'] if op['op'] == 'add' else op['id'] for op, _ in txn)
+        if changed:
+            self._notify(changed)
+
+    @contextmanager
+    def reading(self):
+        """Hold off mutations from other threads while several reads must agree."""
+        with self._lock:
+            yield self
+
+    def sync_from_storage(self, blocking: bool = True) -> Set[str]:
+        """Apply changes other processes have saved since tasks were loaded.
+
+        Cheap when nothing changed: just a version check. Otherwise only the
+        changed tasks are updated, and listeners are notified with their
+        ids, which are also returned. With ``blocking=False`` nothing
+        happens while another process holds the lock.
+        """
+        if not self.loaded:
+            return set()
+        lock = self.storage.lock()
+        if not lock.acquire(blocking):
+            return set()
+        try:
+            with self._lock:
+                if self._txn is not None:
+                    return set()
+                changed = self._sync_locked()
+        finally:
+            lock.release()
+        if changed:
+            self._notify(changed)
+        return changed
 
+    def _sync_before_write(self):
+        # Runs on the write-behind thread with the storage lock held: a
+        # whole-file write must not drop what other processes saved since
+        if self.loaded:
+            with self._lock:
+                self._unnotified = self._sync_locked()
+
+    @perf.timed('manager.sync')
+    def _sync_locked(self) -> Set[str]:
+        changed, self._unnotified = self._unnotified, set()
+        version = self.storage.version()
+        if version is None or version == self._disk_version:
+            return changed
+        ops = self.storage.changes_since(self._disk_version)
+        if ops is None:
+            try:
+                records = self.storage.load(strict=True)
+            except UnreadableDataError:
+                # Damaged or half-written, e.g. mid-save in an editor:
+                # diffing against it would delete every task. Keep what is
+                # in memory and look again next time.
+                self._disk_unreadable = True
+                return changed
+            self._disk_unreadable = False
+            ops = self._diff_ops(records)
+        for op in ops:
+            op = self._reconcile(op)
+            if op is not None:
+                self._apply(op)
+                changed.add(op['task']['id'] if op['op'] == 'add' else op['id'])
+        # Read after loading: a journal load may have touched the files
+        self._disk_version = self.storage.version()
+        return changed
+
+    def _diff_ops(self, records: List[dict]) -> List[dict]:
+        # Everything on disk as an add (reconciled into an update or nothing
+        # for known tasks), plus deletes for tasks that are gone
+        ops = [{'op': 'add', 'task': record} for record in records if record.get('id')]
+        present = {record['id'] for record in records if record.get('id')}
+        ops.extend({'op': 'delete', 'id': task_id} for task_id in self.tasks if task_id not in present)
+        return ops
+
+    def _reconcile(self, op: dict) -> Optional[dict]:
+        """Turn an operation read from storage into one that applies to memory, or None."""
+        kind = op['op']
+        if kind == 'delete':
+            return op if op['id'] in self.tasks else None
+        if kind == 'add':
+            task_id = op['task'].get('id')
+            if task_id is None:
+                return None
+            if task_id not in self.tasks:
+                return op
+            op = {'op': 'update', 'id': task_id, 'changes': op['task']}
+        task = self.tasks.get(op['id'])
+        if task is None:
+            return None
+        changes = {}
+        for key, value in op['changes'].items():
+            if key == 'id' or key not in _TASK_FIELDS:
+                continue
+            value = _coerce_field(key, value)
+            current = getattr(task, key)
+            if key in _TIMESTAMP_FIELDS and value is not None and current is not None and abs(value - current) < 1e-3:
+                # Float round-trip through the ISO text
+                continue
+            if value != current:
+                changes[key] = value
+        return {'op': 'update', 'id': task.id, 'changes': changes} if changes else None
+
+    def _rollback(self, txn: List[Tuple[dict, dict]]):
+        for _, inverse in reversed(txn):
+            self._apply(inverse, inverse.get('seq'))
+        if any(inverse['op'] == 'add' for _, inverse in txn):
+            self._restore_order()
+
+    def _restore_order(self) -> bool:
+        """Put re-added tasks back at their position; returns whether any had to move."""
+        # They keep their old position number but land at the end of the
+        # dict. Sorted in place so views of self.tasks stay live.
+        seqs = [self._seq[task_id] for task_id in self.tasks]
+        if all(a < b for a, b in zip(seqs, seqs[1:])):
+            return False
+        ordered = sorted(self.tasks.items(), key=lambda item: self._seq[item[0]])
+        self.tasks.clear()
+        self.tasks.update(ordered)
+        return True
+
+    def _build_indexes(self):
+        self._seq = {task_id: seq for seq, task_id in enumerate(self.tasks)}
+        self._next_seq = len(self._seq)
+        self._by_completed = {False: set(), True: set()}
+        self._by_category = {}
+        self._by_priority = {}
+        self._recurring = set()
+        self._search.clear()
+        self._due = {}
+        self._due_index = []
+        for task in self.tasks.values():
+            self._index_add(task)
+            info = parse_due_date(task.due_date)
+            if info is not None:
+                self._due[task.id] = info
+                self._due_index.append((info[0], self._seq[task.id], task.id))
+        self._due_index.sort()
+        self._due_sorted = True
+        self._orderings = {}
+        self._sort_keys = {}
+
+    def _index_add(self, task: Task):
+        self._by_completed[bool(task.completed)].add(task.id)
+        self._by_category.setdefault(task.category, set()).add(task.id)
+        self._by_priority.setdefault(task.priority, set()).add(task.id)
+        if task.recurrence:
+            self._recurring.add(task.id)
+        self._search.add(task.id, (task.title, task.category))
+
+    def _index_remove(self, task: Task):
+        self._by_completed[bool(task.completed)].discard(task.id)
+        self._recurring.discard(task.id)
+        self._search.remove(task.id)
+        for buckets, key in ((self._by_category, task.category), (self._by_priority, task.priority)):
+            bucket = buckets.get(key)
+            if bucket is not None:
+                bucket.discard(task.id)
+                if not bucket:
+                    del buckets[key]
+
+    def _sorted_due_index(self) -> List[Tuple[float, int, str]]:
+        if not self._due_sorted:
+            self._due_index.sort()
+            self._due_sorted = True
+        return self._due_index
+
+    def _due_add(self, task: Task):
+        info = parse_due_date(task.due_date)
+        if info is not None:
+            self._due[task.id] = info
+            bisect.insort(self._sorted_due_index(), (info[0], self._seq[task.id], task.id))
+
+    def _due_remove(self, task_id: str):
+        info = self._due.pop(task_id, None)
+        if info is not None:
+            key = (info[0], self._seq[task_id], task_id)
+            due_index = self._sorted_due_index()
+            del due_index[bisect.bisect_left(due_index, key)]
+
+    def _sort_key(self, field: str, task: Task) -> tuple:
+        # Missing values sort after every present one
+        if field == 'due_date':
+            info = self._due.get(task.id)
+            return (0, info[0]) if info is not None else (1, 0.0)
+        if field == 'title':
+            return (0, task.title.casefold())
+        if field == 'category':
+            return (0, task.category.casefold()) if task.category else (1, '')
+        value = getattr(task, field)
+        return (0, int(value)) if value is not None else (1, 0)
+
+    def _ordering(self, field: str) -> List[Tuple[tuple, int, str]]:
+        ordering = self._orderings.get(field)
+        if ordering is None:
+            if field not in SORT_FIELDS:
+                raise ValueError(f'Cannot sort by {field!r}')
+            keys = {task_id: self._sort_key(field, task) for task_id, task in self.tasks.items()}
+            ordering = sorted((key, self._seq[task_id], task_id) for task_id, key in keys.items())
+            self._sort_keys[field] = keys
+            self._orderings[field] = ordering
+        return ordering
+
+    def _order_add(self, task: Task, fields: Iterable[str]):
+        for field in fields:
+            key = self._sort_keys[field][task.id] = self._sort_key(field, task)
+            bisect.insort(self._orderings[field], (key, self._seq[task.id], task.id))
+
+    def _order_remove(self, task_id: str, fields: Iterable[str]):
+        for field in fields:
+            entry = (self._sort_keys[field].pop(task_id), self._seq[task_id], task_id)
+            ordering = self._orderings[field]
+            del ordering[bisect.bisect_left(ordering, entry)]
+
+    def _apply(self, op: dict, seq: Optional[int] = None) -> dict:
+        """Apply one operation to the in-memory tasks and return its inverse.
+
+        An add takes the next position in the display order unless ``seq``
+        gives the one it had before it was deleted; a delete's inverse
+        carries that position as ``'seq'``.
+        """
+        kind = op['op']
+        if kind == 'add':
+            task = task_from_record(op['task'])
+            self.tasks[task.id] = task
+            if seq is None:
+                seq = self._next_seq
+                self._next_seq += 1
+            self._seq[task.id] = seq
+            self._index_add(task)
+            self._due_add(task)
+            self._order_add(task, self._orderings)
+            return {'op': 'delete', 'id': task.id}
+        if kind == 'delete':
+            task = self.tasks.pop(op['id'])
+            self._order_remove(task.id, self._orderings)
+            self._due_remove(task.id)
+            seq = self._seq.pop(task.id)
+            self._index_remove(task)
+            return {'op': 'add', 'task': task_to_record(task), 'seq': seq}
+        task = self.tasks[op['id']]
+        previous = {key: _stored_field(key, getattr(task, key)) for key in op['changes']}
+        reindex = not _INDEXED_FIELDS.isdisjoint(op['changes'])
+        redue = 'due_date' in op['changes']
+        resort = [field for field in self._orderings if field in op['changes']]
+        self._order_remove(task.id, resort)
+        if reindex:
+            self._index_remove(task)
+        if redue:
+            self._due_remove(task.id)
+        for key, value in op['changes'].items():
+            setattr(task, key, _coerce_field(key, value))
+        if reindex:
+            self._index_add(task)
+        if redue:
+            self._due_add(task)
+        self._order_add(task, resort)
+        return {'op': 'update', 'id': task.id, 'changes': previous}
+
+    def _execute(self, op: dict, seq: Optional[int] = None):
+        if not self.loaded:
+            raise RuntimeError('Tasks are still loading')
+        with self.transaction():
+            self._txn.append((op, self._apply(op, seq)))
+
+    def get_task(self, task_id: str) -> Optional[Task]:
+        return self.tasks.get(task_id)
+
+    @perf.timed('manager.add_task')
     def add_task(self, title: str, **kwargs):
-        task = Task(title=title, **kwargs)
-        self.tasks.append(task)
-        self.save_tasks()
-        return task
-
-    def delete_task(self, task_index: int):
-        if 0 <= task_index < len(self.tasks):
-            del self.tasks[task_index]
-            self.save_tasks()
-            return True
+        if kwargs.get('completed') and kwargs.get('completed_at') is None:
+            kwargs['completed_at'] = time.time()
+        if kwargs.get('recurrence'):
+            kwargs.update(self._recurrence_changes(None, kwargs))
+        task = Task(title=title, **{key: _coerce_field(key, value) for key, value in kwargs.items()})
+        self._execute({'op': 'add', 'task': task_to_record(task)})
+        return self.tasks[task.id]
+
+    @perf.timed('manager.delete_task')
+    def delete_task(self, task_id: str):
+        # Checked inside the transaction, after it has synced with storage
+        with self.transaction():
+            if task_id in self.tasks:
+                self._execute({'op': 'delete', 'id': task_id})
+                return True
         return False
 
-    def toggle_task_completion(self, task_index: int):
-        if 0 <= task_index < len(self.tasks):
-            self.tasks[task_index].completed = not self.tasks[task_index].completed
-            self.save_tasks()
-            return True
+    @perf.timed('manager.toggle_task_completion')
+    def toggle_task_completion(self, task_id: str):
+        with self.transaction():
+            task = self.tasks.get(task_id)
+            if task is not None:
+                changes = self._stamp_completion(task, {'completed': not task.completed})
+                self._execute({'op': 'update', 'id': task_id, 'changes': changes})
+                return True
         return False
 
-    def get_tasks(self, filter_completed: Optional[bool] = None):
+    @perf.timed('manager.bulk_add')
+    def bulk_add(self, items: Iterable[dict]) -> List[Task]:
+        """Add many tasks (dicts of ``add_task`` arguments) with one write."""
+        with self.transaction():
+            return [self.add_task(**item) for item in items]
+
+    @perf.timed('manager.bulk_update')
+    def bulk_update(self, updates: Dict[str, dict]) -> int:
+        """Apply ``{task_id: changes}`` with one write; returns how many tasks matched."""
+        with self.transaction():
+            return sum(self.update_task(task_id, **changes) for task_id, changes in updates.items())
+
+    @perf.timed('manager.bulk_delete')
+    def bulk_delete(self, task_ids: Iterable[str]) -> int:
+        """Delete many tasks with one write; returns how many were deleted."""
+        with self.transaction():
+            return sum(self.delete_task(task_id) for task_id in task_ids)
+
+    @perf.timed('manager.undo')
+    def undo(self) -> Optional[str]:
+        """Revert the last recorded transaction; returns its label, or None if there is nothing to undo."""
+        step = self.history.pop_undo()
+        if step is None:
+            return None
+        try:
+            redo = self._replay(step)
+        except BaseException:
+            self.history.push_undo(step)
+            raise
+        if redo.ops:
+            self.history.push_redo(redo)
+        return step.label
+
+    @perf.timed('manager.redo')
+    def redo(self) -> Optional[str]:
+        """Reapply the last undone transaction; returns its label, or None if there is nothing to redo."""
+        step = self.history.pop_redo()
+        if step is None:
+            return None
+        try:
+            undo = self._replay(step)
+        except BaseException:
+            self.history.push_redo(step)
+            raise
+        if undo.ops:
+            self.history.push_undo(undo)
+        return step.label
+
+    def _replay(self, step: Step) -> Step:
+        # Applied as one transaction of its own, so only these operations
+        # are saved; the inverses collected on the way are the opposite step
+        with self.transaction(history=False):
+            start = len(self._txn)
+            for op in step.ops:
+                seq = op.get('seq')
+                # Another process may have changed or removed the task since
+                op = self._reconcile(op)
+                if op is None:
+                    continue
+                if op['op'] == 'add':
+                    # The position number only means something to this
+                    # process; storage is told a neighbour instead (below)
+                    op = {'op': 'add', 'task': op['task']}
+                    self._execute(op, seq)
+                    continue
+                if op['op'] == 'update':
+                    op['changes'] = {key: _stored_field(key, value) for key, value in op['changes'].items()}
+                self._execute(op)
+            if any(op['op'] == 'add' for op, _ in self._txn[start:]) and self._restore_order():
+                self._mark_positions(self._txn[start:])
+            return Step(step.label, [inverse for _, inverse in reversed(self._txn[start:])])
+
+    def _mark_positions(self, txn: List[Tuple[dict, dict]]):
+        # Each re-added task is saved as going in front of the next task
+        # in the order that storage already holds when the add is applied,
+        # so only the operations are written and a reload keeps the order
+        adds = [op for op, _ in txn if op['op'] == 'add']
+        pending = {op['task']['id'] for op in adds}
+        order = list(self.tasks)
+        index = {task_id: i for i, task_id in enumerate(order)}
+        for op in adds:
+            task_id = op['task']['id']
+            pending.discard(task_id)
+            if task_id not in index:
+                continue
+            for other in range(index[task_id] + 1, len(order)):
+                if order[other] not in pending:
+                    op['before'] = order[other]
+                    break
+
+    def tasks_view(self) -> Mapping[str, Task]:
+        """Read-only live view of every task by id, in display order; nothing is copied."""
+        return MappingProxyType(self.tasks)
+
+    @perf.timed('manager.get_tasks')
+    def get_tasks(self, filter_completed: Optional[bool] = None, category: Optional[str] = None,
+                  priority: Optional[int] = None, query: Optional[str] = None,
+                  sort_by: Optional[str] = None, descending: bool = False):
+        """Tasks in display order, optionally narrowed by any combination of filters.
+
+        Filters are answered from the secondary indexes: the smallest
+        matching bucket is intersected with the others, so the cost follows
+        the size of the result rather than the number of tasks. ``query``
+        matches tasks whose title or category has words starting with each
+        word of the query.
+
+        ``sort_by`` names one of SORT_FIELDS to order by instead; ties keep
+        the display order, also when ``descending``.
+
+        The list is the caller's to keep; iter_tasks() yields the same
+        tasks without building it.
+        """
+        if sort_by is None and filter_completed is None and category is None and priority is None \
+                and not (query and query.strip()):
+            return list(self.tasks.values())
+        return list(self.iter_tasks(filter_completed, category, priority, query, sort_by, descending))
+
+    def iter_tasks(self, filter_completed: Optional[bool] = None, category: Optional[str] = None,
+                   priority: Optional[int] = None, query: Optional[str] = None,
+                   sort_by: Optional[str] = None, descending: bool = False,
+                   after: Optional[str] = None, limit: Optional[int] = None) -> Iterator[Task]:
+        """Lazily yield what get_tasks() returns, optionally one page at a time.
+
+        Tasks come straight off the dict or the sorted ordering, so reading
+        a page costs about the page rather than the whole list. ``after``
+        is the last task of the previous page, as its id or as the cursor
+        page_cursor() made for it: iteration resumes right after where that
+        task sorts now, even if it changed since, or, if it was deleted
+        and a cursor was given, where it sorted then. ``limit`` caps how
+        many tasks are yielded. As with iterating a dict, finish with the
+        iterator before the tasks next change.
+        """
+        if sort_by is not None:
+            self._ordering(sort_by)
+        if after is not None:
+            after = self._cursor_position(after, sort_by)
+        buckets = self._filter_buckets(filter_completed, category, priority, query)
+        if buckets and len(buckets[0]) * 4 <= len(self.tasks):
+            # Few candidates: order just those
+            ids = iter(self._ordered_matches(buckets, sort_by, descending, after))
+        else:
+            ids = self._ordered_ids(sort_by, descending, after)
+            for bucket in buckets:
+                ids = filter(bucket.__contains__, ids)
+        if limit is not None:
+            ids = itertools.islice(ids, limit)
+        tasks = self.tasks
+        return (tasks[task_id] for task_id in ids)
+
+    def count_tasks(self, filter_completed: Optional[bool] = None, category: Optional[str] = None,
+                    priority: Optional[int] = None, query: Optional[str] = None) -> int:
+        """How many tasks get_tasks() would return for these filters, without listing them."""
+        buckets = self._filter_buckets(filter_completed, category, priority, query)
+        if not buckets:
+            return len(self.tasks)
+        if len(buckets) == 1:
+            return len(buckets[0])
+        matches = iter(buckets[0])
+        for other in buckets[1:]:
+            matches = filter(other.__contains__, matches)
+        return sum(1 for _ in matches)
+
+    def _filter_buckets(self, filter_completed: Optional[bool], category: Optional[str],
+                        priority: Optional[int], query: Optional[str]) -> List[Set[str]]:
+        """Index buckets a task must be in to match, smallest first."""
+        buckets = []
+        if query and query.strip():
+            buckets.append(self.search_ids(query))
+        if filter_completed is not None:
+            buckets.append(self._by_completed[bool(filter_completed)])
+        if category is not None:
+            buckets.append(self._by_category.get(category, set()))
+        if priority is not None:
+            buckets.append(self._by_priority.get(priority, set()))
+        buckets.sort(key=len)
+        return buckets
+
+    def page_cursor(self, task_id: str, sort_by: Optional[str] = None, next_id: Optional[str] = None) -> str:
+        """Cursor for iter_tasks(after=) that resumes after ``task_id`` in this order.
+
+        It holds the task's position (sort key and place in the display
+        order) as well as its id, so paging still works once the task is
+        deleted. Those positions are only exact within this process, so
+        ``next_id``, the first task of the next page, is kept too: if
+        ``task_id`` is gone but it is not, iteration starts at it.
+        """
+        key = self._sort_key(sort_by, self.tasks[task_id]) if sort_by is not None else None
+        data = json.dumps([task_id, self._seq[task_id], sort_by, key, next_id], separators=(',', ':'))
+        return base64.urlsafe_b64encode(data.encode()).decode().rstrip('=')
+
+    def _cursor_position(self, after: str, sort_by: Optional[str]) -> Tuple[Optional[tuple], float, str]:
+        """(sort key, seq, id) to resume after, from a task id or a page_cursor()."""
+        if after in self.tasks:
+            key = self._sort_keys[sort_by][after] if sort_by is not None else None
+            return key, self._seq[after], after
+        try:
+            data = base64.urlsafe_b64decode(after + '=' * (-len(after) % 4))
+            task_id, seq, field, key, next_id = json.loads(data)
+        except (binascii.Error, UnicodeDecodeError, ValueError, TypeError):
+            raise ValueError(f'No task with id {after}')
+        if not isinstance(task_id, str) or not isinstance(seq, int):
+            raise ValueError(f'Invalid cursor {after}')
+        if task_id in self.tasks:
+            return self._cursor_position(task_id, sort_by)
+        if field != sort_by:
+            raise ValueError('The cursor is for a different sort order')
+        if next_id in self.tasks:
+            # Just before the next task: a lower seq, same key and id
+            key, next_seq, _ = self._cursor_position(next_id, sort_by)
+            return key, next_seq - 0.5, next_id
+        if key is not None:
+            # JSON turned the key tuple into a list
+            key = tuple(key)
+        return key, seq, task_id
+
+    def _ordered_matches(self, buckets: List[Set[str]], sort_by: Optional[str], descending: bool,
+                         after: Optional[tuple]) -> List[str]:
+        matches = iter(buckets[0])
+        for other in buckets[1:]:
+            matches = filter(other.__contains__, matches)
+        matches = list(matches)
+        if after is not None:
+            follows = self._follows(after, sort_by, descending)
+            matches = [task_id for task_id in matches if follows(task_id)]
+        matches.sort(key=self._seq.__getitem__)
+        if sort_by is not None:
+            # Stable, so equal keys keep the display order even when reversed
+            matches.sort(key=self._sort_keys[sort_by].__getitem__, reverse=descending)
+        return matches
+
+    def _follows(self, after: tuple, sort_by: Optional[str], descending: bool) -> Callable[[str], bool]:
+        """Predicate: does a task come after the ``after`` position in this order?"""
+        seq = self._seq
+        key, position, _ = after
+        if sort_by is None:
+            return lambda task_id: seq[task_id] > position
+        keys = self._sort_keys[sort_by]
+        if descending:
+            return lambda task_id: keys[task_id] < key or (keys[task_id] == key and seq[task_id] > position)
+        return lambda task_id: (keys[task_id], seq[task_id]) > (key, position)
+
+    def _ordered_ids(self, sort_by: Optional[str], descending: bool, after: Optional[tuple]) -> Iterator[str]:
+        if sort_by is not None:
+            return self._sorted_ids(sort_by, descending, after)
+        ids = iter(self.tasks)
+        if after is not None:
+            # A dict cannot seek; skip to the cursor without copying
+            # anything. The dict is in seq order, so this also finds the
+            # place of a deleted cursor task.
+            seq, position = self._seq, after[1]
+            ids = itertools.dropwhile(lambda task_id: seq[task_id] <= position, ids)
+        return ids
+
+    def _sorted_ids(self, field: str, descending: bool, after: Optional[tuple] = None) -> Iterator[str]:
+        ordering = self._ordering(field)
+        if after is None:
+            if not descending:
+                return (task_id for _, _, task_id in ordering)
+            return self._reversed_groups(ordering, len(ordering))
+        # Just past the cursor's entry, or where it would be if it is gone
+        position = bisect.bisect_right(ordering, after)
+        if not descending:
+            return (ordering[i][2] for i in range(position, len(ordering)))
+        # The rest of the cursor's group, then the groups before it
+        key = after[0]
+        group_start = bisect.bisect_left(ordering, (key,), 0, position)
+        group_end = bisect.bisect_left(ordering, (key, float('inf')), position)
+        return itertools.chain((ordering[i][2] for i in range(position, group_end)),
+                               self._reversed_groups(ordering, group_start))
+
+    @staticmethod
+    def _reversed_groups(ordering: List[Tuple[tuple, int, str]], end: int) -> Iterator[str]:
+        # Walk the groups of equal keys from the one ending at ``end`` back,
+        # each group still in display order
+        while end:
+            start = bisect.bisect_left(ordering, (ordering[end - 1][0],), 0, end)
+            for i in range(start, end):
+                yield ordering[i][2]
+            end = start
+
+    def sort_tasks(self, tasks: List[Task], sort_by: str, descending: bool = False) -> List[Task]:
+        """Sort a few tasks by a column with the precomputed keys, ties in display order."""
+        keys = self._sort_keys.get(sort_by)
+        if keys is None:
+            self._ordering(sort_by)
+            keys = self._sort_keys[sort_by]
+        tasks = sorted(tasks, key=lambda task: self._seq[task.id])
+        # Stable, so equal keys keep the display order even when reversed
+        tasks.sort(key=lambda task: keys[task.id], reverse=descending)
+        return tasks
+
+    def sort_occurrences(self, rows: List[tuple], sort_by: str, descending: bool = False) -> List[tuple]:
+        """sort_tasks() for rows starting ``(task, due time)``, e.g. tasks mixed with later occurrences.
+
+        The row's due time stands in for the task's own, so an occurrence
+        sorts by its own date; ties keep the display order, then go by date.
+        """
+        self._ordering(sort_by)
+        keys = self._sort_keys[sort_by]
+        rows = sorted(rows, key=lambda row: (self._seq[row[0].id], row[1]))
+        if sort_by == 'due_date':
+            rows.sort(key=lambda row: (0, row[1]), reverse=descending)
+        else:
+            rows.sort(key=lambda row: keys[row[0].id], reverse=descending)
+        return rows
+
+    def search_ids(self, query: str) -> Set[str]:
+        """Ids of the tasks matching a search-as-you-type query (prefix match per word)."""
+        return self._search.search(query)
+
+    def due_info(self, task_id: str) -> Optional[Tuple[float, str]]:
+        """(timestamp, display label) of a task's due date, or None if it has no valid one."""
+        return self._due.get(task_id)
+
+    def get_tasks_due_between(self, start: Optional[float], end: Optional[float],
+                              filter_completed: Optional[bool] = None) -> List[Task]:
+        """Tasks due in [start, end) (timestamps; None leaves that side open), earliest first."""
+        due_index = self._sorted_due_index()
+        lo = 0 if start is None else bisect.bisect_left(due_index, (start,))
+        hi = len(due_index) if end is None else bisect.bisect_left(due_index, (end,))
+        tasks = (self.tasks[task_id] for _, _, task_id in due_index[lo:hi])
         if filter_completed is None:
-            return self.tasks.copy()
-        return [task for task in self.tasks if task.completed == filter_completed]
-
-    def update_task(self, task_index: int, **kwargs):
-        if 0 <= task_index < len(self.tasks):
-            task = self.tasks[task_index]
-            for key, value in kwargs.items():
-                if hasattr(task, key):
-                    setattr(task, key, value)
-            self.save_tasks()
-            return True
-        return False
\ No newline at end of file
+            return list(tasks)
+        return [task for task in tasks if task.completed == filter_completed]
+
+    def get_due_times_between(self, start: Optional[float], end: Optional[float],
+                              filter_completed: Optional[bool] = None) -> List[Tuple[float, str]]:
+        """Like get_tasks_due_between(), but (due timestamp, task id) pairs straight from the index."""
+        due_index = self._sorted_due_index()
+        lo = 0 if start is None else bisect.bisect_left(due_index, (start,))
+        hi = len(due_index) if end is None else bisect.bisect_left(due_index, (end,))
+        if filter_completed is None:
+            return [(due, task_id) for due, _, task_id in due_index[lo:hi]]
+        bucket = self._by_completed[filter_completed]
+        return [(due, task_id) for due, _, task_id in due_index[lo:hi] if task_id in bucket]
+
+    def get_occurrences_between(self, start: float, end: float) -> List[Tuple[Task, float]]:
+        """Later occurrences of active recurring tasks due in [start, end), earliest first.
+
+        Each recurring task is stored once, as its next occurrence, which
+        get_tasks_due_between() already covers; the ones after it are
+        generated here for the window only, as (task, due timestamp) pairs.
+        """
+        first = datetime.fromtimestamp(start).date()
+        last = datetime.fromtimestamp(end).date()
+        occurrences = []
+        for task_id in self._recurring:
+            task = self.tasks[task_id]
+            if task.completed or task_id not in self._due:
+                continue
+            series_start = due_day(task.due_date)
+            for day in parse_rule(task.recurrence).between(series_start, max(first, series_start), last):
+                if day == series_start:
+                    continue
+                due = datetime.fromisoformat(due_on(task.due_date, day)).timestamp()
+                if start <= due < end:
+                    occurrences.append((due, self._seq[task_id], task))
+        occurrences.sort(key=lambda item: item[:2])
+        return [(task, due) for due, _, task in occurrences]
+
+    def get_overdue_tasks(self, now: Optional[datetime] = None) -> List[Task]:
+        now = now or datetime.now()
+        return self.get_tasks_due_between(None, now.timestamp(), filter_completed=False)
+
+    @staticmethod
+    def today_window(now: Optional[datetime] = None) -> Tuple[float, float]:
+        """[start, end) timestamps of today."""
+        today = datetime.combine((now or datetime.now()).date(), datetime.min.time())
+        return today.timestamp(), (today + timedelta(days=1)).timestamp()
+
+    @staticmethod
+    def week_window(now: Optional[datetime] = None) -> Tuple[float, float]:
+        """[start, end) timestamps from today through Sunday."""
+        today = datetime.combine((now or datetime.now()).date(), datetime.min.time())
+        return today.timestamp(), (today + timedelta(days=7 - today.weekday())).timestamp()
+
+    def get_tasks_due_today(self, now: Optional[datetime] = None) -> List[Task]:
+        return self.get_tasks_due_between(*self.today_window(now))
+
+    def get_tasks_due_this_week(self, now: Optional[datetime] = None) -> List[Task]:
+        """Tasks due from today through Sunday."""
+        return self.get_tasks_due_between(*self.week_window(now))
+
+    def categories(self) -> List[Optional[str]]:
+        """Categories currently in use."""
+        return list(self._by_category)
+
+    @perf.timed('manager.update_task')
+    def update_task(self, task_id: str, **kwargs):
+        with self.transaction():
+            task = self.tasks.get(task_id)
+            if task is not None:
+                changes = {key: value for key, value in kwargs.items() if key != 'id' and key in _TASK_FIELDS}
+                changes.update(self._recurrence_changes(task, changes))
+                changes = self._stamp_completion(task, changes)
+                if changes:
+                    self._execute({'op': 'update', 'id': task_id, 'changes': changes})
+                return True
+        return False
+
+    @staticmethod
+    def _stamp_completion(task: Task, changes: dict) -> dict:
+        # Completing a task records when; reopening it clears that
+        if 'completed' in changes and 'completed_at' not in changes \
+                and bool(changes['completed']) != bool(task.completed):
+            completed_at = datetime.now().isoformat() if changes['completed'] else None
+            if changes['completed'] and task.recurrence and task.due_date:
+                # Completing an occurrence of a recurring task moves it on to
+                # the next one instead, unless that was the last
+                rule = parse_rule(task.recurrence)
+                start = due_day(task.due_date)
+                following = rule.advance(start)
+                if following is not None:
+                    changes = {key: value for key, value in changes.items() if key != 'completed'}
+                    changes.update(due_date=due_on(task.due_date, rule.nth(start, 1)),
+                                   recurrence=str(following), completed_at=completed_at)
+                    return changes
+            changes = dict(changes, completed_at=completed_at)
+        return changes
+
+    @staticmethod
+    def _recurrence_changes(task: Optional[Task], changes: dict) -> dict:
+        """Normalized recurrence (and, for a new rule without one, a due date of today).
+
+        Raises RecurrenceError for rule text that does not parse.
+        """
+        current = task.recurrence if task is not None else None
+        due_moved = task is not None and changes.get('due_date', task.due_date) != task.due_date
+        if 'recurrence' not in changes and not (current and due_moved):
+            return {}
+        text = changes.get('recurrence', current)
+        if not text:
+            return {'recurrence': None}
+        rule = parse_rule(text)
+        due_date = changes.get('due_date', task.due_date if task is not None else None)
+        extra = {}
+        if not due_date:
+            due_date = extra['due_date'] = datetime.now().date().isoformat()
+        if text == current and due_moved:
+            # A moved due date carries a monthly rule's day of the month along
+            rule = replace(rule, day=None)
+        extra['recurrence'] = str(rule.anchored(due_day(due_date)))
+        return extra
+
+    @perf.timed('manager.archive_completed')
+    def archive_completed(self, older_than_days: Optional[float] = None, now: Optional[float] = None) -> int:
+        """Move tasks completed more than ``older_than_days`` ago into the archive.
+
+        Defaults to ``archive_after_days``. Tasks completed before
+        completion times were recorded count from when they were first
+        loaded, which stamps them (see _stamp_untimed_completion). The
+        moved tasks are deleted from the hot data in one transaction;
+        returns how many were archived.
+        """
+        days = self.archive_after_days if older_than_days is None else older_than_days
+        if days is None or not self.loaded:
+            return 0
+        cutoff = (time.time() if now is None else now) - days * 86400
+        # Not an undo step: undoing a background run would look like a
+        # random batch of tasks reappearing
+        with self.transaction(history=False):
+            old = [self.tasks[task_id] for task_id in self._by_completed[True]]
+            old = [task for task in old if task.completed_at is not None and task.completed_at < cutoff]
+            if old:
+                old.sort(key=lambda task: self._seq[task.id])
+                # Appended before the deletes are saved, so a failed save
+                # leaves a task in both places rather than in neither
+                self.archive.append([task_to_record(task) for task in old])
+                for task in old:
+                    self._execute({'op': 'delete', 'id': task.id})
+        return len(old)
+
+    def archived_tasks(self, segment: str) -> List[Task]:
+        """Tasks of one archive segment (see archive.segments()), most recently archived first.
+
+        They are not part of the manager's tasks or indexes and cannot be
+        changed; tasks that are (again) in the hot data are left out.
+        """
+        records = self.archive.load(segment)
+        return [task_from_record(record) for record in reversed(records) if record.get('id') not in self.tasks]
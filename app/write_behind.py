@@ -0,0 +1,156 @@
+import atexit
+import threading
+import time
+from typing import Callable, Iterator, List, Optional
+from .storage import LoadChunk, Snapshot, Storage, apply_op
+
+
+class WriteBehindStorage(Storage):
+    """Wraps another storage and performs its commits on a background thread.
+
+    ``commit`` only queues the operations and returns immediately. The
+    writer thread waits until no commit has arrived for ``delay`` seconds
+    (or at most ``max_delay`` after the first pending one) and then passes
+    everything queued to the wrapped storage as a single commit. ``flush``
+    writes whatever is pending synchronously; it runs at interpreter exit
+    too, so a closed app never loses an edit.
+    """
+
+    def __init__(self, storage: Storage, delay: float = 0.5, max_delay: float = 5.0):
+        self.storage = storage
+        self.delay = delay
+        self.max_delay = max_delay
+        self._cond = threading.Condition()
+        # Serializes every call into the wrapped storage; reentrant because
+        # before_write may load from it
+        self._io_lock = threading.RLock()
+        # Called before each background write, with the storage lock held,
+        # so the owner can take in what other processes saved meanwhile
+        self.before_write: Optional[Callable[[], None]] = None
+        self._pending: List[dict] = []
+        self._snapshot: Optional[Snapshot] = None
+        self._first_pending = 0.0
+        self._last_pending = 0.0
+        self._closed = False
+        self.error: Optional[BaseException] = None
+        self._thread = threading.Thread(target=self._run, name='todo-write-behind', daemon=True)
+        self._thread.start()
+        atexit.register(self.flush)
+
+    def load(self, strict: bool = False) -> List[dict]:
+        with self._io_lock:
+            records = self.storage.load(strict)
+        # What is stored once the queued operations are written, so
+        # comparing it with memory shows only other processes' changes
+        pending = self._pending_ops()
+        if not pending:
+            return records
+        by_id = {record.get('id'): record for record in records}
+        for op in pending:
+            if op['op'] == 'add':
+                # Later updates must not change the queued operation itself
+                op = {'op': 'add', 'task': dict(op['task'])}
+            apply_op(by_id, op)
+        return list(by_id.values())
+
+    def iter_load(self, chunk_size: int) -> Iterator[LoadChunk]:
+        # Nothing is written while loading, so no locking is needed here
+        return self.storage.iter_load(chunk_size)
+
+    def save(self, records: List[dict]):
+        # A full save supersedes whatever is queued
+        with self._cond:
+            self._pending = []
+        with self._io_lock:
+            self.storage.save(records)
+
+    def commit(self, ops: List[dict], snapshot: Snapshot):
+        with self._cond:
+            now = time.monotonic()
+            if not self._pending:
+                self._first_pending = now
+            self._last_pending = now
+            self._pending.extend(ops)
+            self._snapshot = snapshot
+            self._cond.notify()
+
+    def lock(self):
+        return self.storage.lock()
+
+    def version(self):
+        return self.storage.version()
+
+    def changes_since(self, version) -> Optional[List[dict]]:
+        ops = self.storage.changes_since(version)
+        if ops:
+            # The queued operations get written after these, so they win
+            ops = ops + self._pending_ops()
+        return ops
+
+    def _pending_ops(self) -> List[dict]:
+        with self._cond:
+            return list(self._pending)
+
+    @property
+    def dirty(self) -> bool:
+        with self._cond:
+            return bool(self._pending)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending and not self._closed:
+                    self._cond.wait()
+                if self._closed:
+                    return
+                # Debounce: keep absorbing commits until the burst settles
+                while self._pending and not self._closed:
+                    now = time.monotonic()
+                    remaining = min(self._last_pending + self.delay, self._first_pending + self.max_delay) - now
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+            self._write_pending()
+
+    def _write_pending(self):
+        # The file lock comes first, as it does for the manager's
+        # transactions, so the two threads cannot wait on each other
+        with self.storage.lock(), self._io_lock:
+            if not self.dirty:
+                return
+            try:
+                if self.before_write is not None:
+                    self.before_write()
+            except Exception as e:
+                # Wait out another delay before retrying, as for a failed commit
+                with self._cond:
+                    self._first_pending = self._last_pending = time.monotonic()
+                self.error = e
+                return
+            with self._cond:
+                ops, self._pending = self._pending, []
+                snapshot = self._snapshot
+            try:
+                self.storage.commit(ops, snapshot)
+                self.error = None
+            except Exception as e:
+                # Keep the operations queued so the next flush retries them
+                with self._cond:
+                    self._pending[:0] = ops
+                    self._first_pending = self._last_pending = time.monotonic()
+                self.error = e
+
+    def flush(self):
+        """Write everything pending now; re-raises the last write error, if any."""
+        self._write_pending()
+        if self.error is not None:
+            raise self.error
+
+    def close(self):
+        self.flush()
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._thread.join()
+        atexit.unregister(self.flush)
+        self.storage.close()
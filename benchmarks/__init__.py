@@ -0,0 +1,4 @@
+"""Headless benchmarks for the task manager, storage backends and row rendering.
+
+Run ``python -m benchmarks.run --help``; nothing here imports tkinter.
+"""
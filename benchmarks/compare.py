@@ -0,0 +1,41 @@
+"""Compare two benchmark result files.
+
+    python -m benchmarks.compare before.json after.json
+
+Prints the median time of every measurement present in both runs and the
+ratio after/before; ratios above ``--threshold`` are flagged.
+"""
+import argparse
+import json
+import sys
+
+
+def load(path: str) -> dict:
+    with open(path) as f:
+        report = json.load(f)
+    return {(row['size'], row['storage'], row['name']): row for row in report['results']}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('before')
+    parser.add_argument('after')
+    parser.add_argument('--threshold', type=float, default=1.10, help='flag ratios above this')
+    args = parser.parse_args(argv)
+
+    before, after = load(args.before), load(args.after)
+    regressions = 0
+    for key in sorted(before.keys() & after.keys()):
+        size, storage, name = key
+        old, new = before[key]['median'], after[key]['median']
+        ratio = new / old if old else float('inf')
+        flag = ''
+        if ratio > args.threshold:
+            flag = '  <-- slower'
+            regressions += 1
+        print(f'{size:>9} {storage:<8} {name:<32} {old * 1000:>10.2f} ms {new * 1000:>10.2f} ms {ratio:>6.2f}x{flag}')
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+import json
+import random
+import uuid
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+# Weighted roughly like a real list: a few busy categories, a long tail
+# and plenty of uncategorized tasks
+CATEGORIES = [
+    ('Work', 30), ('Personal', 20), ('Shopping', 12), ('Home', 10), ('Health', 6),
+    ('Finance', 5), ('Travel', 3), ('Learning', 3), (None, 11),
+]
+# Most tasks keep the default priority
+PRIORITIES = [(1, 40), (2, 25), (3, 20), (4, 10), (5, 5)]
+
+VERBS = ['Buy', 'Call', 'Email', 'Fix', 'Write', 'Review', 'Plan', 'Book', 'Clean', 'Pay',
+         'Read', 'Update', 'Prepare', 'Schedule', 'Send', 'Check', 'Order', 'Finish']
+OBJECTS = ['groceries', 'report', 'dentist', 'invoice', 'presentation', 'car', 'garden',
+           'tickets', 'rent', 'newsletter', 'budget', 'meeting notes', 'laundry', 'flights',
+           'birthday gift', 'pull request', 'tax return', 'bike', 'kitchen', 'slides']
+
+
+def _weighted(rng: random.Random, choices, n: int) -> list:
+    values, weights = zip(*choices)
+    return rng.choices(values, weights=weights, k=n)
+
+
+def generate_records(n: int, seed: int = 0, now: Optional[datetime] = None) -> List[dict]:
+    """``n`` task records in the on-disk format, reproducible for a given seed.
+
+    About 40% of the tasks have no due date; the rest fall between a month
+    ago and two months ahead, so overdue, today and this-week views all
+    have something in them. Older tasks are more likely to be completed.
+    """
+    rng = random.Random(seed)
+    now = now or datetime(2026, 1, 15, 12, 0)
+    categories = _weighted(rng, CATEGORIES, n)
+    priorities = _weighted(rng, PRIORITIES, n)
+    records = []
+    for i in range(n):
+        age = rng.random()
+        created = now - timedelta(days=365 * age, seconds=rng.randrange(86400))
+        due_date = None
+        if rng.random() < 0.6:
+            due_date = (now + timedelta(days=rng.randint(-30, 60))).date().isoformat()
+        title = f'{rng.choice(VERBS)} {rng.choice(OBJECTS)}'
+        if rng.random() < 0.3:
+            title += f' #{rng.randrange(1000)}'
+        records.append({
+            'title': title,
+            'completed': rng.random() < 0.2 + 0.6 * age,
+            'created_at': created.isoformat(),
+            'due_date': due_date,
+            'priority': priorities[i],
+            'category': categories[i],
+            'id': uuid.UUID(int=rng.getrandbits(128), version=4).hex,
+        })
+    return records
+
+
+def write_dataset(path: str, n: int, seed: int = 0) -> List[dict]:
+    records = generate_records(n, seed)
+    with open(path, 'w') as f:
+        json.dump(records, f, indent=2)
+    return records
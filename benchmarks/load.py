@@ -0,0 +1,223 @@
+"""Generate concurrent HTTP load against ``python -m app.server``.
+
+    python -m benchmarks.load --size 10000 --clients 50 --duration 10
+    python -m benchmarks.load --connect 127.0.0.1:8765 --writes 0.2
+
+Without ``--connect`` a server is started on a free localhost port over a
+fresh synthetic dataset and stopped afterwards. Every client keeps one
+keep-alive connection open and sends requests back to back: paged and
+filtered lists, single gets and (a ``--writes`` fraction of) updates and
+adds. Throughput and latency percentiles per request kind are written as
+JSON, with a short table on stderr.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Tuple
+
+from .datasets import write_dataset
+from .run import git_revision
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LIST_QUERIES = [
+    'limit=50',
+    'completed=false&limit=50',
+    'completed=false&sort=due_date&limit=50',
+    'sort=priority&desc=1&limit=50',
+    'category=Work&limit=50',
+    'q=rev&limit=50',
+]
+
+
+class Client:
+    """One keep-alive HTTP/1.1 connection."""
+
+    def __init__(self, host: str, port: int):
+        self.host = host
+        self.port = port
+        self.reader = self.writer = None
+
+    async def request(self, method: str, path: str, payload=None) -> Tuple[int, object]:
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        body = b'' if payload is None else json.dumps(payload).encode()
+        self.writer.write(f'{method} {path} HTTP/1.1\r\nHost: {self.host}\r\n'
+                          f'Content-Length: {len(body)}\r\n\r\n'.encode() + body)
+        await self.writer.drain()
+        status = int((await self.reader.readline()).split()[1])
+        length = 0
+        close = False
+        while True:
+            line = await self.reader.readline()
+            if line in (b'\r\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            if name.lower() == 'content-length':
+                length = int(value)
+            elif name.lower() == 'connection' and value.strip().lower() == 'close':
+                close = True
+        data = await self.reader.readexactly(length) if length else b''
+        if close:
+            self.close()
+        return status, json.loads(data) if data else None
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.reader = self.writer = None
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+async def run_client(client: Client, ids: List[str], deadline: float, writes: float,
+                     latencies: Dict[str, List[float]], errors: Dict[str, int], rng: random.Random):
+    while time.perf_counter() < deadline:
+        roll = rng.random()
+        if roll < writes / 2:
+            kind, method, path = 'update', 'PATCH', f'/tasks/{rng.choice(ids)}'
+            payload = {'completed': rng.random() < 0.5, 'priority': rng.randint(1, 5)}
+        elif roll < writes:
+            kind, method, path = 'add', 'POST', '/tasks'
+            payload = {'title': f'Load test task {rng.randrange(1 << 30)}', 'category': 'Load'}
+        elif roll < (1 + writes) / 2:
+            kind, method, path, payload = 'get', 'GET', f'/tasks/{rng.choice(ids)}', None
+        else:
+            kind, method, path, payload = 'list', 'GET', f'/tasks?{rng.choice(LIST_QUERIES)}', None
+        start = time.perf_counter()
+        status, _ = await client.request(method, path, payload)
+        latencies.setdefault(kind, []).append(time.perf_counter() - start)
+        if status >= 400:
+            errors[kind] = errors.get(kind, 0) + 1
+
+
+async def generate_load(host: str, port: int, clients: int, duration: float, writes: float, seed: int) -> dict:
+    probe = Client(host, port)
+    _, page = await probe.request('GET', '/tasks?limit=1000')
+    probe.close()
+    ids = [record['id'] for record in page['tasks']]
+    if not ids:
+        raise SystemExit('The server has no tasks to read')
+
+    latencies: Dict[str, List[float]] = {}
+    errors: Dict[str, int] = {}
+    connections = [Client(host, port) for _ in range(clients)]
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        run_client(client, ids, start + duration, writes, latencies, errors, random.Random(seed + i))
+        for i, client in enumerate(connections)
+    ))
+    elapsed = time.perf_counter() - start
+    for client in connections:
+        client.close()
+
+    requests = sum(len(values) for values in latencies.values())
+    kinds = {}
+    for kind, values in sorted(latencies.items()):
+        kinds[kind] = {
+            'requests': len(values),
+            'errors': errors.get(kind, 0),
+            'p50': percentile(values, 0.50),
+            'p95': percentile(values, 0.95),
+            'p99': percentile(values, 0.99),
+            'max': max(values),
+        }
+        print(f'{kind:<8} {len(values):>8} req  p50 {kinds[kind]["p50"] * 1000:>7.2f} ms'
+              f'  p95 {kinds[kind]["p95"] * 1000:>7.2f} ms  p99 {kinds[kind]["p99"] * 1000:>7.2f} ms'
+              f'  errors {errors.get(kind, 0)}', file=sys.stderr)
+    print(f'{requests / elapsed:.0f} requests/s from {clients} clients', file=sys.stderr)
+    return {'requests': requests, 'seconds': elapsed, 'throughput': requests / elapsed, 'kinds': kinds}
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def start_server(data_file: str, storage: str, port: int) -> subprocess.Popen:
+    server = subprocess.Popen([sys.executable, '-m', 'app.server', '--data', data_file,
+                               '--storage', storage, '--port', str(port)], cwd=ROOT)
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise SystemExit('The server exited during startup')
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=0.5).close()
+            return server
+        except OSError:
+            time.sleep(0.1)
+    server.kill()
+    raise SystemExit('The server did not start listening')
+
+
+def stop_server(server: subprocess.Popen):
+    # On POSIX the server flushes pending writes on SIGTERM before exiting
+    server.terminate()
+    try:
+        server.wait(30)
+    except subprocess.TimeoutExpired:
+        server.kill()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--connect', metavar='HOST:PORT', help='use a running server instead of starting one')
+    parser.add_argument('--size', type=int, default=10_000, help='tasks in the generated dataset')
+    parser.add_argument('--storage', default='json', choices=['json', 'journal', 'sqlite', 'binary'])
+    parser.add_argument('--clients', type=int, default=50)
+    parser.add_argument('--duration', type=float, default=10.0, help='seconds')
+    parser.add_argument('--writes', type=float, default=0.1, help='fraction of requests that write')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--output', help='write the JSON results here instead of stdout')
+    args = parser.parse_args(argv)
+
+    workdir = server = None
+    try:
+        if args.connect:
+            host, _, port = args.connect.rpartition(':')
+            port = int(port)
+        else:
+            workdir = tempfile.mkdtemp(prefix='todo-load-')
+            data_file = os.path.join(workdir, 'tasks.json')
+            write_dataset(data_file, args.size)
+            host, port = '127.0.0.1', free_port()
+            server = start_server(data_file, args.storage, port)
+        result = asyncio.run(generate_load(host, port, args.clients, args.duration, args.writes, args.seed))
+    finally:
+        if server is not None:
+            stop_server(server)
+        if workdir is not None:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {
+        'meta': {
+            'revision': git_revision(),
+            'python': sys.version.split()[0],
+            'size': None if args.connect else args.size,
+            'storage': None if args.connect else args.storage,
+            'clients': args.clients,
+            'writes': args.writes,
+        },
+        'result': result,
+    }
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,243 @@
+"""Time TodoManager operations and row rendering on synthetic datasets.
+
+    python -m benchmarks.run --sizes 1000 10000 --storage json sqlite --output before.json
+
+Results are written as JSON (to stdout unless ``--output`` is given) with a
+short table on stderr; ``python -m benchmarks.compare`` diffs two runs.
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Callable, List, Optional
+
+from app.formatting import RowCache, format_task_row
+from app.storage import open_storage
+from app.todo_manager import TodoManager
+from .datasets import write_dataset
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000, 1_000_000]
+STORAGE_KINDS = ['json', 'journal', 'sqlite', 'binary']
+
+
+class Results:
+    def __init__(self):
+        self.rows: List[dict] = []
+
+    def add(self, size: int, storage: str, name: str, runs: List[float], ops: int = 1):
+        self.rows.append({
+            'size': size,
+            'storage': storage,
+            'name': name,
+            'ops': ops,
+            'median': statistics.median(runs),
+            'min': min(runs),
+            'per_op': statistics.median(runs) / ops,
+            'runs': runs,
+        })
+        print(f'{size:>9} {storage:<8} {name:<32} {statistics.median(runs) * 1000:>10.2f} ms'
+              + (f'  ({statistics.median(runs) / ops * 1e6:.1f} us/op)' if ops > 1 else ''),
+              file=sys.stderr)
+
+
+def timed(fn: Callable[[], object], repeat: int, setup: Optional[Callable[[], object]] = None) -> List[float]:
+    runs = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        gc.collect()
+        start = time.perf_counter()
+        fn()
+        runs.append(time.perf_counter() - start)
+    return runs
+
+
+def open_manager(data_file: str, kind: str) -> TodoManager:
+    return TodoManager(data_file, storage=open_storage(data_file, kind), autoload=False)
+
+
+def bench_storage(results: Results, size: int, kind: str, dataset: str, workdir: str, repeat: int, ops: int):
+    data_file = os.path.join(workdir, 'tasks.json')
+    shutil.copyfile(dataset, data_file)
+    manager = open_manager(data_file, kind)
+    # First open may migrate the JSON; time steady-state loads only
+    manager.load_tasks()
+    manager.close()
+
+    def load():
+        m = open_manager(data_file, kind)
+        try:
+            m.load_tasks()
+        finally:
+            m.close()
+
+    def iter_load():
+        m = open_manager(data_file, kind)
+        try:
+            for _ in m.iter_load_tasks():
+                pass
+        finally:
+            m.close()
+
+    results.add(size, kind, 'load_tasks', timed(load, repeat))
+    results.add(size, kind, 'iter_load_tasks', timed(iter_load, repeat))
+
+    manager = open_manager(data_file, kind)
+    manager.load_tasks()
+    try:
+        results.add(size, kind, 'save_tasks', timed(manager.save_tasks, repeat))
+        bench_mutators(results, size, kind, manager, repeat, ops)
+        if kind == 'json':
+            # Queries and rendering do not touch storage; measure them once
+            bench_queries(results, size, manager, repeat)
+            bench_render(results, size, manager, repeat)
+    finally:
+        manager.close()
+
+
+def bench_mutators(results: Results, size: int, kind: str, manager: TodoManager, repeat: int, ops: int):
+    rng = random.Random(size)
+
+    def sample() -> List[str]:
+        return rng.sample(list(manager.tasks), min(ops, len(manager.tasks)))
+
+    def add():
+        for i in range(ops):
+            manager.add_task(f'Benchmark task {i}', priority=rng.randint(1, 5), category='Work')
+    results.add(size, kind, 'add_task', timed(add, repeat), ops)
+
+    ids: List[str] = []
+
+    def pick():
+        ids[:] = sample()
+
+    results.add(size, kind, 'update_task',
+                timed(lambda: [manager.update_task(i, title='Renamed', priority=5) for i in ids], repeat, pick),
+                ops)
+    results.add(size, kind, 'toggle_task_completion',
+                timed(lambda: [manager.toggle_task_completion(i) for i in ids], repeat, pick),
+                ops)
+    results.add(size, kind, 'delete_task',
+                timed(lambda: [manager.delete_task(i) for i in ids], repeat, pick),
+                ops)
+
+    bulk = min(1000, size)
+
+    def bulk_add():
+        manager.bulk_add({'title': f'Bulk task {i}', 'category': 'Home'} for i in range(bulk))
+    results.add(size, kind, 'bulk_add', timed(bulk_add, repeat), bulk)
+
+    def pick_bulk():
+        ids[:] = rng.sample(list(manager.tasks), bulk)
+
+    results.add(size, kind, 'bulk_update',
+                timed(lambda: manager.bulk_update({i: {'completed': True} for i in ids}), repeat, pick_bulk),
+                bulk)
+    results.add(size, kind, 'bulk_delete', timed(lambda: manager.bulk_delete(ids), repeat, pick_bulk), bulk)
+
+
+def bench_queries(results: Results, size: int, manager: TodoManager, repeat: int):
+    queries = {
+        'get_tasks': lambda: manager.get_tasks(),
+        'get_tasks(active)': lambda: manager.get_tasks(filter_completed=False),
+        'get_tasks(completed)': lambda: manager.get_tasks(filter_completed=True),
+        'get_tasks(category)': lambda: manager.get_tasks(category='Travel'),
+        'get_tasks(priority)': lambda: manager.get_tasks(priority=5),
+        'get_tasks(active,category)': lambda: manager.get_tasks(filter_completed=False, category='Work'),
+        'get_tasks(query)': lambda: manager.get_tasks(query='rev'),
+        'get_tasks(sort priority)': lambda: manager.get_tasks(sort_by='priority', descending=True),
+        'get_tasks(active,sort due)': lambda: manager.get_tasks(filter_completed=False, sort_by='due_date'),
+        'iter_tasks(page 100)': lambda: list(manager.iter_tasks(limit=100)),
+        'iter_tasks(active,sort due,page 100)': lambda: list(manager.iter_tasks(
+            filter_completed=False, sort_by='due_date', limit=100)),
+        'count_tasks(active)': lambda: manager.count_tasks(filter_completed=False),
+        'get_overdue_tasks': lambda: manager.get_overdue_tasks(datetime(2026, 1, 15, 12, 0)),
+        'get_tasks_due_this_week': lambda: manager.get_tasks_due_this_week(datetime(2026, 1, 15, 12, 0)),
+    }
+    for name, query in queries.items():
+        results.add(size, 'json', name, timed(query, repeat))
+
+
+def bench_render(results: Results, size: int, manager: TodoManager, repeat: int):
+    # The non-virtual path of TodoAppGUI.refresh_task_list, minus Tk
+    tasks = manager.get_tasks()
+    now = time.time()
+
+    def format_rows():
+        for task in tasks:
+            info = manager.due_info(task.id)
+            overdue = info is not None and not task.completed and info[0] < now
+            format_task_row(task, info[1] if info is not None else task.due_date, overdue)
+
+    cache = RowCache(manager)
+
+    def cached_rows():
+        for task in tasks:
+            cache.row(task, now)
+
+    results.add(size, 'json', 'format_task_row', timed(format_rows, repeat), len(tasks))
+    results.add(size, 'json', 'RowCache.row (cold)', timed(cached_rows, repeat, cache.clear), len(tasks))
+    cached_rows()
+    results.add(size, 'json', 'RowCache.row (warm)', timed(cached_rows, repeat), len(tasks))
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES)
+    parser.add_argument('--storage', nargs='+', choices=STORAGE_KINDS, default=['json'])
+    parser.add_argument('--repeat', type=int, default=3, help='runs per measurement (median is reported)')
+    parser.add_argument('--ops', type=int, default=20, help='calls per single-task mutator run')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='write the JSON results here instead of stdout')
+    args = parser.parse_args(argv)
+
+    results = Results()
+    with tempfile.TemporaryDirectory(prefix='todo-bench-') as tmp:
+        for size in args.sizes:
+            dataset = os.path.join(tmp, f'tasks-{size}.json')
+            write_dataset(dataset, size, args.seed)
+            for kind in args.storage:
+                workdir = os.path.join(tmp, f'{size}-{kind}')
+                os.mkdir(workdir)
+                bench_storage(results, size, kind, dataset, workdir, args.repeat, args.ops)
+                shutil.rmtree(workdir)
+            os.remove(dataset)
+
+    report = {
+        'meta': {
+            'revision': git_revision(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'seed': args.seed,
+            'repeat': args.repeat,
+        },
+        'results': results.rows,
+    }
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == '__main__':
+    main()
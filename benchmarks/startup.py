@@ -0,0 +1,76 @@
+"""Measure how long importing the app takes in a fresh interpreter.
+
+    python -m benchmarks.startup --repeat 10 --output startup.json
+
+Times ``python -c "import app.main"`` end to end (interpreter start
+included) and lists the slowest modules from ``python -X importtime``.
+No window is opened; time to first paint is reported by the app itself
+with ``python -m app.main --startup-report``.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from typing import List, Tuple
+
+from .run import Results, git_revision
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def time_import(module: str, repeat: int) -> List[float]:
+    runs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, '-c', f'import {module}'], cwd=ROOT, check=True)
+        runs.append(time.perf_counter() - start)
+    return runs
+
+
+def slowest_imports(module: str, limit: int) -> List[Tuple[str, float]]:
+    """(module, cumulative seconds) of the slowest imports, from -X importtime."""
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                            cwd=ROOT, check=True, capture_output=True, text=True)
+    modules = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        modules.append((name.strip(), int(cumulative) / 1e6))
+    modules.sort(key=lambda item: item[1], reverse=True)
+    return modules[:limit]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=10)
+    parser.add_argument('--top', type=int, default=15, help='how many of the slowest imports to list')
+    parser.add_argument('--output', help='write the JSON results here instead of stdout')
+    args = parser.parse_args(argv)
+
+    results = Results()
+    # The bare interpreter is the floor the app's own imports add to
+    results.add(0, 'startup', 'python -c pass', time_import('sys', args.repeat))
+    for module in ('app.todo_manager', 'app.gui', 'app.main'):
+        results.add(0, 'startup', f'import {module}', time_import(module, args.repeat))
+    imports = slowest_imports('app.main', args.top)
+    for name, seconds in imports:
+        print(f'{name:<40} {seconds * 1000:>8.1f} ms', file=sys.stderr)
+
+    report = {
+        'meta': {'revision': git_revision(), 'python': sys.version.split()[0], 'repeat': args.repeat},
+        'results': results.rows,
+        'slowest_imports': [{'module': name, 'cumulative': seconds} for name, seconds in imports],
+    }
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stderr, redirect_stdout
+from unittest import mock
+
+from app import cli
+from app.todo_manager import TodoManager
+
+
+class CliTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'tasks.json')
+        manager = TodoManager(self.path)
+        self.task = manager.add_task('only')
+        manager.close()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def run_cli(self, *argv, stdin=''):
+        out, err = io.StringIO(), io.StringIO()
+        with mock.patch('sys.stdin', io.StringIO(stdin)), redirect_stdout(out), redirect_stderr(err):
+            code = cli.main(['--data', self.path, *argv])
+        return code, out.getvalue(), err.getvalue()
+
+    def titles(self):
+        manager = TodoManager(self.path)
+        try:
+            return [task.title for task in manager.tasks.values()]
+        finally:
+            manager.close()
+
+    def test_batch_operations_need_an_id(self):
+        for operation in ({'op': 'delete'}, {'op': 'delete', 'id': ''}, {'op': 'complete', 'id': 5}):
+            with self.subTest(operation=operation):
+                code, _, err = self.run_cli('batch', stdin=json.dumps(operation) + '\n')
+                self.assertEqual(code, 1)
+                self.assertIn('needs an "id"', err)
+        self.assertEqual(self.titles(), ['only'])
+
+    def test_short_prefixes_are_refused(self):
+        for prefix in ('', self.task.id[:2]):
+            with self.subTest(prefix=prefix):
+                code, _, err = self.run_cli('delete', prefix)
+                self.assertEqual(code, 1)
+                self.assertIn('too short', err)
+        self.assertEqual(self.run_cli('delete', self.task.id[:6])[0], 0)
+        self.assertEqual(self.titles(), [])
+
+    def test_stdin_ids(self):
+        for line in ('{"title": "x"}', '{"id": ""}', '{"id":'):
+            with self.subTest(line=line):
+                code, _, err = self.run_cli('complete', '--stdin', stdin=line + '\n')
+                self.assertEqual(code, 1)
+                self.assertTrue(err.startswith('error: '), err)
+
+    def test_field_types_are_checked(self):
+        for record in ({'title': 'x', 'completed': 'false'}, {'title': 'x', 'priority': True},
+                       {'title': 'x', 'category': 5}, {'title': 'x', 'category': ['Home']}):
+            with self.subTest(record=record):
+                code, _, err = self.run_cli('add', '--stdin', stdin=json.dumps(record) + '\n')
+                self.assertEqual(code, 1)
+                self.assertTrue(err.startswith('error: '), err)
+        self.assertEqual(self.titles(), ['only'])
+
+
+if __name__ == '__main__':
+    unittest.main()
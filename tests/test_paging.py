@@ -0,0 +1,64 @@
+import os
+import tempfile
+import unittest
+
+from app.todo_manager import TodoManager
+
+
+class PagingTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.manager = TodoManager(os.path.join(self.directory.name, 'tasks.json'))
+        self.manager.bulk_add([{'title': f't{i}', 'priority': 1 + i % 3} for i in range(10)])
+
+    def tearDown(self):
+        self.manager.close()
+        self.directory.cleanup()
+
+    def ids(self, **kwargs):
+        return [task.id for task in self.manager.iter_tasks(**kwargs)]
+
+    def test_pages_cover_every_task_once(self):
+        for sort_by in (None, 'priority', 'title'):
+            for descending in (False, True):
+                with self.subTest(sort_by=sort_by, descending=descending):
+                    full = self.ids(sort_by=sort_by, descending=descending)
+                    pages, after = [], None
+                    while True:
+                        page = self.ids(sort_by=sort_by, descending=descending, after=after, limit=3)
+                        if not page:
+                            break
+                        pages.extend(page)
+                        after = self.manager.page_cursor(page[-1], sort_by)
+                    self.assertEqual(pages, full)
+
+    def test_a_deleted_tasks_cursor_still_resumes(self):
+        for sort_by in (None, 'priority'):
+            with self.subTest(sort_by=sort_by):
+                full = self.ids(sort_by=sort_by)
+                cursor = self.manager.page_cursor(full[4], sort_by)
+                self.manager.delete_task(full[4])
+                self.assertEqual(self.ids(sort_by=sort_by, after=cursor), full[5:])
+                self.assertEqual(self.ids(sort_by=sort_by, after=cursor, priority=2),
+                                 [i for i in full[5:] if self.manager.tasks[i].priority == 2])
+                self.manager.undo()
+
+    def test_the_next_id_is_a_fallback(self):
+        full = self.ids(sort_by='priority')
+        cursor = self.manager.page_cursor(full[2], 'priority', full[3])
+        self.manager.delete_task(full[2])
+        self.assertEqual(self.ids(sort_by='priority', after=cursor), full[3:])
+
+    def test_bad_cursors_are_refused(self):
+        cursor = self.manager.page_cursor(next(iter(self.manager.tasks)), 'title')
+        for after in ('zzz', '!!'):
+            with self.subTest(after=after), self.assertRaises(ValueError):
+                self.ids(after=after)
+        self.manager.delete_task(next(iter(self.manager.tasks)))
+        # Made for another order
+        with self.assertRaises(ValueError):
+            self.ids(sort_by='priority', after=cursor)
+
+
+if __name__ == '__main__':
+    unittest.main()
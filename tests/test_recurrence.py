@@ -0,0 +1,171 @@
+import os
+import tempfile
+import unittest
+from datetime import date, datetime
+
+from app.recurrence import RecurrenceError, Rule, due_day, due_on, parse_rule
+from app.todo_manager import Task, TodoManager
+
+
+class ParseRuleTest(unittest.TestCase):
+    def test_shorthands_and_intervals(self):
+        self.assertEqual(parse_rule('daily'), Rule('day'))
+        self.assertEqual(parse_rule('Every 3  Weeks'), Rule('week', 3))
+        self.assertEqual(parse_rule('every 1 month'), Rule('month'))
+
+    def test_limits_and_day(self):
+        rule = parse_rule('monthly on day 31 until 2026-12-31 count 4')
+        self.assertEqual(rule, Rule('month', 1, date(2026, 12, 31), 4, 31))
+
+    def test_text_round_trips(self):
+        for text in ('daily', 'every 2 weeks', 'monthly on day 15', 'weekly until 2026-12-31 count 3'):
+            self.assertEqual(str(parse_rule(text)), text)
+
+    def test_invalid_rules(self):
+        for text in ('hourly', 'every 0 days', 'daily on day 3', 'monthly on day 32', 'daily count 0',
+                     'daily until 2026-02-30'):
+            with self.assertRaises(RecurrenceError, msg=text):
+                parse_rule(text)
+
+
+class NthTest(unittest.TestCase):
+    def test_days_and_weeks(self):
+        start = date(2026, 12, 30)
+        self.assertEqual(Rule('day').nth(start, 0), start)
+        self.assertEqual(Rule('day', 3).nth(start, 2), date(2027, 1, 5))
+        self.assertEqual(Rule('week', 2).nth(start, 1), date(2027, 1, 13))
+
+    def test_months_clamp_to_shorter_months(self):
+        rule = Rule('month').anchored(date(2026, 1, 31))
+        self.assertEqual([rule.nth(date(2026, 1, 31), n) for n in range(4)],
+                         [date(2026, 1, 31), date(2026, 2, 28), date(2026, 3, 31), date(2026, 4, 30)])
+
+    def test_leap_february(self):
+        self.assertEqual(Rule('month', 12, day=29).nth(date(2027, 2, 28), 1), date(2028, 2, 29))
+
+    def test_anchor_survives_a_clamped_start(self):
+        # The series continues from the stored due date, which may be clamped
+        rule = parse_rule('monthly').anchored(date(2026, 1, 31))
+        self.assertEqual(rule.nth(date(2026, 2, 28), 1), date(2026, 3, 31))
+
+    def test_intervals_cross_years(self):
+        self.assertEqual(Rule('month', 5).nth(date(2026, 10, 15), 1), date(2027, 3, 15))
+
+
+class BetweenTest(unittest.TestCase):
+    def test_window_after_start_skips_ahead(self):
+        days = list(Rule('day', 3).between(date(2026, 1, 1), date(2026, 3, 1), date(2026, 3, 10)))
+        self.assertEqual(days, [date(2026, 3, 2), date(2026, 3, 5), date(2026, 3, 8)])
+
+    def test_window_before_start(self):
+        days = list(Rule('week').between(date(2026, 3, 2), date(2026, 1, 1), date(2026, 3, 16)))
+        self.assertEqual(days, [date(2026, 3, 2), date(2026, 3, 9), date(2026, 3, 16)])
+
+    def test_months_skip_ahead_with_clamping(self):
+        rule = Rule('month', 2, day=31)
+        days = list(rule.between(date(2026, 1, 31), date(2027, 1, 1), date(2027, 6, 30)))
+        self.assertEqual(days, [date(2027, 1, 31), date(2027, 3, 31), date(2027, 5, 31)])
+
+    def test_count_is_counted_from_the_start(self):
+        rule = Rule('day', count=5)
+        days = list(rule.between(date(2026, 1, 1), date(2026, 1, 4), date(2026, 1, 31)))
+        self.assertEqual(days, [date(2026, 1, 4), date(2026, 1, 5)])
+
+    def test_until_is_inclusive(self):
+        rule = Rule('week', until=date(2026, 1, 15))
+        days = list(rule.between(date(2026, 1, 1), date(2026, 1, 1), date(2026, 12, 31)))
+        self.assertEqual(days, [date(2026, 1, 1), date(2026, 1, 8), date(2026, 1, 15)])
+
+    def test_far_window_is_cheap(self):
+        rule = Rule('day')
+        days = rule.between(date(2026, 1, 1), date(9000, 1, 1), date(9000, 1, 2))
+        self.assertEqual(list(days), [date(9000, 1, 1), date(9000, 1, 2)])
+
+
+class AdvanceTest(unittest.TestCase):
+    def test_count_goes_down(self):
+        self.assertEqual(Rule('day', count=3).advance(date(2026, 1, 1)), Rule('day', count=2))
+        self.assertIsNone(Rule('day', count=1).advance(date(2026, 1, 1)))
+
+    def test_until_ends_the_series(self):
+        rule = Rule('week', until=date(2026, 1, 10))
+        self.assertEqual(rule.advance(date(2026, 1, 1)), rule)
+        self.assertIsNone(rule.advance(date(2026, 1, 8)))
+
+    def test_unlimited(self):
+        self.assertEqual(Rule('month', day=31).advance(date(2026, 1, 31)), Rule('month', day=31))
+
+
+class DueDateHelpersTest(unittest.TestCase):
+    def test_due_on_keeps_the_time(self):
+        self.assertEqual(due_on('2026-01-31 09:30', date(2026, 2, 28)), '2026-02-28 09:30')
+        self.assertEqual(due_on('2026-01-31', date(2026, 2, 28)), '2026-02-28')
+
+    def test_due_day(self):
+        self.assertEqual(due_day('2026-01-31T09:30:00'), date(2026, 1, 31))
+
+
+class StampCompletionTest(unittest.TestCase):
+    def test_completing_an_occurrence_moves_to_the_next(self):
+        task = Task('Rent', due_date='2026-01-31', recurrence='monthly on day 31 count 3')
+        changes = TodoManager._stamp_completion(task, {'completed': True})
+        self.assertNotIn('completed', changes)
+        self.assertEqual(changes['due_date'], '2026-02-28')
+        self.assertEqual(changes['recurrence'], 'monthly on day 31 count 2')
+        self.assertIsNotNone(changes['completed_at'])
+
+    def test_last_occurrence_completes_the_task(self):
+        task = Task('Rent', due_date='2026-01-31', recurrence='monthly count 1')
+        changes = TodoManager._stamp_completion(task, {'completed': True})
+        self.assertTrue(changes['completed'])
+        self.assertNotIn('due_date', changes)
+
+    def test_until_passed_completes_the_task(self):
+        task = Task('Walk', due_date='2026-01-08', recurrence='weekly until 2026-01-10')
+        self.assertTrue(TodoManager._stamp_completion(task, {'completed': True})['completed'])
+
+    def test_reopening_clears_completed_at(self):
+        task = Task('Walk', completed=True, completed_at=1.0)
+        self.assertEqual(TodoManager._stamp_completion(task, {'completed': False}),
+                         {'completed': False, 'completed_at': None})
+
+    def test_unchanged_state_is_left_alone(self):
+        task = Task('Walk', due_date='2026-01-08', recurrence='daily')
+        self.assertEqual(TodoManager._stamp_completion(task, {'title': 'Run'}), {'title': 'Run'})
+
+
+class ManagerRecurrenceTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.manager = TodoManager(os.path.join(self.directory.name, 'tasks.json'))
+
+    def tearDown(self):
+        self.manager.close()
+        self.directory.cleanup()
+
+    def test_monthly_rules_are_anchored_on_add(self):
+        task = self.manager.add_task('Rent', due_date='2026-01-31', recurrence='monthly')
+        self.assertEqual(task.recurrence, 'monthly on day 31')
+
+    def test_completion_advances_through_short_months(self):
+        task = self.manager.add_task('Rent', due_date='2026-01-31', recurrence='monthly count 3')
+        self.manager.toggle_task_completion(task.id)
+        self.assertEqual((task.due_date, task.completed), ('2026-02-28', False))
+        self.manager.toggle_task_completion(task.id)
+        self.assertEqual((task.due_date, task.recurrence), ('2026-03-31', 'monthly on day 31 count 1'))
+        self.manager.toggle_task_completion(task.id)
+        self.assertTrue(task.completed)
+        self.assertEqual(task.due_date, '2026-03-31')
+
+    def test_occurrences_in_a_window(self):
+        task = self.manager.add_task('Water', due_date='2026-03-02 08:00', recurrence='every 2 days count 4')
+        start = datetime(2026, 3, 1).timestamp()
+        end = datetime(2026, 4, 1).timestamp()
+        occurrences = self.manager.get_occurrences_between(start, end)
+        # The stored occurrence is not repeated; count 4 leaves three more
+        self.assertEqual([(t.id, datetime.fromtimestamp(due)) for t, due in occurrences],
+                         [(task.id, datetime(2026, 3, day, 8)) for day in (4, 6, 8)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+import asyncio
+import io
+import json
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stderr
+from unittest import mock
+
+from app.server import TodoServer
+from app.todo_manager import TodoManager
+
+
+class ServerTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.manager = TodoManager(os.path.join(self.directory.name, 'tasks.json'))
+        self.task = self.manager.add_task('only')
+        self.server = TodoServer(self.manager)
+        self.listener = await self.server.start('127.0.0.1', 0)
+        self.port = self.listener.sockets[0].getsockname()[1]
+
+    async def asyncTearDown(self):
+        self.listener.close()
+        await self.listener.wait_closed()
+        await self.server.stop()
+        self.manager.close()
+        self.directory.cleanup()
+
+    async def request(self, method, path, payload=None):
+        reader, writer = await asyncio.open_connection('127.0.0.1', self.port)
+        body = b'' if payload is None else json.dumps(payload).encode()
+        writer.write(f'{method} {path} HTTP/1.1\r\nConnection: close\r\nContent-Length: {len(body)}\r\n\r\n'
+                     .encode() + body)
+        response = await reader.read()
+        writer.close()
+        head, _, data = response.partition(b'\r\n\r\n')
+        return int(head.split()[1]), json.loads(data) if data else None
+
+    async def test_bulk_operations_need_an_id(self):
+        for operations in ([{'op': 'delete'}], [{'op': 'update', 'id': '', 'changes': {}}]):
+            with self.subTest(operations=operations):
+                status, payload = await self.request('POST', '/tasks/bulk', operations)
+                self.assertEqual(status, 400)
+                self.assertIn('needs an "id"', payload['error'])
+        self.assertEqual(list(self.manager.tasks), [self.task.id])
+
+    async def test_unexpected_errors_get_a_response(self):
+        with mock.patch.object(self.manager, 'add_task', side_effect=TypeError('boom')), \
+                redirect_stderr(io.StringIO()):
+            status, payload = await self.request('POST', '/tasks', {'title': 'x'})
+        self.assertEqual(status, 500)
+        self.assertIn('boom', payload['error'])
+        # The server keeps serving
+        status, _ = await self.request('GET', f'/tasks/{self.task.id}')
+        self.assertEqual(status, 200)
+
+
+if __name__ == '__main__':
+    unittest.main()
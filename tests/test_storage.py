@@ -0,0 +1,146 @@
+import json
+import os
+import tempfile
+import unittest
+
+from app.locking import FileLock
+from app.storage import JournalStorage, SqliteStorage
+
+
+def record(task_id, title=None):
+    return {'id': task_id, 'title': title or task_id, 'completed': False, 'priority': 1}
+
+
+class JournalTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'tasks.json')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def titles(self, storage):
+        return [r['title'] for r in storage.load()]
+
+    def journal_lines(self):
+        with open(self.path + '.journal') as f:
+            return f.read().splitlines()
+
+    def test_operations_replay_on_top_of_the_snapshot(self):
+        storage = JournalStorage(self.path)
+        storage.save([record('a'), record('b')])
+        storage.commit([{'op': 'add', 'task': record('c')}], None)
+        storage.commit([{'op': 'update', 'id': 'a', 'changes': {'title': 'A'}},
+                        {'op': 'delete', 'id': 'b'},
+                        {'op': 'add', 'task': record('b'), 'before': 'c'}], None)
+        # Header plus one line per operation; the snapshot is untouched
+        self.assertEqual(len(self.journal_lines()), 5)
+        self.assertEqual(self.titles(JournalStorage(self.path)), ['A', 'b', 'c'])
+
+    def test_a_torn_last_line_is_ignored(self):
+        storage = JournalStorage(self.path)
+        storage.save([record('a')])
+        storage.commit([{'op': 'add', 'task': record('b')}], None)
+        with open(self.path + '.journal', 'a') as f:
+            f.write('{"op": "add", "ta')
+        self.assertEqual(self.titles(JournalStorage(self.path)), ['a', 'b'])
+
+    def test_a_stale_journal_is_ignored(self):
+        storage = JournalStorage(self.path)
+        storage.save([record('a')])
+        storage.commit([{'op': 'add', 'task': record('b')}], None)
+        # The snapshot replaced behind the journal's back
+        with open(self.path, 'w') as f:
+            json.dump([record('x')], f)
+        self.assertEqual(self.titles(JournalStorage(self.path)), ['x'])
+
+    def test_compaction_folds_the_journal_into_the_snapshot(self):
+        storage = JournalStorage(self.path, compact_threshold=3)
+        records = []
+        for task_id in 'abcd':
+            records.append(record(task_id))
+            storage.commit([{'op': 'add', 'task': records[-1]}], lambda: list(records))
+        # The fourth operation went over the threshold: a fresh snapshot
+        self.assertEqual(len(self.journal_lines()), 1)
+        with open(self.path) as f:
+            self.assertEqual([r['id'] for r in json.load(f)], list('abcd'))
+        self.assertEqual(self.titles(JournalStorage(self.path)), list('abcd'))
+
+
+class SqliteChangesTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        path = os.path.join(self.directory.name, 'tasks.db')
+        self.mine, self.other = SqliteStorage(path), SqliteStorage(path)
+
+    def tearDown(self):
+        self.mine.close()
+        self.other.close()
+        self.directory.cleanup()
+
+    def test_only_rows_changed_since_come_back(self):
+        with self.mine.lock():
+            self.mine.save([record('a'), record('b'), record('c')])
+        version = self.mine.version()
+        self.assertEqual(self.mine.changes_since(version), [])
+        with self.other.lock():
+            self.other.commit([{'op': 'update', 'id': 'b', 'changes': {'title': 'B'}},
+                               {'op': 'delete', 'id': 'c'},
+                               {'op': 'add', 'task': record('d')}], None)
+        ops = self.mine.changes_since(version)
+        self.assertEqual(ops[0], {'op': 'delete', 'id': 'c'})
+        self.assertEqual([(op['op'], op['task']['title']) for op in ops[1:]], [('add', 'B'), ('add', 'd')])
+
+    def test_a_full_save_needs_a_reload(self):
+        version = self.mine.version()
+        with self.other.lock():
+            self.other.save([record('a')])
+        self.assertIsNone(self.mine.changes_since(version))
+
+    def test_undone_deletes_keep_their_place(self):
+        with self.mine.lock():
+            self.mine.save([record('a'), record('b'), record('c')])
+            self.mine.commit([{'op': 'delete', 'id': 'b'}], None)
+            self.mine.commit([{'op': 'add', 'task': record('b'), 'before': 'c'},
+                              {'op': 'add', 'task': record('d')}], None)
+        self.assertEqual([r['id'] for r in self.other.load()], list('abcd'))
+
+
+class FileLockTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        path = os.path.join(self.directory.name, 'tasks.json.lock')
+        self.mine, self.other = FileLock(path), FileLock(path)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write(self, lock):
+        with lock:
+            return lock.bump()
+
+    def test_writers_exclude_each_other(self):
+        with self.mine:
+            # Reentrant for its holder only
+            self.assertTrue(self.mine.acquire(blocking=False))
+            self.mine.release()
+            self.assertFalse(self.other.acquire(blocking=False))
+        self.assertTrue(self.other.acquire(blocking=False))
+        self.other.release()
+
+    def test_own_writes_are_recognised(self):
+        self.write(self.mine)
+        self.write(self.mine)
+        self.assertTrue(self.mine.written_since(0))
+        self.assertFalse(self.other.written_since(0))
+        self.write(self.other)
+        # Another writer came in between
+        self.assertFalse(self.mine.written_since(1))
+        self.assertTrue(self.other.written_since(2))
+        self.write(self.mine)
+        self.assertTrue(self.mine.written_since(3))
+        self.assertFalse(self.mine.written_since(2))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+import os
+import tempfile
+import threading
+import unittest
+
+from app.storage import UnreadableDataError, open_storage
+from app.todo_manager import TodoManager
+
+KINDS = ('json', 'journal', 'sqlite', 'binary')
+
+
+class SyncTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.managers = []
+
+    def tearDown(self):
+        for manager in self.managers:
+            manager.close()
+        self.directory.cleanup()
+
+    def open(self, kind, **kwargs):
+        # One data directory per backend, so subtests do not see each other's files
+        path = os.path.join(self.directory.name, kind, 'tasks.json')
+        manager = TodoManager(path, storage=open_storage(path, kind), **kwargs)
+        self.managers.append(manager)
+        return manager
+
+    def titles(self, manager):
+        return [task.title for task in manager.tasks.values()]
+
+    def test_unreadable_file_keeps_the_tasks_in_memory(self):
+        for kind in ('json', 'journal', 'binary'):
+            with self.subTest(kind=kind):
+                manager = self.open(kind)
+                for title in 'abcde':
+                    manager.add_task(title)
+                # Truncated, as by an editor saving in place
+                open(manager.storage.path, 'w').close()
+                with self.assertRaises(UnreadableDataError):
+                    manager.storage.load(strict=True)
+                self.assertEqual(manager.sync_from_storage(), set())
+                self.assertEqual(self.titles(manager), list('abcde'))
+                manager.add_task('new')
+                manager.close()
+                # The next commit rewrote the file from memory
+                self.assertEqual(self.titles(self.open(kind)), list('abcde') + ['new'])
+
+    def test_other_instances_changes_arrive(self):
+        for kind in KINDS:
+            with self.subTest(kind=kind):
+                first, second = self.open(kind), self.open(kind)
+                task = first.add_task('shared')
+                self.assertEqual(second.sync_from_storage(), {task.id})
+                second.update_task(task.id, title='renamed')
+                second.add_task('more')
+                first.sync_from_storage()
+                self.assertEqual(self.titles(first), ['renamed', 'more'])
+                first.delete_task(task.id)
+                self.assertEqual(second.sync_from_storage(), {task.id})
+                self.assertEqual(self.titles(second), ['more'])
+
+    def test_concurrent_writers_lose_nothing(self):
+        for kind in KINDS:
+            with self.subTest(kind=kind):
+                managers = [self.open(kind) for _ in range(3)]
+
+                def write(manager, n):
+                    for i in range(20):
+                        manager.add_task(f'{n}-{i}')
+
+                threads = [threading.Thread(target=write, args=(m, n)) for n, m in enumerate(managers)]
+                for thread in threads:
+                    thread.start()
+                for thread in threads:
+                    thread.join()
+                # Each write caught up with the others under the lock first
+                for manager in managers:
+                    manager.sync_from_storage()
+                    self.assertEqual(len(manager.tasks), 60)
+                self.assertEqual(len(self.open(kind).tasks), 60)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from app.storage import open_storage
+from app.todo_manager import TodoManager
+
+KINDS = ('json', 'journal', 'sqlite', 'binary')
+
+
+class UndoTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def open(self, kind):
+        path = os.path.join(self.directory.name, kind, 'tasks.json')
+        return TodoManager(path, storage=open_storage(path, kind))
+
+    def titles(self, manager):
+        return [task.title for task in manager.tasks.values()]
+
+    def test_undone_deletes_go_back_in_place(self):
+        for kind in KINDS:
+            with self.subTest(kind=kind):
+                manager = self.open(kind)
+                ids = [manager.add_task(title).id for title in 'abcde']
+                manager.delete_task(ids[1])
+                manager.bulk_delete([ids[3], ids[0]])
+                with mock.patch.object(manager.storage, 'save', wraps=manager.storage.save) as save:
+                    self.assertIsNotNone(manager.undo())
+                    self.assertIsNotNone(manager.undo())
+                    manager.redo()
+                    manager.undo()
+                if kind != 'json':
+                    # Only the operations are written; JSON always writes the whole file
+                    save.assert_not_called()
+                self.assertEqual(self.titles(manager), list('abcde'))
+                manager.close()
+                manager = self.open(kind)
+                self.assertEqual(self.titles(manager), list('abcde'))
+                chunks = [record['title'] for records, _ in manager.storage.iter_load(2) for record in records]
+                self.assertEqual(chunks, list('abcde'))
+                manager.close()
+
+    def test_undo_and_redo_of_edits(self):
+        manager = self.open('json')
+        task = manager.add_task('draft', priority=2)
+        manager.update_task(task.id, title='final', priority=5)
+        self.assertEqual(manager.undo(), manager.history.redo_label())
+        self.assertEqual((task.title, task.priority), ('draft', 2))
+        manager.redo()
+        self.assertEqual((task.title, task.priority), ('final', 5))
+        # A new change clears what could be redone
+        manager.undo()
+        manager.add_task('other')
+        self.assertIsNone(manager.redo())
+        manager.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+import os
+import tempfile
+import time
+import unittest
+
+from app.storage import JsonStorage
+from app.todo_manager import TodoManager
+from app.write_behind import WriteBehindStorage
+
+
+class CountingStorage(JsonStorage):
+    def __init__(self, path):
+        super().__init__(path)
+        self.commits = []
+
+    def commit(self, ops, snapshot):
+        self.commits.append(ops)
+        super().commit(ops, snapshot)
+
+
+class WriteBehindTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'tasks.json')
+        self.inner = CountingStorage(self.path)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def titles(self):
+        return [record['title'] for record in JsonStorage(self.path).load()]
+
+    def test_a_burst_is_one_commit(self):
+        manager = TodoManager(self.path, storage=WriteBehindStorage(self.inner, delay=0.05))
+        for title in 'abc':
+            manager.add_task(title)
+        # Pending operations already count for a load
+        self.assertEqual([record['title'] for record in manager.storage.load()], list('abc'))
+        time.sleep(0.3)
+        self.assertEqual(len(self.inner.commits), 1)
+        self.assertEqual(self.titles(), list('abc'))
+        manager.close()
+
+    def test_flush_writes_at_once(self):
+        manager = TodoManager(self.path, storage=WriteBehindStorage(self.inner, delay=60))
+        manager.add_task('a')
+        manager.storage.flush()
+        self.assertEqual(self.titles(), ['a'])
+        manager.close()
+
+    def test_a_failing_before_write_backs_off(self):
+        storage = WriteBehindStorage(self.inner, delay=0.1)
+        calls = []
+
+        def before_write():
+            calls.append(time.monotonic())
+            raise OSError('not now')
+
+        storage.before_write = before_write
+        record = {'id': 'x', 'title': 'a'}
+        storage.commit([{'op': 'add', 'task': record}], lambda: [record])
+        time.sleep(0.5)
+        # One attempt per delay, not a busy loop
+        self.assertLessEqual(len(calls), 6)
+        self.assertIsInstance(storage.error, OSError)
+        self.assertTrue(storage.dirty)
+        self.assertEqual(self.inner.commits, [])
+        storage.before_write = None
+        storage.close()
+        self.assertEqual(self.titles(), ['a'])
+
+
+if __name__ == '__main__':
+    unittest.main()